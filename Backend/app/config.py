@@ -10,4 +10,101 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 CLOUDFLARE_R2_BUCKET = os.getenv("CLOUDFLARE_R2_BUCKET")
 CLOUDFLARE_R2_ACCESS_KEY = os.getenv("CLOUDFLARE_R2_ACCESS_KEY")
-CLOUDFLARE_R2_SECRET_KEY = os.getenv("CLOUDFLARE_R2_SECRET_KEY") 
\ No newline at end of file
+CLOUDFLARE_R2_SECRET_KEY = os.getenv("CLOUDFLARE_R2_SECRET_KEY") 
+
+# Recognition inference batching
+RECOGNITION_MAX_BATCH_SIZE = int(os.getenv("RECOGNITION_MAX_BATCH_SIZE", "16"))
+RECOGNITION_MAX_WAIT_MS = float(os.getenv("RECOGNITION_MAX_WAIT_MS", "5"))
+
+# Recognition execution: model inference runs in RECOGNITION_WORKERS spawned
+# processes (0 keeps it in-process on a thread), image decoding runs on
+# RECOGNITION_DECODE_THREADS threads
+RECOGNITION_MODEL_PATH = os.getenv("RECOGNITION_MODEL_PATH", "models/model.h5")
+# keras, tflite, onnx, or auto to pick from the model file extension
+RECOGNITION_BACKEND = os.getenv("RECOGNITION_BACKEND", "auto")
+RECOGNITION_BACKEND_THREADS = int(os.getenv("RECOGNITION_BACKEND_THREADS", "0")) or None
+# Versioned models; each worker polls the registry's ACTIVE file so an
+# activation reaches every worker (0 disables polling)
+RECOGNITION_REGISTRY_DIR = os.getenv("RECOGNITION_REGISTRY_DIR", "models/registry")
+RECOGNITION_REGISTRY_POLL_SECONDS = float(os.getenv("RECOGNITION_REGISTRY_POLL_SECONDS", "10"))
+RECOGNITION_WORKERS = int(os.getenv("RECOGNITION_WORKERS", "1"))
+RECOGNITION_DECODE_THREADS = int(os.getenv("RECOGNITION_DECODE_THREADS", "4"))
+
+# Streaming recognition: frames whose 16x16 thumbnail differs from the last
+# inferred frame by less than the threshold (mean abs, 0..1) reuse its result
+RECOGNITION_STREAM_WINDOW = int(os.getenv("RECOGNITION_STREAM_WINDOW", "5"))
+RECOGNITION_STREAM_DIFF_THRESHOLD = float(os.getenv("RECOGNITION_STREAM_DIFF_THRESHOLD", "0.02"))
+
+# Clip recognition: frames sampled evenly from an uploaded attempt
+RECOGNITION_CLIP_MAX_FRAMES = int(os.getenv("RECOGNITION_CLIP_MAX_FRAMES", "16"))
+
+# Perceptual-hash prediction cache (RECOGNITION_CACHE_SIZE=0 disables it)
+RECOGNITION_CACHE_SIZE = int(os.getenv("RECOGNITION_CACHE_SIZE", "2048"))
+RECOGNITION_CACHE_TTL = float(os.getenv("RECOGNITION_CACHE_TTL", "60"))
+
+# Where recognition runs: "local" serves it from this app, "remote" proxies
+# /api/recognition to a separate recognition service (app.recognition_app)
+# over RECOGNITION_SERVICE_SOCKET, "off" drops the endpoints. Only "local"
+# imports numpy / cv2 / the model backends.
+RECOGNITION_MODE = os.getenv("RECOGNITION_MODE", "local")
+RECOGNITION_SERVICE_SOCKET = os.getenv("RECOGNITION_SERVICE_SOCKET", "/tmp/senya-recognition.sock")
+RECOGNITION_SERVICE_TIMEOUT = float(os.getenv("RECOGNITION_SERVICE_TIMEOUT", "30"))
+
+# Fingerspelling word decoder: beam width, and how often the sign lexicon
+# is re-synced with the database to pick up edits from other processes
+RECOGNITION_SPELL_BEAM_WIDTH = int(os.getenv("RECOGNITION_SPELL_BEAM_WIDTH", "16"))
+RECOGNITION_SPELL_SYNC_SECONDS = float(os.getenv("RECOGNITION_SPELL_SYNC_SECONDS", "300"))
+
+# Hand-landmark classifier (scripts/build_landmark_references.py) and the
+# most frames one batch request may carry
+RECOGNITION_LANDMARK_MODEL = os.getenv("RECOGNITION_LANDMARK_MODEL", "models/landmarks.npz")
+RECOGNITION_LANDMARK_MAX_BATCH = int(os.getenv("RECOGNITION_LANDMARK_MAX_BATCH", "1024"))
+
+# On-device model distribution: where convert_model.py writes the default
+# model's mobile conversions (registry versions keep theirs in the version
+# directory) and which formats are offered to devices
+RECOGNITION_MOBILE_DIR = os.getenv("RECOGNITION_MOBILE_DIR", "models/converted")
+RECOGNITION_MOBILE_FORMATS = [
+    f.strip() for f in os.getenv("RECOGNITION_MOBILE_FORMATS", "tflite-int8,tflite-fp16,tflite").split(",") if f.strip()
+]
+
+# Opt-in capture of frames for retraining: low-confidence predictions are
+# sampled, frames that disagree with the client's ``expected`` answer are
+# always kept. A background thread writes them as compressed npz shards;
+# when the queue is full (frames or MiB) new frames are dropped instead
+RECOGNITION_CAPTURE_ENABLED = os.getenv("RECOGNITION_CAPTURE_ENABLED", "false").lower() in ("1", "true", "yes")
+RECOGNITION_CAPTURE_DIR = os.getenv("RECOGNITION_CAPTURE_DIR", "data/captures")
+RECOGNITION_CAPTURE_THRESHOLD = float(os.getenv("RECOGNITION_CAPTURE_THRESHOLD", "0.6"))
+RECOGNITION_CAPTURE_SAMPLE_RATE = float(os.getenv("RECOGNITION_CAPTURE_SAMPLE_RATE", "0.1"))
+RECOGNITION_CAPTURE_QUEUE_SIZE = int(os.getenv("RECOGNITION_CAPTURE_QUEUE_SIZE", "256"))
+RECOGNITION_CAPTURE_QUEUE_MB = float(os.getenv("RECOGNITION_CAPTURE_QUEUE_MB", "64"))
+RECOGNITION_CAPTURE_SHARD_SIZE = int(os.getenv("RECOGNITION_CAPTURE_SHARD_SIZE", "256"))
+RECOGNITION_CAPTURE_FLUSH_SECONDS = float(os.getenv("RECOGNITION_CAPTURE_FLUSH_SECONDS", "60"))
+
+# Cached unit / lesson order used for lock state and next-lesson unlocks.
+# Admin edits in this process drop it at once; other workers see them
+# within the TTL
+COURSE_GRAPH_TTL = float(os.getenv("COURSE_GRAPH_TTL", "60"))
+
+# Snapshot of units / lessons / signs behind the content endpoints, with
+# the responses pre-encoded; rebuilt on admin writes in this process and
+# at least every CATALOG_TTL seconds
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", "300"))
+
+# How long a token-only endpoint (get_token_user_id) trusts its last check
+# that the account still exists and is active; deleted or deactivated users
+# lose access within this many seconds
+AUTH_USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "60"))
+AUTH_USER_CACHE_MAX = int(os.getenv("AUTH_USER_CACHE_MAX", "50000"))
+
+# Most answer events one /submit-answers batch may carry
+LESSON_ANSWER_MAX_BATCH = int(os.getenv("LESSON_ANSWER_MAX_BATCH", "500"))
+
+# Write-behind buffer for per-question lesson progress: progress /
+# last_question on answers that complete nothing are merged per user in
+# memory and written every PROGRESS_FLUSH_SECONDS, or sooner once
+# PROGRESS_BUFFER_MAX_USERS users are waiting. Hearts spent and completions
+# (rubies) are always written before the response
+PROGRESS_WRITE_BEHIND = os.getenv("PROGRESS_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+PROGRESS_FLUSH_SECONDS = float(os.getenv("PROGRESS_FLUSH_SECONDS", "2"))
+PROGRESS_BUFFER_MAX_USERS = int(os.getenv("PROGRESS_BUFFER_MAX_USERS", "2000"))
@@ -1,4 +1,5 @@
 # app/db.py
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import DATABASE_URL
@@ -12,3 +13,26 @@ async_session = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False
 )
+
+# Dialect-specific INSERT constructs that know how to upsert
+_INSERTS = {
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def is_mysql(db: AsyncSession) -> bool:
+    """Whether upserts use ON DUPLICATE KEY UPDATE rather than ON CONFLICT."""
+    return db.bind.dialect.name in ("mysql", "mariadb")
+
+
+def dialect_insert(db: AsyncSession, table):
+    """INSERT into ``table`` for the session's database, offering
+    ``on_duplicate_key_update`` (MySQL) or ``on_conflict_do_*``."""
+    dialect = db.bind.dialect.name
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise NotImplementedError(f"No upsert support for the {dialect} dialect")
+    return insert(table)
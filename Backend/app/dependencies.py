@@ -1,8 +1,11 @@
-from fastapi import Depends, HTTPException, status, Header
+import time
+from typing import Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, status, Header, Query, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db import async_session
+from app.config import AUTH_USER_CACHE_SECONDS, AUTH_USER_CACHE_MAX
 from app.auth import decode_access_token
 from app.models import Account, Sign
 from fastapi.security import OAuth2PasswordBearer
@@ -37,6 +40,63 @@ async def get_current_user(
         )
     return user
 
+# user_id -> (account exists and is active, when that was checked)
+_account_checks: Dict[str, Tuple[bool, float]] = {}
+
+async def _account_active(user_id) -> bool:
+    key = str(user_id)
+    now = time.monotonic()
+    cached = _account_checks.get(key)
+    if cached is not None and now - cached[1] < AUTH_USER_CACHE_SECONDS:
+        return cached[0]
+    # Own short-lived session, only opened on a cache miss
+    async with async_session() as db:
+        row = (await db.execute(select(Account.status).where(Account.user_id == user_id))).first()
+    active = row is not None and row[0] != "inactive"
+    if len(_account_checks) >= AUTH_USER_CACHE_MAX:
+        _account_checks.clear()
+    _account_checks[key] = (active, now)
+    return active
+
+async def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    # Validates the token without loading the account, for endpoints that
+    # serve the same reference data to every signed-in user and so can
+    # answer a conditional GET without a query per request. The account is
+    # still checked to exist and be active, cached for AUTH_USER_CACHE_SECONDS
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="Invalid authentication credentials"
+        )
+    if not await _account_active(payload["sub"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="User not found"
+        )
+    return payload["sub"]
+
+async def get_websocket_user(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+) -> Optional[Account]:
+    # Browsers can't set headers on a WebSocket handshake, so the token may
+    # also come in as ?token=. Returns None instead of raising so the route
+    # can close the socket with a policy-violation code.
+    if not token:
+        authorization = websocket.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+    payload = decode_access_token(token) if token else None
+    if not payload or "sub" not in payload:
+        return None
+
+    # Own short-lived session: a Depends(get_db) session would hold a pooled
+    # connection for as long as the socket stays open
+    async with async_session() as db:
+        result = await db.execute(select(Account).where(Account.user_id == payload["sub"]))
+        return result.scalars().first()
+
 async def add_video_to_sign(db: AsyncSession, sign_id: int, video_filename: str):
     r2_url_prefix = "https://10bbfdc0897bf4e826451e6e6054ffff.r2.cloudflarestorage.com/senya-videos/"
     full_video_url = f"{r2_url_prefix}{video_filename}"
@@ -2,7 +2,7 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, RECOGNITION_MODE
 from app import models
 from app.db import engine
 import os
@@ -16,7 +16,7 @@ from app.routes.quiz_routes import router as quiz_router
 
 app = FastAPI(title="Senya Sign Language App")
 
-from app.routes import ( practice_routes, auth_routes, lessons_routes, shop_routes, profile_routes, admin_units, admin_lessons, admin_signs, user_routes, recognition_routes )
+from app.routes import ( practice_routes, auth_routes, lessons_routes, shop_routes, profile_routes, admin_units, admin_lessons, admin_signs, user_routes )
 app.include_router(user_content_routes.router, prefix="/api/lessons", tags=["Lessons"])
 app.include_router(quiz_router, prefix="/api")
 
@@ -51,7 +51,15 @@ app.include_router(lessons_routes.router, prefix="/api/lessons", tags=["Lessons"
 app.include_router(user_routes.router, prefix="/api/status", tags=["Status"])
 app.include_router(profile_routes.router, prefix="/api/profile", tags=["Profile"])
 app.include_router(shop_routes.router, prefix="/api/shop", tags=["Shop"])
-app.include_router(recognition_routes.router, prefix="/api/recognition", tags=["Recognition"])
+
+# Imported only when used: the local recognition router pulls in numpy, cv2
+# and the model backends
+if RECOGNITION_MODE == "local":
+    from app.routes import recognition_routes
+    app.include_router(recognition_routes.router, prefix="/api/recognition", tags=["Recognition"])
+elif RECOGNITION_MODE == "remote":
+    from app.routes import recognition_proxy
+    app.include_router(recognition_proxy.router, prefix="/api/recognition", tags=["Recognition"])
 
 @app.on_event("startup")
 async def on_startup():
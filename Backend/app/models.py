@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Enum, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Date, Enum, ForeignKey, Boolean, JSON, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -68,6 +68,10 @@ class Sign(Base):
 
 class UserProgress(Base):
     __tablename__ = 'user_progress'
+    # One row per user and lesson; progress writes upsert on this key
+    __table_args__ = (
+        UniqueConstraint('user_id', 'lesson_id', name='uq_user_progress_user_lesson'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('accounts.user_id'))
@@ -79,6 +83,19 @@ class UserProgress(Base):
         TIMESTAMP, server_default=func.now(), onupdate=func.now()
     )
 
+class DailyChallenge(Base):
+    __tablename__ = 'daily_challenges'
+    # The lesson picked for a user's challenge, once per (UTC) day
+    __table_args__ = (
+        UniqueConstraint('user_id', 'challenge_date', name='uq_daily_challenges_user_date'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('accounts.user_id'), nullable=False)
+    challenge_date = Column(Date, nullable=False)
+    lesson_id = Column(Integer, ForeignKey('lessons.id'), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
 class Account(Base):
     __tablename__ = 'accounts'
 
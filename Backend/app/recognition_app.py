@@ -0,0 +1,12 @@
+# Standalone recognition service, for RECOGNITION_MODE=remote deployments:
+#
+#   uvicorn app.recognition_app:app --uds /tmp/senya-recognition.sock
+#
+# The main API then forwards /api/recognition to it over the socket (see
+# app/routes/recognition_proxy.py) and never imports the model stack itself.
+from fastapi import FastAPI
+
+from app.routes import recognition_routes
+
+app = FastAPI(title="Senya Sign Recognition")
+app.include_router(recognition_routes.router, prefix="/api/recognition", tags=["Recognition"])
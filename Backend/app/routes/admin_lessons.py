@@ -4,6 +4,8 @@ from sqlalchemy.future import select
 from sqlalchemy import update
 from app.models import Lesson, Unit, Sign
 from app.dependencies import get_db, get_admin_user
+from app.services import catalog, course_graph
+from app.routes.admin_signs import remove_from_lexicon
 from app.schemas import LessonSchema
 from typing import List
 from fastapi import UploadFile, File
@@ -56,6 +58,8 @@ async def create_lesson(
     )
     db.add(new_lesson)
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
     await db.refresh(new_lesson)
     return new_lesson
 
@@ -85,6 +89,8 @@ async def update_lesson(
     lesson.image_url = image_url
     
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
     await db.refresh(lesson)
     return lesson
 
@@ -101,6 +107,9 @@ async def archive_lesson(
 
     lesson.archived = True
 
+    sign_ids = (await db.execute(
+        select(Sign.id).where(Sign.lesson_id == lesson_id, Sign.archived == False)
+    )).scalars().all()
     await db.execute(
         update(Sign)
         .where(Sign.lesson_id == lesson_id)
@@ -108,6 +117,9 @@ async def archive_lesson(
     )
 
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
+    remove_from_lexicon(sign_ids)
     await db.refresh(lesson)
     return lesson
 
@@ -160,6 +172,8 @@ async def upload_lesson_image(
     # Save path to DB
     lesson.image_url = f"{LESSON_IMAGE_BASE}/{lesson_id}/{filename}"
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
     await db.refresh(lesson)
 
     return {
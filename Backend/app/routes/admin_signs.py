@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models import Sign, Lesson
 from app.dependencies import get_db, get_admin_user
+from app.config import RECOGNITION_MODE
+from app.services import catalog
 import uuid, os
 import boto3
 from botocore.config import Config
@@ -10,6 +12,22 @@ from botocore.exceptions import ClientError
 
 router = APIRouter()
 
+def update_lexicon(sign: Sign):
+    # Keep the fingerspelling lexicon current without waiting for its
+    # periodic re-sync. A separate recognition service picks the change up
+    # from the database on its next sync.
+    if RECOGNITION_MODE != "local":
+        return
+    from app.services import fingerspelling
+    fingerspelling.update_sign(sign.id, sign.text, sign.archived)
+
+def remove_from_lexicon(sign_ids):
+    """``update_lexicon`` for signs archived in bulk by a lesson or unit."""
+    if RECOGNITION_MODE != "local" or not sign_ids:
+        return
+    from app.services import fingerspelling
+    fingerspelling.remove_signs(sign_ids)
+
 def get_r2_client():
     endpoint = os.getenv('CLOUDFLARE_R2_ENDPOINT', '').split('/senya-videos')[0].rstrip('/')
     access_key = os.getenv('CLOUDFLARE_R2_ACCESS_KEY')
@@ -98,6 +116,8 @@ async def create_sign(
             db.add(sign)
             await db.commit()
             await db.refresh(sign)
+            update_lexicon(sign)
+            catalog.invalidate()
             return sign
             
         except ClientError as e:
@@ -149,6 +169,8 @@ async def update_sign(
         
         await db.commit()
         await db.refresh(sign)
+        update_lexicon(sign)
+        catalog.invalidate()
         return sign
         
     except Exception as e:
@@ -171,6 +193,8 @@ async def archive_sign(
         sign.archived = True
         await db.commit()
         await db.refresh(sign)
+        update_lexicon(sign)
+        catalog.invalidate()
         return sign
         
     except Exception as e:
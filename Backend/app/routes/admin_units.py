@@ -4,6 +4,8 @@ from sqlalchemy.future import select
 from sqlalchemy import update
 from app.models import Unit, Lesson, Sign
 from app.dependencies import get_db, get_admin_user
+from app.services import catalog, course_graph
+from app.routes.admin_signs import remove_from_lexicon
 from app.schemas import UnitSchema, UnitUpdateSchema 
 from typing import List
 
@@ -41,6 +43,8 @@ async def create_unit(
     )
     db.add(new_unit)
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
     await db.refresh(new_unit)
     return new_unit
 
@@ -66,6 +70,8 @@ async def update_unit(
     unit.status = status
     
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
     await db.refresh(unit)
     return unit
 
@@ -89,12 +95,19 @@ async def archive_unit(
     )
 
     subq = select(Lesson.id).where(Lesson.unit_id == unit_id)
-    await db.execute(
-        update(Sign)
-        .where(Sign.lesson_id.in_(subq))
-        .values(archived=True)
-    )
+    sign_ids = (await db.execute(
+        select(Sign.id).where(Sign.lesson_id.in_(subq), Sign.archived == False)
+    )).scalars().all()
+    if sign_ids:
+        await db.execute(
+            update(Sign)
+            .where(Sign.id.in_(sign_ids))
+            .values(archived=True)
+        )
 
     await db.commit()
+    course_graph.invalidate()
+    catalog.invalidate()
+    remove_from_lexicon(sign_ids)
     await db.refresh(unit)
     return unit
\ No newline at end of file
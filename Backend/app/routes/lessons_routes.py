@@ -1,15 +1,22 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload, contains_eager
+from sqlalchemy.orm import noload
 from datetime import datetime, timedelta
 
 from app.models import (
     Lesson, Unit, Sign, UserProgress, UserProfile, Account
 )
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_token_user_id
+from app.services import catalog, course_graph, daily_challenge, heart_service, progress_store
+from app.services.progress_buffer import buffer as progress_buffer
+from app.services.http_cache import conditional_response
+from app.config import LESSON_ANSWER_MAX_BATCH
 from app.schemas import (
+    AnswerBatchSchema,
+    AnswerBatchResponseSchema,
     LessonResponseSchema,
     ProgressUpdateSchema,
     ProgressResponseSchema,
@@ -20,53 +27,31 @@ from app.schemas import (
 
 router = APIRouter()
 
-@router.get("/units/", response_model=List[UnitWithLessonsSchema])
-async def get_units(
-    db: AsyncSession = Depends(get_db),
-    current_user: Account = Depends(get_current_user)
-):
-    result = await db.execute(
-        select(Unit)
-        .outerjoin(Unit.lessons)
-        .options(contains_eager(Unit.lessons))
-        .where(Unit.archived == False)
-        .where(Lesson.archived == False)
-        .order_by(Unit.order_index, Lesson.order_index)
-    )
-    return result.scalars().unique().all()
-
-@router.get("/", summary="List all lessons", response_model=List[LessonResponseSchema])
-async def list_lessons(
-    db: AsyncSession = Depends(get_db),
-    current_user: Account = Depends(get_current_user)
-):
-    result = await db.execute(
-        select(Lesson)
-        .where(Lesson.archived == False)
-        .order_by(Lesson.order_index)
-    )
-    return result.scalars().all()
+# The content endpoints serve pre-encoded bodies from the catalog snapshot
+# with ETags, answering If-None-Match with a 304; response_model only
+# documents them
+@router.get("/units/", response_model=List[UnitWithLessonsSchema], dependencies=[Depends(get_token_user_id)])
+async def get_units(request: Request):
+    snapshot = await catalog.get_snapshot()
+    return conditional_response(request, snapshot.units)
+
+@router.get(
+    "/",
+    summary="List all lessons",
+    response_model=List[LessonResponseSchema],
+    dependencies=[Depends(get_token_user_id)]
+)
+async def list_lessons(request: Request):
+    snapshot = await catalog.get_snapshot()
+    return conditional_response(request, snapshot.lessons)
 
 @router.get("/{lesson_id}", response_model=LessonResponseSchema)
-async def get_lesson(
-    lesson_id: int, 
-    db: AsyncSession = Depends(get_db),
-):
-    lesson_result = await db.execute(
-        select(Lesson)
-        .outerjoin(Lesson.signs)
-        .options(
-            contains_eager(Lesson.signs),
-        )
-        .where(Lesson.id == lesson_id)
-        .where(Lesson.archived == False)
-        .where(Sign.archived == False)
-    )
-    lesson = lesson_result.scalars().first()
-    if not lesson:
+async def get_lesson(lesson_id: int, request: Request):
+    snapshot = await catalog.get_snapshot()
+    lesson = snapshot.lesson.get(lesson_id)
+    if lesson is None:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    lesson.video_url = lesson.signs[0].video_url if lesson.signs else None
-    return lesson
+    return conditional_response(request, lesson)
 
 @router.get("/user-progress/{user_id}/{lesson_id}", response_model=UserProgressSchema)
 async def get_user_progress(
@@ -89,6 +74,15 @@ async def get_user_progress(
             UserProgress.lesson_id == lesson_id
         )
     )).scalars().first()
+    pending = progress_buffer.progress_for(user_id).get(lesson_id)
+    # Answers this worker has not written yet; a completed row is final
+    if pending is not None and not (progress and progress.completed):
+        return {
+            "progress": pending[0],
+            "completed": False,
+            "last_question": pending[1],
+            "updated_at": datetime.utcnow()
+        }
     if not progress:
         return {
             "user_id": user_id,
@@ -111,14 +105,31 @@ async def refresh_hearts(
     if not profile:
         raise HTTPException(status_code=404, detail="User profile not found")
 
-    now = datetime.utcnow()
-    minutes_passed = (now - profile.hearts_last_updated).total_seconds() / 60
-    hearts_to_add = int(minutes_passed / 10)
-    if hearts_to_add > 0:
-        profile.hearts = min(profile.hearts + hearts_to_add, 5)
-        profile.hearts_last_updated = now - timedelta(minutes=minutes_passed % 10)
-    await db.commit()
-    return {"user_id": profile.user_id, "hearts": profile.hearts}
+    # Regeneration is derived on read; nothing to write
+    hearts = heart_service.of(profile)
+    return {
+        "user_id": profile.user_id,
+        "hearts": hearts.count,
+        "seconds_until_next_heart": hearts.seconds_to_next
+    }
+
+@router.on_event("shutdown")
+async def flush_progress_buffer():
+    # Write answers still waiting in the write-behind buffer
+    await progress_buffer.close()
+
+@router.get("/course-map/{user_id}", response_model=dict)
+async def get_course_map(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Account = Depends(get_current_user)
+):
+    """Every unit and lesson in order with lock state, progress and
+    completion, plus the next lesson to take, for the home screen in one
+    call: the cached course graph and a single progress query."""
+    graph = await course_graph.get_graph(db)
+    progress = await course_graph.user_progress(db, user_id)
+    return {"user_id": user_id, **graph.course_map(progress)}
 
 @router.get("/unit-status/{user_id}/{unit_id}", response_model=dict)
 async def get_unit_status(
@@ -127,53 +138,19 @@ async def get_unit_status(
     db: AsyncSession = Depends(get_db),
     current_user: Account = Depends(get_current_user)
 ):
-    current_unit = (await db.execute(
-        select(Unit)
-        .where(Unit.id == unit_id, Unit.archived == False)
-    )).scalars().first()
-    
+    graph = await course_graph.get_graph(db)
+    current_unit = graph.unit(unit_id)
     if not current_unit:
         raise HTTPException(status_code=404, detail="Unit not found")
-    
-    if current_unit.order_index == 0:
-        return {"is_locked": False}
-    
-    previous_unit = (await db.execute(
-        select(Unit)
-        .where(
-            Unit.order_index < current_unit.order_index,
-            Unit.archived == False
-        )
-        .order_by(Unit.order_index.desc())
-        .limit(1)
-    )).scalars().first()
-    
+
+    previous_unit = graph.previous_unit(unit_id)
     if not previous_unit:
         return {"is_locked": False}
-    
-    lessons = (await db.execute(
-        select(Lesson)
-        .where(Lesson.unit_id == previous_unit.id, Lesson.archived == False)
-    )).scalars().all()
-    
-    if not lessons:
+    if not previous_unit.lesson_ids:
         return {"is_locked": True, "reason": "Previous unit has no lessons"}
-    
-    all_completed = True
-    for lesson in lessons:
-        prog = (await db.execute(
-            select(UserProgress)
-            .where(
-                UserProgress.user_id == user_id,
-                UserProgress.lesson_id == lesson.id
-            )
-        )).scalars().first()
-        
-        if not prog or not prog.completed:
-            all_completed = False
-            break
-    
-    return {"is_locked": not all_completed}
+
+    completed = await course_graph.completed_lessons(db, user_id, previous_unit.lesson_ids)
+    return {"is_locked": graph.unit_locked(unit_id, completed)}
 
 @router.get("/lesson-status/{user_id}/{lesson_id}", response_model=dict)
 async def get_lesson_status(
@@ -182,79 +159,42 @@ async def get_lesson_status(
     db: AsyncSession = Depends(get_db),
     current_user: Account = Depends(get_current_user)
 ):
-    # Get the target lesson
-    lesson = (await db.execute(
-        select(Lesson).where(Lesson.id == lesson_id, Lesson.archived == False)
-    )).scalars().first()
+    graph = await course_graph.get_graph(db)
+    lesson = graph.lessons.get(lesson_id)
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
-    # If it's Unit 1 - Lesson 1, unlock it
-    if lesson.unit_id == 1 and lesson.order_index == 0:
-        return {"is_locked": False}
-
-    # Get all lessons in the same unit ordered
-    prev_lesson = (await db.execute(
-        select(Lesson)
-        .where(
-            Lesson.unit_id == lesson.unit_id,
-            Lesson.order_index < lesson.order_index,
-            Lesson.archived == False
-        )
-        .order_by(Lesson.order_index.desc())
-        .limit(1)
-    )).scalars().first()
-
-    # Case A: it's not the first lesson in unit, check if previous lesson is complete
-    if prev_lesson:
-        progress = (await db.execute(
-            select(UserProgress)
-            .where(
-                UserProgress.user_id == user_id,
-                UserProgress.lesson_id == prev_lesson.id
-            )
-        )).scalars().first()
-        return {"is_locked": not (progress and progress.completed)}
-
-    # Case B: it's the first lesson in unit, so check if previous unit is complete
-    current_unit = (await db.execute(
-        select(Unit).where(Unit.id == lesson.unit_id)
-    )).scalars().first()
-
-    previous_unit = (await db.execute(
-        select(Unit)
-        .where(Unit.order_index < current_unit.order_index)
-        .order_by(Unit.order_index.desc())
-        .limit(1)
-    )).scalars().first()
-
-    if not previous_unit:
-        return {"is_locked": False}
-
-    prev_lessons = (await db.execute(
-        select(Lesson)
-        .where(
-            Lesson.unit_id == previous_unit.id,
-            Lesson.archived == False
-        )
-    )).scalars().all()
-
-    for l in prev_lessons:
-        p = (await db.execute(
-            select(UserProgress).where(
-                UserProgress.user_id == user_id,
-                UserProgress.lesson_id == l.id
-            )
-        )).scalars().first()
-        if not p or not p.completed:
-            return {"is_locked": True}
-
-    return {"is_locked": False}
+    # The previous lesson in the unit and the previous unit's lessons are
+    # all the lock state depends on
+    previous_unit = graph.previous_unit(lesson.unit_id)
+    needed = list(previous_unit.lesson_ids) if previous_unit else []
+    previous_lesson = graph.previous_lesson(lesson_id)
+    if previous_lesson is not None:
+        needed.append(previous_lesson)
+    completed = await course_graph.completed_lessons(db, user_id, needed) if needed else set()
+    return {"is_locked": graph.lesson_locked(lesson_id, completed)}
 
 
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 
+def _advance_streak(profile: UserProfile):
+    """Streak bookkeeping for a completed lesson: the first lesson of the
+    day after the last one extends the streak, a gap restarts it."""
+    today = datetime.utcnow().date()
+    last_date = (
+        profile.last_lesson_date.date()
+        if profile.last_lesson_date
+        else None
+    )
+    if last_date == today:
+        pass
+    elif last_date == today - timedelta(days=1):
+        profile.streak += 1
+    else:
+        profile.streak = 1
+    profile.last_lesson_date = datetime.utcnow()
+
 @router.patch(
     "/update-progress/{user_id}/{lesson_id}",
     response_model=ProgressResponseSchema
@@ -266,38 +206,142 @@ async def update_progress(
     db: AsyncSession = Depends(get_db),
     current_user: Account = Depends(get_current_user)
 ):
+    new_prog = max(0, min(progress_data.progress, 100))
     try:
+        # A completion grants rubies, so it must see the buffered answers
+        if new_prog >= 100:
+            await progress_buffer.flush_user(user_id)
+
         lesson = (
             await db.execute(
                 select(Lesson)
+                .options(noload(Lesson.signs))
                 .where(Lesson.id == lesson_id, Lesson.archived.is_(False))
             )
         ).scalars().first()
         if not lesson:
             raise HTTPException(404, "Lesson not found or archived")
 
-        up = (
-            await db.execute(
-                select(UserProgress)
-                .where(
-                    UserProgress.user_id == user_id,
+        # The profile and whether this lesson was already completed, in one
+        # round trip through the (user_id, lesson_id) key
+        query = (
+            select(UserProfile, UserProgress.completed)
+            .outerjoin(
+                UserProgress,
+                and_(
+                    UserProgress.user_id == UserProfile.user_id,
                     UserProgress.lesson_id == lesson_id
                 )
             )
-        ).scalars().first()
-        if not up:
-            up = UserProgress(
-                user_id=user_id,
-                lesson_id=lesson_id,
-                progress=0,
-                completed=False,
-                last_question=0
-            )
-            db.add(up)
+            .where(UserProfile.user_id == user_id)
+        )
+        if not progress_data.is_correct:
+            # Spending a heart rewrites the count; serialize with other workers
+            query = query.with_for_update()
+        row = (await db.execute(query)).first()
+        if not row:
+            raise HTTPException(404, "User profile not found")
+        profile, completed = row[0], bool(row[1])
+
+        if progress_buffer.enabled and (new_prog < 100 or completed):
+            # Nothing to reward: progress is merged in memory and written
+            # behind, but a lost heart is persisted before answering
+            if not progress_data.is_correct:
+                heart_service.spend(profile)
+                await db.commit()
+            progress_buffer.add(user_id, lesson_id, new_prog, progress_data.current_question)
+            return {
+                "progress": new_prog,
+                "completed": completed,
+                "hearts_remaining": heart_service.of(profile).count,
+                "rubies_earned": 0,
+                "next_lesson_unlocked": False
+            }
+
+        await progress_store.save_progress(
+            db, user_id, lesson_id, new_prog, progress_data.current_question
+        )
 
-        new_prog = max(0, min(progress_data.progress, 100))
-        up.progress = new_prog
-        up.last_question = progress_data.current_question
+        if not progress_data.is_correct:
+            heart_service.spend(profile)
+
+        rubies_earned = 0
+        next_unlocked = False
+        if new_prog >= 100 and not completed:
+            completed = True
+            # Of two racing submits only one flips the flag and is rewarded
+            if await progress_store.mark_completed(db, user_id, lesson_id):
+                profile.rubies += lesson.rubies_reward
+                rubies_earned = lesson.rubies_reward
+
+                _advance_streak(profile)
+
+                # Completing the last lesson of a unit opens the next unit
+                # only once every lesson of this one is done
+                graph = await course_graph.get_graph(db)
+                next_id = graph.next_lesson(lesson.id) if lesson.id in graph.lessons else None
+                if next_id is not None:
+                    completed_ids = await course_graph.completed_lessons(db, user_id)
+                    completed_ids.add(lesson.id)
+                    next_unlocked = not graph.lesson_locked(next_id, completed_ids)
+
+        await db.commit()
+
+        return {
+            "progress": new_prog,
+            "completed": completed,
+            "hearts_remaining": heart_service.of(profile).count,
+            "rubies_earned": rubies_earned,
+            "next_lesson_unlocked": next_unlocked
+        }
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise HTTPException(500, "Could not update progress")
+
+
+@router.post("/submit-answers/{user_id}", response_model=AnswerBatchResponseSchema)
+async def submit_answers(
+    user_id: int,
+    batch: AnswerBatchSchema,
+    db: AsyncSession = Depends(get_db),
+    current_user: Account = Depends(get_current_user)
+):
+    """Apply a queue of answers, for one or more lessons, in one
+    transaction with /update-progress's rules: every wrong answer costs a
+    heart, the last answer of a lesson sets its progress and question, and
+    reaching 100 completes it once, with its rubies and the streak."""
+    answers = batch.answers
+    if not answers:
+        raise HTTPException(400, "No answers to submit")
+    if len(answers) > LESSON_ANSWER_MAX_BATCH:
+        raise HTTPException(400, f"At most {LESSON_ANSWER_MAX_BATCH} answers per request")
+    stamped = [a.answered_at for a in answers if a.answered_at is not None]
+    if any(later < earlier for earlier, later in zip(stamped, stamped[1:])):
+        raise HTTPException(400, "Answers must be sent in the order they were given")
+
+    try:
+        # Absolute progress and rubies are written below, after anything
+        # /update-progress buffered
+        await progress_buffer.flush_user(user_id)
+
+        lesson_ids = list(dict.fromkeys(a.lesson_id for a in answers))
+        lessons = {
+            lesson.id: lesson
+            for lesson in (
+                await db.execute(
+                    select(Lesson)
+                    .options(noload(Lesson.signs))
+                    .where(Lesson.id.in_(lesson_ids), Lesson.archived.is_(False))
+                )
+            ).scalars()
+        }
+        missing = [lesson_id for lesson_id in lesson_ids if lesson_id not in lessons]
+        if missing:
+            raise HTTPException(404, f"Lessons not found or archived: {missing}")
 
         profile = (
             await db.execute(
@@ -307,45 +351,80 @@ async def update_progress(
         if not profile:
             raise HTTPException(404, "User profile not found")
 
-        if not progress_data.is_correct:
-            profile.hearts = max(profile.hearts - 1, 0)
-
-        rubies_earned = 0
-        next_unlocked = False
-        if new_prog >= 100 and not up.completed:
-            up.completed = True
-            profile.rubies += lesson.rubies_reward
-            rubies_earned = lesson.rubies_reward
-
-            today = datetime.utcnow().date()
-            last_date = (
-                profile.last_lesson_date.date()
-                if profile.last_lesson_date
-                else None
-            )
-            if last_date == today:
-                pass
-            elif last_date == today - timedelta(days=1):
-                profile.streak += 1
-            else:
-                profile.streak = 1
-            profile.last_lesson_date = datetime.utcnow()
-
-            nxt = (
+        already_completed = {
+            lesson_id
+            for lesson_id, completed in (
                 await db.execute(
-                    select(Lesson).where(Lesson.id == lesson.id + 1)
+                    select(UserProgress.lesson_id, UserProgress.completed)
+                    .where(
+                        UserProgress.user_id == user_id,
+                        UserProgress.lesson_id.in_(lesson_ids)
+                    )
                 )
-            ).scalars().first()
-            next_unlocked = bool(nxt)
+            ).all()
+            if completed
+        }
+
+        # Replay the answers in memory, then write each lesson's final state
+        state = {
+            lesson_id: {
+                "lesson_id": lesson_id,
+                "progress": 0,
+                "completed": lesson_id in already_completed,
+                "last_question": 0,
+                "rubies_earned": 0,
+                "next_lesson_unlocked": False,
+            }
+            for lesson_id in lesson_ids
+        }
+        reached = []
+        wrong = 0
+        for answer in answers:
+            lesson_state = state[answer.lesson_id]
+            lesson_state["progress"] = max(0, min(answer.progress, 100))
+            lesson_state["last_question"] = answer.question
+            if not answer.is_correct:
+                wrong += 1
+            if lesson_state["progress"] >= 100 and not lesson_state["completed"]:
+                lesson_state["completed"] = True
+                reached.append(answer.lesson_id)
+
+        heart_service.spend(profile, wrong)
+
+        await progress_store.save_progress_many(
+            db, user_id,
+            {lesson_id: (s["progress"], s["last_question"]) for lesson_id, s in state.items()}
+        )
+
+        rubies_earned = 0
+        newly_completed = []
+        for lesson_id in reached:
+            # Of two racing submits only one flips the flag and is rewarded
+            if await progress_store.mark_completed(db, user_id, lesson_id):
+                reward = lessons[lesson_id].rubies_reward or 0
+                profile.rubies += reward
+                rubies_earned += reward
+                state[lesson_id]["rubies_earned"] = reward
+                _advance_streak(profile)
+                newly_completed.append(lesson_id)
+
+        if newly_completed:
+            graph = await course_graph.get_graph(db)
+            completed_ids = await course_graph.completed_lessons(db, user_id)
+            completed_ids.update(newly_completed)
+            for lesson_id in newly_completed:
+                next_id = graph.next_lesson(lesson_id) if lesson_id in graph.lessons else None
+                if next_id is not None:
+                    state[lesson_id]["next_lesson_unlocked"] = not graph.lesson_locked(next_id, completed_ids)
 
         await db.commit()
 
         return {
-            "progress": up.progress,
-            "completed": up.completed,
-            "hearts_remaining": profile.hearts,
+            "lessons": list(state.values()),
+            "hearts_remaining": heart_service.of(profile).count,
             "rubies_earned": rubies_earned,
-            "next_lesson_unlocked": next_unlocked
+            "rubies": profile.rubies,
+            "streak": profile.streak,
         }
 
     except HTTPException:
@@ -353,7 +432,7 @@ async def update_progress(
         raise
     except Exception:
         await db.rollback()
-        raise HTTPException(500, "Could not update progress")
+        raise HTTPException(500, "Could not save answers")
 
 
 @router.get("/unit-progress/{user_id}/{unit_id}", response_model=UnitProgressResponse, status_code=status.HTTP_200_OK)
@@ -363,36 +442,22 @@ async def get_unit_progress(
     db: AsyncSession = Depends(get_db),
     current_user: Account = Depends(get_current_user)
 ):
-    lessons = (await db.execute(
-        select(Lesson)
-        .where(Lesson.unit_id == unit_id, Lesson.archived == False)
-    )).scalars().all()
-    if not lessons:
+    graph = await course_graph.get_graph(db)
+    unit = graph.unit(unit_id)
+    if not unit or not unit.lesson_ids:
         return UnitProgressResponse(
             progress_percentage=0.0,
             completed_lessons=0,
             total_lessons=0
         )
 
-    total = 0
-    completed = 0
-    for lesson in lessons:
-        prog = (await db.execute(
-            select(UserProgress)
-            .where(
-                UserProgress.user_id == user_id,
-                UserProgress.lesson_id == lesson.id
-            )
-        )).scalars().first()
-        if prog:
-            total += prog.progress
-            if prog.completed:
-                completed += 1
-
+    progress = await course_graph.user_progress(db, user_id, unit.lesson_ids)
+    total = sum(p.progress or 0 for p in progress.values())
+    completed = sum(1 for p in progress.values() if p.completed)
     return UnitProgressResponse(
-        progress_percentage=total / len(lessons),
+        progress_percentage=total / len(unit.lesson_ids),
         completed_lessons=completed,
-        total_lessons=len(lessons)
+        total_lessons=len(unit.lesson_ids)
     )
 
 # This endpoint is causing the 401 error - update it to make it public
@@ -417,6 +482,9 @@ async def get_lesson_progress(
             UserProgress.lesson_id == lesson_id
         )
     )).scalars().first()
+    pending = progress_buffer.progress_for(user_id).get(lesson_id)
+    if pending is not None and not (prog and prog.completed):
+        return {"progress": pending[0], "completed": False}
     if not prog:
         return {"progress": 0, "completed": False}
     return {"progress": prog.progress, "completed": prog.completed}
@@ -424,59 +492,37 @@ async def get_lesson_progress(
 @router.get("/daily-challenges/{user_id}", response_model=LessonResponseSchema)
 async def get_daily_challenges(
     user_id: int, 
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: Account = Depends(get_current_user)
 ):
-    completed_progress = await db.execute(
-        select(UserProgress)
-        .where(
-            UserProgress.user_id == user_id,
-            UserProgress.completed == True
-        )
-    )
-    completed_lesson_ids = [p.lesson_id for p in completed_progress.scalars().all()]
-    
-    if not completed_lesson_ids:
-        raise HTTPException(
-            status_code=404, 
-            detail="No completed lessons found. Complete lessons to unlock daily challenges."
-        )
-    
-    profile = (await db.execute(
-        select(UserProfile).where(UserProfile.user_id == user_id)
-    )).scalars().first()
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="User profile not found")
-    
+    # The day's lesson is picked once and stored; later calls are one keyed
+    # read and the lesson body comes from the catalog snapshot
     current_date = datetime.utcnow().date()
-    if profile.last_challenge_date and profile.last_challenge_date.date() == current_date:
+    found = await daily_challenge.lookup(db, user_id, current_date)
+    if found is None:
+        raise HTTPException(status_code=404, detail="User profile not found")
+    last_challenge_date, challenge_id = found
+
+    if last_challenge_date and last_challenge_date.date() == current_date:
         raise HTTPException(
             status_code=400, 
             detail="Daily challenge already completed today. Come back tomorrow!"
         )
-    
-    import random
-    challenge_id = random.choice(completed_lesson_ids)
-    
-    challenge_lesson = await db.execute(
-        select(Lesson)
-        .where(
-            Lesson.id == challenge_id,
-            Lesson.archived == False
-        )
-        .options(
-            selectinload(Lesson.signs),
-        )
-    )
-    
-    lesson = challenge_lesson.scalars().first()
-    if not lesson:
+
+    if challenge_id is None:
+        challenge_id = await daily_challenge.assign(db, user_id, current_date)
+        if challenge_id is None:
+            raise HTTPException(
+                status_code=404, 
+                detail="No completed lessons found. Complete lessons to unlock daily challenges."
+            )
+
+    snapshot = await catalog.get_snapshot()
+    lesson = snapshot.lesson.get(challenge_id)
+    if lesson is None:
         raise HTTPException(status_code=404, detail="Challenge lesson not found")
-    
-    lesson.video_url = lesson.signs[0].video_url if lesson.signs else None
-    
-    return lesson
+    return conditional_response(request, lesson)
 
 @router.post("/complete-daily-challenge/{user_id}", response_model=dict)
 async def complete_daily_challenge(
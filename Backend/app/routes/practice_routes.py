@@ -1,12 +1,15 @@
 # app/routers/practice_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Dict, Any
 import traceback
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_token_user_id
+from app.services import catalog, heart_service
+from app.services.http_cache import conditional_response
+from app.services.progress_buffer import buffer as progress_buffer
 from app.services.practice_service import (
     get_practice_signs,
     update_progress,
@@ -19,10 +22,10 @@ from app.schemas import (
 from app.models import UserProfile
 
 
-router = APIRouter(dependencies=[Depends(get_current_user)])
+router = APIRouter()
 
 
-@router.get("/signs/{user_id}/{difficulty}", response_model=List[Dict[str, Any]])
+@router.get("/signs/{user_id}/{difficulty}", response_model=List[Dict[str, Any]], dependencies=[Depends(get_current_user)])
 async def get_signs(user_id: int, difficulty: str, db: AsyncSession = Depends(get_db)):
     """Get signs for a specific difficulty level"""
     try:
@@ -36,7 +39,7 @@ async def get_signs(user_id: int, difficulty: str, db: AsyncSession = Depends(ge
             detail=f"Error retrieving signs: {str(e)}"
         )
 
-@router.get("/hearts/{user_id}", response_model=Dict[str, Any])
+@router.get("/hearts/{user_id}", response_model=Dict[str, Any], dependencies=[Depends(get_current_user)])
 async def get_hearts(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user's hearts"""
     try:
@@ -52,7 +55,7 @@ async def get_hearts(user_id: int, db: AsyncSession = Depends(get_db)):
             }
         
         return {
-            "hearts": profile.hearts,
+            "hearts": heart_service.of(profile).count,
             "rubies": profile.rubies
         }
     except Exception as e:
@@ -63,7 +66,7 @@ async def get_hearts(user_id: int, db: AsyncSession = Depends(get_db)):
             detail=f"Error retrieving user hearts: {str(e)}"
         )
 
-@router.post("/update-progress/{user_id}", response_model=Dict[str, Any])
+@router.post("/update-progress/{user_id}", response_model=Dict[str, Any], dependencies=[Depends(get_current_user)])
 async def update_game_progress(
     user_id: int, 
     data: GameScoreUpdateSchema,
@@ -90,10 +93,19 @@ async def update_game_progress(
     
 # Add these routes to your existing practice_routes.py
 
-@router.get("/levels/{user_id}", response_model=Dict[str, Any])
+@router.get("/levels", response_model=List[Dict[str, Any]], dependencies=[Depends(get_token_user_id)])
+async def get_level_metadata(request: Request):
+    """Practice levels and their games without user progress, with an ETag
+    so clients can revalidate instead of downloading them again"""
+    snapshot = await catalog.get_snapshot()
+    return conditional_response(request, snapshot.practice_levels)
+
+@router.get("/levels/{user_id}", response_model=Dict[str, Any], dependencies=[Depends(get_current_user)])
 async def get_levels(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all practice levels with games"""
     try:
+        # Levels are scored from lesson progress, buffered answers included
+        await progress_buffer.flush_user(user_id)
         result = await get_practice_levels(db, user_id)
         return result
     except Exception as e:
@@ -6,6 +6,7 @@ from sqlalchemy.future import select
 from app.dependencies import get_db, get_current_user
 from app.models import Account, UserProfile
 from app.schemas import UserProfileUpdate
+from app.services import heart_service
 from app.auth import hash_password
 import os, uuid
 import shutil
@@ -40,7 +41,7 @@ async def get_profile(user_id: int, db: AsyncSession = Depends(get_db)):
             "profile_url": profile.profile_url,
             "progress": getattr(profile, "progress", {}),
             "rubies": profile.rubies,
-            "hearts": profile.hearts,
+            "hearts": heart_service.of(profile).count,
             "streak": profile.streak,
             "certificate": profile.certificate,
             "updated_at": profile.updated_at,
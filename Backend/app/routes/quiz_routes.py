@@ -1,18 +1,14 @@
 # 📁 Add this to a new `quiz_routes.py` file or existing routes module
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from app.models import Sign
-from app.dependencies import get_db
+from fastapi import APIRouter, HTTPException
+from app.services import catalog
 import random
 
 router = APIRouter(prefix="/quiz", tags=["Quiz"])
 
 @router.get("/generate/{lesson_id}", summary="Generate smart quiz based on lesson")
-async def generate_quiz(lesson_id: int, db: AsyncSession = Depends(get_db)):
-    # 🔍 Fetch signs for the lesson
-    result = await db.execute(select(Sign).where(Sign.lesson_id == lesson_id, Sign.archived == False))
-    signs = result.scalars().all()
+async def generate_quiz(lesson_id: int):
+    # 🔍 Signs for the lesson, from the catalog snapshot
+    signs = (await catalog.get_snapshot()).quiz_signs.get(lesson_id, ())
 
     if not signs or len(signs) < 2:
         raise HTTPException(status_code=400, detail="Not enough signs in this lesson to generate a quiz.")
@@ -0,0 +1,122 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config import RECOGNITION_SERVICE_SOCKET, RECOGNITION_SERVICE_TIMEOUT
+
+# Forwards /api/recognition to the standalone recognition service
+# (app/recognition_app.py) over a unix socket, for RECOGNITION_MODE=remote.
+# Auth headers and query strings pass through untouched; the recognition
+# service checks tokens itself.
+router = APIRouter()
+
+# httpx and websockets are imported on first use to keep them out of the
+# API's startup time
+
+# Hop-by-hop headers, plus the ones httpx / Starlette recompute
+_SKIP_HEADERS = {
+    "host", "connection", "keep-alive", "transfer-encoding", "upgrade",
+    "content-length", "content-encoding", "te", "trailer", "proxy-authorization",
+}
+
+_client = None
+
+
+def _filter_headers(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in _SKIP_HEADERS}
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=RECOGNITION_SERVICE_SOCKET),
+            base_url="http://recognition",
+            timeout=RECOGNITION_SERVICE_TIMEOUT,
+        )
+    return _client
+
+@router.on_event("shutdown")
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+@router.websocket("/stream")
+async def proxy_stream(websocket: WebSocket):
+    import websockets
+
+    uri = f"ws://recognition{websocket.url.path}"
+    if websocket.url.query:
+        uri += f"?{websocket.url.query}"
+    headers = [(k, v) for k, v in websocket.headers.items() if k.lower() == "authorization"]
+    try:
+        upstream = await websockets.unix_connect(
+            RECOGNITION_SERVICE_SOCKET, uri, additional_headers=headers, max_size=None
+        )
+    except websockets.InvalidStatus:
+        # The recognition service refused the socket (bad token or params)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    except (OSError, websockets.WebSocketException) as e:
+        print(f"❌ Recognition service unavailable: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    await websocket.accept()
+
+    async def client_to_upstream():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                await upstream.send(message["bytes"])
+            else:
+                await upstream.send(message.get("text") or "")
+
+    async def upstream_to_client():
+        async for message in upstream:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+        await websocket.close()
+
+    tasks = [asyncio.ensure_future(client_to_upstream()), asyncio.ensure_future(upstream_to_client())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await upstream.close()
+
+@router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"], include_in_schema=False)
+async def proxy(path: str, request: Request):
+    import httpx
+
+    client = _get_client()
+    upstream_request = client.build_request(
+        request.method,
+        request.url.path,
+        params=request.url.query,
+        headers=_filter_headers(request.headers),
+        content=request.stream(),
+    )
+    try:
+        response = await client.send(upstream_request, stream=True)
+    except httpx.TransportError as e:
+        raise HTTPException(status_code=503, detail=f"Recognition service unavailable: {str(e)}")
+
+    # Streamed through so model downloads are never held in memory whole
+    return StreamingResponse(
+        response.aiter_bytes(),
+        status_code=response.status_code,
+        headers=_filter_headers(response.headers),
+        background=BackgroundTask(response.aclose),
+    )
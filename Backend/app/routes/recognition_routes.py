@@ -1,125 +1,569 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import numpy as np
-import cv2
-import base64
-import tensorflow as tf
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 from pathlib import Path
-import os
+import base64
+import numpy as np
+
+from app.config import (
+    RECOGNITION_STREAM_WINDOW, RECOGNITION_STREAM_DIFF_THRESHOLD, RECOGNITION_CLIP_MAX_FRAMES,
+    RECOGNITION_LANDMARK_MAX_BATCH
+)
+from app.db import async_session
+from app.dependencies import get_db, get_websocket_user, get_admin_user
+from app.models import Account
+from app.services import recognition_service, model_registry, model_distribution, process_memory, fingerspelling
+from app.services.frame_capture import capture
+from app.services.http_cache import etag_matches
+from app.services.recognition_service import (
+    decode_image_with_signature, predict_cached, predict_encoded, predict_rgb,
+    predict_clip, aggregate_predictions, lesson_mask
+)
+from app.services.label_sets import LabelSet
+from app.services.landmark_classifier import FEATURES, get_classifier, normalize_landmarks
+from app.services.prediction_smoother import PredictionSmoother, signature_distance
 
 router = APIRouter()
 
-# Global variable to store the model
-model = None
+# Upper bound for the ``top_k`` query parameter
+MAX_TOP_K = 10
 
 class ImageRequest(BaseModel):
     image: str
 
+class LandmarkRequest(BaseModel):
+    # 21 [x, y, z] hand landmarks, or the same 63 numbers flattened
+    landmarks: Union[List[List[float]], List[float]]
+    handedness: Optional[str] = None
+
+class LandmarkBatchRequest(BaseModel):
+    # One flattened 63-number landmark vector per frame
+    frames: List[List[float]]
+    # "left" / "right" per frame; left hands are mirrored
+    handedness: Optional[List[str]] = None
+
+class SpellRequest(BaseModel):
+    # One model output vector per frame, in order
+    probabilities: List[List[float]]
+    top_n: int = 3
+
+async def _spelling_session(db: AsyncSession, labels):
+    try:
+        return await fingerspelling.open_session(db, labels)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _candidate_mask(db: AsyncSession, lesson_id: Optional[int], rt):
+    """Class mask restricting answers to one lesson's signs, or None."""
+    if lesson_id is None:
+        return None
+    try:
+        return await lesson_mask(db, lesson_id, rt)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.on_event("startup")
 async def load_model():
-    global model
     try:
-        model_path = Path("models/model.h5")
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found at {model_path}")
-        
-        model = tf.keras.models.load_model(str(model_path))
+        await recognition_service.start_recognition()
         print("✅ Model loaded successfully!")
-        print(model.summary())
     except Exception as e:
         print(f"❌ Failed to load model: {e}")
-        model = None
+
+@router.on_event("shutdown")
+async def unload_model():
+    await recognition_service.stop_recognition()
+    # Flush captured frames still queued for the writer
+    await run_in_threadpool(capture.stop)
 
 @router.get("/model-status")
 async def model_status():
-    global model
-    is_loaded = model is not None
-    print(f"Model status requested: {'Loaded' if is_loaded else 'Not loaded'}")
-    return {"model_loaded": is_loaded}
+    status = recognition_service.model_status()
+    print(f"Model status requested: {'Loaded' if status['model_loaded'] else 'Not loaded'}")
+    return status
 
-@router.post("/predict-base64")
-async def predict_from_base64(request: ImageRequest):
-    global model
-    if model is None:
+@router.get("/admin/models")
+async def list_model_versions(admin_user = Depends(get_admin_user)):
+    runtime = recognition_service.runtime
+    return {
+        "active_version": runtime.version if runtime is not None else None,
+        "registry_active_version": model_registry.get_active_version(),
+        "activation": dict(recognition_service.activation),
+        "versions": [v.to_dict() for v in model_registry.list_versions()],
+    }
+
+@router.post("/admin/models/{version}/activate", status_code=202)
+async def activate_model_version(version: str, admin_user = Depends(get_admin_user)):
+    """Load and warm up ``version`` in the background, then switch to it.
+    Poll ``/model-status`` to see when it is active."""
+    try:
+        return recognition_service.activate_version(version)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/admin/memory")
+async def memory_report(admin_user = Depends(get_admin_user)):
+    """Resident and shared memory of this server worker, its sibling workers
+    and its inference processes, to check how much of the model is shared."""
+    runtime = recognition_service.runtime
+    pool_pids = runtime.pool.worker_pids if runtime is not None and runtime.pool is not None else []
+    report = process_memory.memory_report(pool_pids)
+    report["recognition_mode"] = runtime.stats()["mode"] if runtime is not None else None
+    return report
+
+@router.get("/labels")
+async def model_labels():
+    """Class index -> label / sign id mapping of the active model version."""
+    runtime = recognition_service.runtime
+    if runtime is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    return {"version": runtime.version, **runtime.labels.to_manifest()}
+
+@router.get("/mobile/manifest")
+async def mobile_manifest(request: Request, current_version: Optional[str] = None,
+                          current_sha256: Optional[str] = None):
+    """Active model version for on-device recognition: each mobile format's
+    size, sha256 and download URL, plus the label mapping. Devices send what
+    they have installed (``current_version`` / ``current_sha256``) and only
+    download when ``update_available`` is true; ``If-None-Match`` with the
+    last ETag gets a 304 while nothing changed."""
+    url_prefix = request.url.path.rsplit("/", 1)[0] + "/models"
+    try:
+        # Hashing a freshly converted model reads the whole file
+        manifest = await run_in_threadpool(model_distribution.build_manifest, url_prefix)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    etag = model_distribution.manifest_etag(manifest)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if current_sha256 is not None:
+        installed = any(f["sha256"] == current_sha256 for f in manifest["formats"].values())
+        manifest["update_available"] = not installed
+    elif current_version is not None:
+        # The version string carries a hash of the files, so a re-conversion
+        # of the same model version counts as an update
+        manifest["update_available"] = current_version != manifest["version"]
+    return JSONResponse(manifest, headers=headers)
+
+@router.get("/mobile/models/{ref}/{fmt}")
+async def download_mobile_model(ref: str, fmt: str, request: Request):
+    """One mobile model file, by sha256 (the manifest's URLs) or by version
+    name. Hashed URLs never change content and are cacheable forever; a
+    version name follows re-conversions, so it is revalidated every time.
+    Supports single ``Range`` requests (206) to resume interrupted
+    downloads, guarded by ``If-Range``."""
+    hashed = model_distribution.is_digest(ref)
+    try:
+        if hashed:
+            version, path = await run_in_threadpool(model_distribution.artifact_by_digest, ref, fmt)
+            digest = ref
+        else:
+            version = ref
+            path = model_distribution.artifact_path(ref, fmt)
+            digest = await run_in_threadpool(model_distribution.file_digest, path)
+    except (LookupError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    size = path.stat().st_size
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable" if hashed else "no-cache",
+        "Content-Disposition": f'attachment; filename="{version}-{path.name}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # A resume against a different file than the client started must
+    # restart: If-Range only matches the exact strong ETag (RFC 9110)
+    if if_range is None or if_range.strip() == etag:
         try:
-            model_path = Path("models/model.h5")
-            model = tf.keras.models.load_model(str(model_path))
-            print("✅ Model loaded successfully!")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model not loaded: {str(e)}")
-    
+            byte_range = model_distribution.parse_range(request.headers.get("range"), size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        model_distribution.iter_file(path, start, end),
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+@router.get("/batcher-stats")
+async def batcher_stats():
+    """Queue depth and batch fill of the inference batcher, for tuning
+    RECOGNITION_MAX_BATCH_SIZE / RECOGNITION_MAX_WAIT_MS."""
+    stats = recognition_service.recognition_stats()
+    stats["capture"] = capture.stats()
+    return stats
+
+@router.post("/predict-base64")
+async def predict_from_base64(
+    request: ImageRequest,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    expected: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """``lesson_id`` restricts the answer to that lesson's signs; ``top_k``
+    adds the best ``top_k`` candidates to the response. ``expected`` is the
+    answer the user was asked to sign; with frame capture on, frames the
+    model gets wrong are kept for retraining."""
+    try:
+        runtime = await recognition_service.get_runtime()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model not loaded: {str(e)}")
+    mask = await _candidate_mask(db, lesson_id, runtime)
+
     try:
         # Decode base64 image
         img_data = base64.b64decode(request.image)
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(img_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        # Preprocess the image
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = cv2.resize(img, (224, 224))  # Resize to match model input size
-        img = img / 255.0  # Normalize
-        
-        # Add batch dimension
-        img = np.expand_dims(img, axis=0)
-        
-        # Make prediction
-        prediction = model.predict(img)
-        
-        # Get the highest probability class
-        predicted_class_index = np.argmax(prediction[0])
-        confidence = float(prediction[0][predicted_class_index])
-        
-        # Map index to letter (assuming ASL alphabet A-Z)
-        letters = "abcdefghijklmnopqrstuvwxyz"
-        if 0 <= predicted_class_index < len(letters):
-            letter = letters[predicted_class_index]
-        else:
-            letter = "unknown"
-        
-        return {"letter": letter, "confidence": confidence}
-    
+
+        # Make prediction as part of the next batch
+        prediction = await predict_encoded(img_data, runtime)
+        result = runtime.labels.decode(prediction, mask, top_k)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+    capture.offer(img_data, result, runtime.version, "predict-base64", expected)
+    return result
+
 @router.post("/predict-file")
-async def predict_from_file(request: Request):
-    global model
-    if model is None:
+async def predict_from_file(
+    request: Request,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    expected: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    if not recognition_service.is_model_loaded():
         raise HTTPException(status_code=500, detail="Model not loaded")
-    
+    runtime = recognition_service.runtime
+    mask = await _candidate_mask(db, lesson_id, runtime)
+
     try:
         form = await request.form()
         contents = await form["file"].read()
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        # Preprocess the image
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = cv2.resize(img, (224, 224))
-        img = img / 255.0
-        
-        # Add batch dimension
-        img = np.expand_dims(img, axis=0)
-        
-        # Make prediction
-        prediction = model.predict(img)
-        
-        # Get the highest probability class
-        predicted_class_index = np.argmax(prediction[0])
-        confidence = float(prediction[0][predicted_class_index])
-        
-        # Map index to letter (assuming ASL alphabet A-Z)
-        letters = "abcdefghijklmnopqrstuvwxyz"
-        if 0 <= predicted_class_index < len(letters):
-            letter = letters[predicted_class_index]
+
+        # Make prediction as part of the next batch
+        prediction = await predict_encoded(contents, runtime)
+        result = runtime.labels.decode(prediction, mask, top_k)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    capture.offer(contents, result, runtime.version, "predict-file", expected)
+    return result
+
+@router.post("/predict-raw")
+async def predict_from_raw(
+    request: Request,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    expected: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Predict from the raw request body (``application/octet-stream``).
+
+    The body is either JPEG/PNG bytes, or, when ``width`` and ``height`` are
+    given, a packed ``height x width x 3`` uint8 RGB tensor. Skips the
+    base64 and JSON overhead of ``/predict-base64``.
+    """
+    if not recognition_service.is_model_loaded():
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    runtime = recognition_service.runtime
+    mask = await _candidate_mask(db, lesson_id, runtime)
+
+    body = await request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty request body")
+    if (width is None) != (height is None):
+        raise HTTPException(status_code=400, detail="Pass both width and height for raw RGB frames")
+
+    try:
+        if width is not None:
+            prediction = await predict_rgb(body, width, height, runtime)
         else:
-            letter = "unknown"
-        
-        return {"letter": letter, "confidence": confidence}
-    
+            prediction = await predict_encoded(body, runtime)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    result = runtime.labels.decode(prediction, mask, top_k)
+    capture.offer(body, result, runtime.version, "predict-raw", expected, width, height)
+    return result
+
+@router.post("/predict-clip")
+async def predict_from_clip(
+    request: Request,
+    max_frames: int = RECOGNITION_CLIP_MAX_FRAMES,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    spell: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Predict a whole signing attempt in one request.
+
+    Multipart form with either a ``video`` file (e.g. MP4) or several
+    ``frames`` image files. Up to ``max_frames`` evenly spaced frames are
+    sampled and run through the model as a single batch; the response has
+    the per-frame letters and the aggregated answer for the attempt. With
+    ``spell`` the frames are also decoded as a fingerspelled word.
+    """
+    if not recognition_service.is_model_loaded():
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    max_frames = max(1, min(max_frames, RECOGNITION_CLIP_MAX_FRAMES))
+    runtime = recognition_service.runtime
+    mask = await _candidate_mask(db, lesson_id, runtime)
+    session = await _spelling_session(db, runtime.labels) if spell else None
+
+    form = await request.form()
+    video = form.get("video")
+    frames = [f for f in form.getlist("frames") if hasattr(f, "read")]
+    if video is None and not frames:
+        raise HTTPException(status_code=400, detail="Upload a 'video' file or one or more 'frames' images")
+
+    try:
+        if video is not None:
+            suffix = Path(video.filename or "").suffix or ".mp4"
+            predictions = await predict_clip(
+                video=await video.read(), video_suffix=suffix, max_frames=max_frames, rt=runtime
+            )
+        else:
+            images = [await f.read() for f in frames]
+            predictions = await predict_clip(images=images, max_frames=max_frames, rt=runtime)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    result = aggregate_predictions(predictions, runtime.labels, mask, top_k)
+    result["frames"] = runtime.labels.decode_batch(predictions, mask)
+    if session is not None:
+        result["spelling"] = session.decode(predictions)
+    return result
+
+def _landmark_classifier():
+    try:
+        return get_classifier()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="No landmark classifier has been built")
+
+def _landmark_features(values, handedness: Optional[List[str]]) -> np.ndarray:
+    try:
+        points = np.asarray(values, dtype=np.float32)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Every frame needs the same number of landmark values")
+    if points.size == 0 or points.size % FEATURES:
+        raise HTTPException(status_code=400, detail=f"Expected {FEATURES} landmark values per frame")
+    frames = points.size // FEATURES
+    if frames > RECOGNITION_LANDMARK_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {RECOGNITION_LANDMARK_MAX_BATCH} frames per request")
+    if not np.isfinite(points).all():
+        raise HTTPException(status_code=400, detail="Landmarks must be finite numbers")
+    if handedness is not None and len(handedness) != frames:
+        raise HTTPException(status_code=400, detail="Give one handedness per frame")
+    left = [h.lower() == "left" for h in handedness] if handedness is not None else None
+    return normalize_landmarks(points, left)
+
+@router.post("/predict-landmarks")
+async def predict_from_landmarks(
+    request: LandmarkRequest,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    db: AsyncSession = Depends(get_db),
+):
+    """Classify one frame of 21 hand landmarks computed on the device (e.g.
+    MediaPipe Hands) instead of an image. No CNN pass is involved."""
+    classifier = _landmark_classifier()
+    mask = await _candidate_mask(db, lesson_id, classifier)
+    handedness = [request.handedness] if request.handedness else None
+    features = _landmark_features(request.landmarks, handedness)
+    if len(features) != 1:
+        raise HTTPException(status_code=400, detail="Send one frame, or use /predict-landmarks/batch")
+    return classifier.labels.decode(classifier.predict(features)[0], mask, top_k)
+
+@router.post("/predict-landmarks/batch")
+async def predict_from_landmarks_batch(
+    request: Request,
+    lesson_id: Optional[int] = None,
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    db: AsyncSession = Depends(get_db),
+):
+    """Classify many landmark frames in one call.
+
+    JSON body as ``LandmarkBatchRequest``, or an ``application/octet-stream``
+    body of little-endian float32 values, 63 per frame (252 bytes a frame).
+    """
+    classifier = _landmark_classifier()
+    mask = await _candidate_mask(db, lesson_id, classifier)
+
+    if request.headers.get("content-type", "").startswith("application/octet-stream"):
+        body = await request.body()
+        if len(body) % 4:
+            raise HTTPException(status_code=400, detail="Body must be float32 values")
+        features = _landmark_features(np.frombuffer(body, dtype="<f4"), None)
+    else:
+        try:
+            batch = LandmarkBatchRequest.parse_raw(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        features = _landmark_features(batch.frames, batch.handedness)
+
+    return {"predictions": classifier.labels.decode_batch(classifier.predict(features), mask, top_k)}
+
+@router.post("/spell")
+async def spell_word(request: SpellRequest, db: AsyncSession = Depends(get_db)):
+    """Decode per-frame model outputs (e.g. collected by the client) into
+    the most likely fingerspelled word among the active signs."""
+    if not request.probabilities:
+        raise HTTPException(status_code=400, detail="No frames given")
+    runtime = recognition_service.runtime
+    labels = runtime.labels if runtime is not None else LabelSet.default()
+    session = await _spelling_session(db, labels)
+    try:
+        return session.decode(np.asarray(request.probabilities, dtype=np.float32), max(1, request.top_n))
+    except (ValueError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid probabilities: {str(e)}")
+
+@router.websocket("/stream")
+async def stream_recognition(
+    websocket: WebSocket,
+    window: int = RECOGNITION_STREAM_WINDOW,
+    mode: str = "ema",
+    lesson_id: Optional[int] = None,
+    top_k: int = 1,
+    spell: bool = False,
+    user: Optional[Account] = Depends(get_websocket_user),
+):
+    """Live recognition over one authenticated socket.
+
+    The client sends each camera frame as a binary JPEG/PNG message and gets
+    back a JSON message with the prediction smoothed over the last ``window``
+    frames (``mode`` is ``ema`` or ``vote``). Frames nearly identical to the
+    last inferred one skip the model. Send the text message ``reset`` to
+    clear the smoothing window, e.g. between letters. ``lesson_id`` and
+    ``top_k`` work as on the predict endpoints. With ``spell`` every message
+    also carries the most likely fingerspelled ``word`` so far; ``reset``
+    starts a new word.
+    """
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if mode not in ("ema", "vote") or not 1 <= top_k <= MAX_TOP_K:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        runtime = await recognition_service.get_runtime()
+    except Exception as e:
+        print(f"❌ Failed to load model: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+    try:
+        # Short-lived session, as in get_websocket_user
+        async with async_session() as db:
+            mask = await _candidate_mask(db, lesson_id, runtime)
+            session = await _spelling_session(db, runtime.labels) if spell else None
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    smoother = PredictionSmoother(window=window, mode=mode)
+    # Frames on one socket are handled one at a time, so a single buffer does
+    frame_buffer = recognition_service.frame_buffers.acquire()
+    last_signature = None
+    last_prediction = None
+    frame_index = 0
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is None:
+                if (message.get("text") or "").strip() == "reset":
+                    smoother.reset()
+                    if session is not None:
+                        session.reset()
+                    last_signature = None
+                    last_prediction = None
+                    await websocket.send_json({"reset": True})
+                else:
+                    await websocket.send_json({"error": "Send frames as binary messages"})
+                continue
+
+            try:
+                frame, signature = await decode_image_with_signature(message["bytes"], out=frame_buffer)
+            except Exception as e:
+                await websocket.send_json({"frame": frame_index, "error": f"Decode error: {str(e)}"})
+                frame_index += 1
+                continue
+
+            skipped = (
+                last_signature is not None
+                and signature_distance(signature, last_signature) < RECOGNITION_STREAM_DIFF_THRESHOLD
+            )
+            if not skipped:
+                try:
+                    last_prediction = await predict_cached(frame, rt=runtime)
+                except Exception as e:
+                    await websocket.send_json({"frame": frame_index, "error": f"Prediction error: {str(e)}"})
+                    frame_index += 1
+                    continue
+                last_signature = signature
+
+            smoothed = runtime.labels.decode(smoother.update(last_prediction), mask, top_k)
+            raw = runtime.labels.decode(last_prediction, mask)
+            if not skipped:
+                capture.offer(message["bytes"], raw, runtime.version, "stream")
+            response = {
+                "frame": frame_index,
+                "letter": smoothed["letter"],
+                "confidence": smoothed["confidence"],
+                "raw_letter": raw["letter"],
+                "raw_confidence": raw["confidence"],
+                "skipped": skipped,
+            }
+            if "top_k" in smoothed:
+                response["top_k"] = smoothed["top_k"]
+            if session is not None:
+                spelled = session.update(last_prediction)
+                response.update(word=spelled["word"], word_confidence=spelled["confidence"],
+                                prefix=spelled["prefix"])
+            await websocket.send_json(response)
+            frame_index += 1
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        recognition_service.frame_buffers.release(frame_buffer)
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_token_user_id
 from app.models import UserProfile, HeartPackage
 from app.schemas import HeartPurchase, HeartPurchaseResponse, HeartPackage as HeartPackageSchema
+from app.services import catalog, heart_service
+from app.services.http_cache import conditional_response
 
-router = APIRouter(dependencies=[Depends(get_current_user)])
+router = APIRouter()
 
-@router.post("/purchase-hearts", response_model=HeartPurchaseResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/purchase-hearts",
+    response_model=HeartPurchaseResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_user)]
+)
 async def purchase_hearts(
     request: HeartPurchase,
     db: AsyncSession = Depends(get_db)
@@ -32,11 +39,7 @@ async def purchase_hearts(
         raise HTTPException(status_code=400, detail="Not enough rubies")
     
     profile.rubies -= heart_package.ruby_cost
-    profile.hearts += heart_package.hearts_amount
-    
-    max_hearts = 5
-    if profile.hearts > max_hearts:
-        profile.hearts = max_hearts
+    heart_service.add(profile, heart_package.hearts_amount)
     
     await db.commit()
     
@@ -46,8 +49,8 @@ async def purchase_hearts(
         "rubies": profile.rubies
     }
 
-@router.get("/heart-packages", response_model=List[HeartPackageSchema])
-async def get_heart_packages(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(HeartPackage))
-    packages = result.scalars().all()
-    return packages
\ No newline at end of file
+@router.get("/heart-packages", response_model=List[HeartPackageSchema], dependencies=[Depends(get_token_user_id)])
+async def get_heart_packages(request: Request):
+    # Same for every user: served from the catalog snapshot with an ETag
+    snapshot = await catalog.get_snapshot()
+    return conditional_response(request, snapshot.heart_packages)
\ No newline at end of file
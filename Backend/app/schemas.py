@@ -129,6 +129,32 @@ class ProgressResponseSchema(BaseModel):
     rubies_earned: int = 0
     next_lesson_unlocked: bool = False
 
+class AnswerEventSchema(BaseModel):
+    lesson_id: int
+    question: int
+    is_correct: bool
+    # Lesson progress (0-100) after this answer, as in ProgressUpdateSchema
+    progress: int
+    answered_at: Optional[datetime] = None
+
+class AnswerBatchSchema(BaseModel):
+    answers: List[AnswerEventSchema]
+
+class LessonProgressStateSchema(BaseModel):
+    lesson_id: int
+    progress: int
+    completed: bool
+    last_question: int
+    rubies_earned: int = 0
+    next_lesson_unlocked: bool = False
+
+class AnswerBatchResponseSchema(BaseModel):
+    lessons: List[LessonProgressStateSchema]
+    hearts_remaining: int
+    rubies_earned: int
+    rubies: int
+    streak: int
+
 class UserProgressSchema(BaseModel):
     progress: int
     completed: bool
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.future import select
+from sqlalchemy.orm import noload
+
+from app.config import CATALOG_TTL
+from app.db import async_session
+from app.models import HeartPackage, Lesson, PracticeLevel, Sign, Unit
+from app.services.http_cache import Encoded, encoded
+
+
+class SignEntry(NamedTuple):
+    id: int
+    text: str
+    video_url: str
+
+
+def encode(data) -> bytes:
+    """JSON bytes exactly as FastAPI's JSONResponse would render ``data``."""
+    return json.dumps(
+        jsonable_encoder(data), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class CatalogSnapshot:
+    """Active units, lessons and signs, heart packages and practice levels
+    read in one pass, with the response bodies of the content endpoints
+    already encoded and tagged. Never modified after it is built; admin
+    writes replace it with a new one."""
+
+    def __init__(self, version: int, units: List[Unit], lessons: List[Lesson], signs: List[Sign],
+                 heart_packages: List[HeartPackage] = (), practice_levels: List[PracticeLevel] = ()):
+        self.version = version
+        self.built_at = time.time()
+
+        signs_by_lesson: Dict[int, List[Sign]] = {}
+        for sign in signs:
+            signs_by_lesson.setdefault(sign.lesson_id, []).append(sign)
+        lessons_by_unit: Dict[int, List[Lesson]] = {}
+        for lesson in lessons:
+            lessons_by_unit.setdefault(lesson.unit_id, []).append(lesson)
+
+        # Quiz generation picks distractors per request from these
+        self.quiz_signs: Dict[int, Tuple[SignEntry, ...]] = {
+            lesson_id: tuple(SignEntry(s.id, s.text, s.video_url) for s in lesson_signs)
+            for lesson_id, lesson_signs in signs_by_lesson.items()
+        }
+
+        lesson_bodies = {lesson.id: self._lesson(lesson, signs_by_lesson.get(lesson.id, [])) for lesson in lessons}
+        self.lesson: Dict[int, Encoded] = {
+            lesson_id: encoded(encode(body)) for lesson_id, body in lesson_bodies.items()
+        }
+        # /api/lessons/ lists lessons without the per-lesson video
+        self.lessons = self._encoded([{**lesson_bodies[lesson.id], "video_url": None} for lesson in lessons])
+        # /api/lessons/units/ only lists units that have lessons
+        self.units = self._encoded([
+            {
+                "id": unit.id,
+                "title": unit.title,
+                "description": unit.description,
+                "order_index": unit.order_index,
+                "status": unit.status,
+                "created_at": unit.created_at,
+                "lessons": [{**lesson_bodies[l.id], "video_url": None} for l in lessons_by_unit[unit.id]],
+            }
+            for unit in units if unit.id in lessons_by_unit
+        ])
+        self.units_with_lesson_signs = self._encoded([
+            {
+                "id": unit.id,
+                "title": unit.title,
+                "description": unit.description,
+                "order_index": unit.order_index,
+                "lessons": [
+                    {
+                        "id": lesson.id,
+                        "title": lesson.title,
+                        "description": lesson.description,
+                        "rubies_reward": lesson.rubies_reward,
+                        "image_url": lesson.image_url,
+                        "signs": [
+                            {
+                                "id": sign.id,
+                                "text": sign.text,
+                                "video_url": sign.video_url,
+                                "difficulty_level": sign.difficulty_level,
+                            } for sign in signs_by_lesson.get(lesson.id, [])
+                        ],
+                    } for lesson in lessons_by_unit.get(unit.id, [])
+                ],
+            }
+            for unit in units
+        ])
+        self.heart_packages = self._encoded([
+            {
+                "id": package.id,
+                "name": package.name,
+                "hearts_amount": package.hearts_amount,
+                "ruby_cost": package.ruby_cost,
+            }
+            for package in heart_packages
+        ])
+        # Level and game metadata only; /practice/levels/{user_id} adds the
+        # user's progress and unlocks
+        self.practice_levels = self._encoded([
+            {
+                "id": level.id,
+                "name": level.name,
+                "description": level.description,
+                "required_progress": level.required_progress,
+                "order_index": level.order_index,
+                "games": [
+                    {"id": game.game_identifier, "name": game.name, "description": game.description}
+                    for game in level.games
+                ],
+            }
+            for level in practice_levels
+        ])
+
+    @staticmethod
+    def _encoded(data) -> Encoded:
+        return encoded(encode(data))
+
+    @staticmethod
+    def _lesson(lesson: Lesson, signs: List[Sign]) -> dict:
+        # LessonResponseSchema
+        return {
+            "id": lesson.id,
+            "title": lesson.title,
+            "description": lesson.description,
+            "signs": [
+                {
+                    "id": sign.id,
+                    "text": sign.text,
+                    "video_url": sign.video_url,
+                    "difficulty_level": sign.difficulty_level,
+                    "created_at": sign.created_at,
+                } for sign in signs
+            ],
+            "rubies_reward": lesson.rubies_reward,
+            "progress_bar": 0,
+            "video_url": signs[0].video_url if signs else None,
+        }
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_loaded_at = 0.0
+# Bumped by every invalidation; a build only becomes current if no write
+# happened while it was reading
+_generation = 0
+_build: Optional[asyncio.Future] = None
+_build_generation = None
+
+
+async def _load(generation: int) -> CatalogSnapshot:
+    global _snapshot, _loaded_at
+
+    async with async_session() as db:
+        units = (await db.execute(
+            select(Unit)
+            .options(noload(Unit.lessons))
+            .where(Unit.archived == False)
+            .order_by(Unit.order_index, Unit.id)
+        )).scalars().all()
+        lessons = (await db.execute(
+            select(Lesson)
+            .options(noload(Lesson.signs))
+            .where(Lesson.archived == False)
+            .order_by(Lesson.order_index, Lesson.id)
+        )).scalars().all()
+        signs = (await db.execute(
+            select(Sign).where(Sign.archived == False).order_by(Sign.id)
+        )).scalars().all()
+        heart_packages = (await db.execute(select(HeartPackage).order_by(HeartPackage.id))).scalars().all()
+        # PracticeLevel.games is selectin-loaded with the levels
+        practice_levels = (await db.execute(
+            select(PracticeLevel).order_by(PracticeLevel.order_index, PracticeLevel.id)
+        )).scalars().all()
+
+    snapshot = CatalogSnapshot(generation, units, lessons, signs, heart_packages, practice_levels)
+    if generation == _generation:
+        _snapshot, _loaded_at = snapshot, time.monotonic()
+    return snapshot
+
+
+async def get_snapshot() -> CatalogSnapshot:
+    """The current snapshot, rebuilt after an admin write or CATALOG_TTL.
+    Heart packages and practice levels have no admin routes; edits to them
+    show up within CATALOG_TTL.
+    Concurrent misses share one rebuild instead of each querying."""
+    global _build, _build_generation
+
+    if _snapshot is not None and _snapshot.version == _generation and time.monotonic() - _loaded_at < CATALOG_TTL:
+        return _snapshot
+    # A build started before the latest write would miss it, so start another
+    if _build is None or _build.done() or _build_generation != _generation:
+        _build = asyncio.ensure_future(_load(_generation))
+        _build_generation = _generation
+    # Shielded so a client hanging up does not cancel the build others await
+    return await asyncio.shield(_build)
+
+
+def invalidate():
+    """Drop the snapshot; called after admins change units, lessons or signs."""
+    global _generation
+    _generation += 1
@@ -0,0 +1,228 @@
+import asyncio
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import noload
+
+from app.config import COURSE_GRAPH_TTL
+from app.models import Lesson, Unit, UserProgress
+from app.services.progress_buffer import buffer as progress_buffer
+
+
+class LessonNode(NamedTuple):
+    id: int
+    unit_id: int
+    title: str
+    description: Optional[str]
+    order_index: int
+    image_url: Optional[str]
+    rubies_reward: int
+
+
+class UnitNode(NamedTuple):
+    id: int
+    title: str
+    description: Optional[str]
+    order_index: int
+    lesson_ids: Tuple[int, ...]
+
+
+class CourseGraph:
+    """Active units and lessons in course order, as plain tuples so it can
+    be shared between requests and sessions.
+
+    Lock rules (the ones /unit-status and /lesson-status always used): the
+    first unit is open; any other unit opens once every lesson of the unit
+    before it is completed, so an empty unit keeps the rest locked. Inside
+    an open unit the first lesson is open and each next one opens when the
+    one before it is completed.
+    """
+
+    def __init__(self, units: List[UnitNode], lessons: Dict[int, LessonNode]):
+        self.units = units
+        self.lessons = lessons
+        self._unit_position = {unit.id: i for i, unit in enumerate(units)}
+        # lesson id -> (unit position, position inside the unit)
+        self._lesson_position = {
+            lesson_id: (u, l)
+            for u, unit in enumerate(units)
+            for l, lesson_id in enumerate(unit.lesson_ids)
+        }
+
+    def unit(self, unit_id: int) -> Optional[UnitNode]:
+        position = self._unit_position.get(unit_id)
+        return self.units[position] if position is not None else None
+
+    def previous_unit(self, unit_id: int) -> Optional[UnitNode]:
+        position = self._unit_position[unit_id]
+        return self.units[position - 1] if position > 0 else None
+
+    def previous_lesson(self, lesson_id: int) -> Optional[int]:
+        """Lesson before this one in the same unit, or None for the first."""
+        u, l = self._lesson_position[lesson_id]
+        return self.units[u].lesson_ids[l - 1] if l > 0 else None
+
+    def next_lesson(self, lesson_id: int) -> Optional[int]:
+        """Lesson after this one in course order, crossing into the next
+        unit that has lessons. None after the last lesson."""
+        u, l = self._lesson_position[lesson_id]
+        if l + 1 < len(self.units[u].lesson_ids):
+            return self.units[u].lesson_ids[l + 1]
+        for unit in self.units[u + 1:]:
+            if unit.lesson_ids:
+                return unit.lesson_ids[0]
+        return None
+
+    def unit_completed(self, unit: UnitNode, completed: set) -> bool:
+        return bool(unit.lesson_ids) and all(lesson_id in completed for lesson_id in unit.lesson_ids)
+
+    def unit_locked(self, unit_id: int, completed: set) -> bool:
+        previous = self.previous_unit(unit_id)
+        return previous is not None and not self.unit_completed(previous, completed)
+
+    def lesson_locked(self, lesson_id: int, completed: set) -> bool:
+        if self.unit_locked(self.lessons[lesson_id].unit_id, completed):
+            return True
+        previous = self.previous_lesson(lesson_id)
+        return previous is not None and previous not in completed
+
+    def course_map(self, progress: Dict[int, UserProgress]) -> dict:
+        """Every unit and lesson with lock state and the user's progress,
+        given their progress rows by lesson id."""
+        completed = {lesson_id for lesson_id, p in progress.items() if p.completed}
+        next_lesson_id = None
+        units = []
+        unit_locked = False
+        for position, unit in enumerate(self.units):
+            if position > 0:
+                unit_locked = not self.unit_completed(self.units[position - 1], completed)
+            lessons = []
+            total_progress = 0
+            previous_completed = True
+            for lesson_id in unit.lesson_ids:
+                lesson = self.lessons[lesson_id]
+                p = progress.get(lesson_id)
+                is_completed = lesson_id in completed
+                is_locked = unit_locked or not previous_completed
+                if next_lesson_id is None and not is_locked and not is_completed:
+                    next_lesson_id = lesson_id
+                total_progress += (p.progress or 0) if p else 0
+                lessons.append({
+                    "id": lesson.id,
+                    "title": lesson.title,
+                    "description": lesson.description,
+                    "order_index": lesson.order_index,
+                    "image_url": lesson.image_url,
+                    "rubies_reward": lesson.rubies_reward,
+                    "is_locked": is_locked,
+                    "progress": (p.progress or 0) if p else 0,
+                    "completed": is_completed,
+                    "last_question": (p.last_question or 0) if p else 0,
+                })
+                previous_completed = is_completed
+            completed_lessons = sum(1 for lesson in lessons if lesson["completed"])
+            units.append({
+                "id": unit.id,
+                "title": unit.title,
+                "description": unit.description,
+                "order_index": unit.order_index,
+                "is_locked": unit_locked,
+                "progress_percentage": total_progress / len(lessons) if lessons else 0.0,
+                "completed_lessons": completed_lessons,
+                "total_lessons": len(lessons),
+                "completed": self.unit_completed(unit, completed),
+                "lessons": lessons,
+            })
+        return {"next_lesson_id": next_lesson_id, "units": units}
+
+
+_graph: Optional[CourseGraph] = None
+_built_at = 0.0
+_build_lock = None
+
+
+async def load_graph(db: AsyncSession) -> CourseGraph:
+    units = (await db.execute(
+        select(Unit)
+        .where(Unit.archived == False)
+        .options(noload(Unit.lessons))
+        .order_by(Unit.order_index, Unit.id)
+    )).scalars().all()
+    lessons = (await db.execute(
+        select(Lesson)
+        .where(Lesson.archived == False)
+        .options(noload(Lesson.signs))
+        .order_by(Lesson.order_index, Lesson.id)
+    )).scalars().all()
+
+    by_unit = {unit.id: [] for unit in units}
+    nodes = {}
+    for lesson in lessons:
+        if lesson.unit_id not in by_unit:
+            continue
+        by_unit[lesson.unit_id].append(lesson.id)
+        nodes[lesson.id] = LessonNode(
+            lesson.id, lesson.unit_id, lesson.title, lesson.description,
+            lesson.order_index or 0, lesson.image_url, lesson.rubies_reward or 0,
+        )
+    return CourseGraph(
+        [UnitNode(u.id, u.title, u.description, u.order_index or 0, tuple(by_unit[u.id])) for u in units],
+        nodes,
+    )
+
+
+async def get_graph(db: AsyncSession) -> CourseGraph:
+    """The cached course graph, rebuilt when older than COURSE_GRAPH_TTL or
+    after an admin edit in this process."""
+    global _graph, _built_at, _build_lock
+
+    if _graph is not None and time.monotonic() - _built_at < COURSE_GRAPH_TTL:
+        return _graph
+    if _build_lock is None:
+        _build_lock = asyncio.Lock()
+    async with _build_lock:
+        # Another request may have rebuilt it while this one waited
+        if _graph is None or time.monotonic() - _built_at >= COURSE_GRAPH_TTL:
+            _graph = await load_graph(db)
+            _built_at = time.monotonic()
+    return _graph
+
+
+def invalidate():
+    """Drop the cached graph; called after admins change units or lessons."""
+    global _graph
+    _graph = None
+
+
+async def user_progress(db: AsyncSession, user_id: int, lesson_ids=None) -> Dict[int, UserProgress]:
+    """The user's progress rows by lesson id, in one query, with this
+    worker's unwritten answers applied."""
+    query = select(UserProgress).where(UserProgress.user_id == user_id)
+    if lesson_ids is not None:
+        lesson_ids = set(lesson_ids)
+        query = query.where(UserProgress.lesson_id.in_(list(lesson_ids)))
+    rows = {row.lesson_id: row for row in (await db.execute(query)).scalars().all()}
+    # Answers still in the write-behind buffer win over rows that are not
+    # completed (the flush will not change those either), on detached
+    # copies so the session never writes them itself
+    for lesson_id, (progress, last_question) in progress_buffer.progress_for(user_id).items():
+        if lesson_ids is not None and lesson_id not in lesson_ids:
+            continue
+        row = rows.get(lesson_id)
+        if row is not None and row.completed:
+            continue
+        rows[lesson_id] = UserProgress(
+            user_id=user_id,
+            lesson_id=lesson_id,
+            progress=progress,
+            completed=False,
+            last_question=last_question,
+            updated_at=row.updated_at if row else None,
+        )
+    return rows
+
+
+async def completed_lessons(db: AsyncSession, user_id: int, lesson_ids=None) -> set:
+    return {lesson_id for lesson_id, p in (await user_progress(db, user_id, lesson_ids)).items() if p.completed}
@@ -0,0 +1,64 @@
+import random
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import and_, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db import dialect_insert, is_mysql
+from app.models import DailyChallenge, Lesson, UserProfile, UserProgress
+
+
+async def lookup(db: AsyncSession, user_id: int, day: date) -> Optional[Tuple[Optional[datetime], Optional[int]]]:
+    """(last_challenge_date, lesson assigned for ``day`` or None) in one
+    keyed query, or None when the user has no profile."""
+    row = (await db.execute(
+        select(UserProfile.last_challenge_date, DailyChallenge.lesson_id)
+        .outerjoin(
+            DailyChallenge,
+            and_(DailyChallenge.user_id == UserProfile.user_id, DailyChallenge.challenge_date == day)
+        )
+        .where(UserProfile.user_id == user_id)
+    )).first()
+    return (row[0], row[1]) if row else None
+
+
+def pick(lesson_ids: Iterable[int], user_id: int, day: date) -> int:
+    """Seeded by user and day, so every worker picks the same lesson from
+    the same completions."""
+    return random.Random(f"{user_id}:{day.isoformat()}").choice(sorted(lesson_ids))
+
+
+async def assign(db: AsyncSession, user_id: int, day: date) -> Optional[int]:
+    """Pick and store the day's challenge among the user's completed,
+    active lessons, returning the stored lesson id; None if there are none.
+    Also drops the user's earlier days, so the table keeps one row per
+    user."""
+    completed = (await db.execute(
+        select(UserProgress.lesson_id)
+        .join(Lesson, Lesson.id == UserProgress.lesson_id)
+        .where(
+            UserProgress.user_id == user_id,
+            UserProgress.completed == True,
+            Lesson.archived == False
+        )
+    )).scalars().all()
+    if not completed:
+        return None
+    lesson_id = pick(completed, user_id, day)
+
+    stmt = dialect_insert(db, DailyChallenge).values(user_id=user_id, challenge_date=day, lesson_id=lesson_id)
+    # A concurrent request may store the day first; its row is kept
+    if is_mysql(db):
+        stmt = stmt.on_duplicate_key_update(lesson_id=DailyChallenge.lesson_id)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[DailyChallenge.user_id, DailyChallenge.challenge_date])
+    await db.execute(
+        delete(DailyChallenge).where(DailyChallenge.user_id == user_id, DailyChallenge.challenge_date < day)
+    )
+    await db.execute(stmt)
+    await db.commit()
+    # Return what was stored, so racing requests all show the same lesson
+    found = await lookup(db, user_id, day)
+    return found[1] if found and found[1] is not None else lesson_id
@@ -0,0 +1,261 @@
+import re
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import RECOGNITION_SPELL_BEAM_WIDTH, RECOGNITION_SPELL_SYNC_SECONDS
+from app.models import Sign
+from app.services.label_sets import LETTERS, LabelSet
+
+_NOT_LETTERS = re.compile(f"[^{LETTERS}]")
+
+# Log-probability cost of reading a held letter as a doubled one ("ll" in
+# "hello"); the lexicon decides when that is worth it
+REPEAT_PENALTY = float(np.log(0.05))
+
+
+def normalize_word(text: str) -> str:
+    """Lower-case letters only: "Thank you!" -> "thankyou"."""
+    return _NOT_LETTERS.sub("", (text or "").lower())
+
+
+class LexiconTrie:
+    """Prefix trie over the fingerspelling alphabet, stored as flat arrays
+    so a whole beam can step through it with one fancy-indexing call.
+
+    ``children[node, letter]`` is the child node id (-1 if none). Nodes are
+    never freed: removing a word only decrements ``prefix_count`` along its
+    path, and nodes with a zero count are treated as absent. That keeps node
+    ids stable for decoding sessions that are in progress while admins edit
+    signs.
+    """
+
+    def __init__(self, alphabet: str = LETTERS, capacity: int = 1024):
+        self.alphabet = alphabet
+        self._index = {letter: i for i, letter in enumerate(alphabet)}
+        self.children = np.full((capacity, len(alphabet)), -1, dtype=np.int32)
+        self.prefix_count = np.zeros(capacity, dtype=np.int32)
+        self.word_count = np.zeros(capacity, dtype=np.int32)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.letter = np.full(capacity, -1, dtype=np.int32)
+        self.node_count = 1
+        # sign id -> normalized word, so edits and archiving can be undone
+        self._signs: Dict[int, str] = {}
+
+    def __len__(self):
+        return int(np.count_nonzero(self.word_count[:self.node_count]))
+
+    def _grow(self):
+        capacity = len(self.prefix_count) * 2
+        children = np.full((capacity, len(self.alphabet)), -1, dtype=np.int32)
+        children[:self.node_count] = self.children[:self.node_count]
+        self.children = children
+        for name, fill in (("prefix_count", 0), ("word_count", 0), ("parent", -1), ("letter", -1)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=np.int32)
+            new[:self.node_count] = old[:self.node_count]
+            setattr(self, name, new)
+
+    def _add_word(self, word: str):
+        node = 0
+        self.prefix_count[0] += 1
+        for char in word:
+            letter = self._index[char]
+            child = self.children[node, letter]
+            if child < 0:
+                if self.node_count == len(self.prefix_count):
+                    self._grow()
+                child = self.node_count
+                self.node_count += 1
+                self.children[node, letter] = child
+                self.parent[child] = node
+                self.letter[child] = letter
+            node = child
+            self.prefix_count[node] += 1
+        self.word_count[node] += 1
+
+    def _remove_word(self, word: str):
+        node = 0
+        self.prefix_count[0] -= 1
+        for char in word:
+            node = self.children[node, self._index[char]]
+            self.prefix_count[node] -= 1
+        self.word_count[node] -= 1
+
+    def add_sign(self, sign_id: int, text: str):
+        """Add or update the word of one sign."""
+        self.remove_sign(sign_id)
+        word = normalize_word(text)
+        if word:
+            self._add_word(word)
+            self._signs[sign_id] = word
+
+    def remove_sign(self, sign_id: int):
+        word = self._signs.pop(sign_id, None)
+        if word is not None:
+            self._remove_word(word)
+
+    def sync(self, signs: Iterable[Tuple[int, str]]) -> int:
+        """Bring the trie in line with the given active ``(sign_id, text)``
+        pairs, touching only signs that were added, changed or removed.
+        Returns the number of changes."""
+        wanted = {sign_id: normalize_word(text) for sign_id, text in signs}
+        changes = 0
+        for sign_id in [s for s in self._signs if s not in wanted]:
+            self.remove_sign(sign_id)
+            changes += 1
+        for sign_id, word in wanted.items():
+            if self._signs.get(sign_id) != word:
+                self.add_sign(sign_id, word)
+                changes += 1
+        return changes
+
+    def word(self, node: int) -> str:
+        chars = []
+        while node > 0:
+            chars.append(self.alphabet[self.letter[node]])
+            node = self.parent[node]
+        return "".join(reversed(chars))
+
+
+def letter_columns(labels: LabelSet, alphabet: str = LETTERS) -> np.ndarray:
+    """Model output column of each alphabet letter (-1 if the model has no
+    such class). Raises ``ValueError`` for models without letter classes."""
+    indices = [labels.index_for_sign(None, letter) for letter in alphabet]
+    columns = np.array([-1 if i is None else i for i in indices], dtype=np.int64)
+    if (columns < 0).all():
+        raise ValueError("This model has no fingerspelling letter classes")
+    return columns
+
+
+class SpellingSession:
+    """Streaming word decoder over per-frame letter probabilities.
+
+    Each beam entry is a trie node (the node fixes the spelled prefix and
+    its last letter). Per frame every beam either stays on its node, which
+    absorbs repeated frames of the same letter, or moves to a child, paying
+    the log-probability of the child's letter. Stays and moves for the whole
+    beam are one (beam x alphabet) array operation; equal nodes are merged
+    keeping the best score (Viterbi) and the best ``beam_width`` survive.
+    """
+
+    def __init__(self, trie: LexiconTrie, columns: np.ndarray, beam_width: int = RECOGNITION_SPELL_BEAM_WIDTH):
+        self.trie = trie
+        self.columns = columns
+        self.beam_width = max(1, beam_width)
+        # Score for frames spent before the first letter
+        self._idle = float(np.log(1.0 / len(trie.alphabet)))
+        self.reset()
+
+    def reset(self):
+        self.nodes = np.zeros(1, dtype=np.int32)
+        self.scores = np.zeros(1, dtype=np.float64)
+        self.frames = 0
+
+    def _letter_log_probs(self, prediction: np.ndarray) -> np.ndarray:
+        prediction = np.asarray(prediction, dtype=np.float64)
+        probs = np.where(self.columns >= 0, prediction[np.maximum(self.columns, 0)], 0.0)
+        total = probs.sum()
+        probs = probs / total if total > 0 else np.full(len(probs), 1.0 / len(probs))
+        return np.log(np.maximum(probs, 1e-9))
+
+    def update(self, prediction: np.ndarray, top_n: int = 3) -> dict:
+        """Consume one frame's model output and return the current best word."""
+        trie = self.trie
+        log_probs = self._letter_log_probs(prediction)
+        nodes, scores = self.nodes, self.scores
+
+        last = trie.letter[nodes]
+        stay = scores + np.where(last >= 0, log_probs[np.maximum(last, 0)], self._idle)
+
+        children = trie.children[nodes]
+        alive = children >= 0
+        alive[alive] = trie.prefix_count[children[alive]] > 0
+        repeat = np.arange(len(trie.alphabet))[None, :] == last[:, None]
+        move = scores[:, None] + log_probs[None, :] + np.where(repeat, REPEAT_PENALTY, 0.0)
+
+        all_nodes = np.concatenate([nodes, children[alive]])
+        all_scores = np.concatenate([stay, move[alive]])
+        order = np.argsort(-all_scores, kind="stable")
+        _, first = np.unique(all_nodes[order], return_index=True)
+        keep = order[first]
+        keep = keep[np.argsort(-all_scores[keep], kind="stable")][:self.beam_width]
+
+        self.nodes, self.scores = all_nodes[keep], all_scores[keep]
+        self.frames += 1
+        return self.result(top_n)
+
+    def result(self, top_n: int = 3) -> dict:
+        """Best complete word among the beams with its share of the beam's
+        probability mass, plus the best prefix being spelled."""
+        trie = self.trie
+        prefix = trie.word(int(self.nodes[0])) if self.frames else ""
+        complete = trie.word_count[self.nodes] > 0
+        if not complete.any():
+            return {"word": None, "confidence": 0.0, "prefix": prefix, "candidates": []}
+
+        weights = np.exp(self.scores - self.scores.max())
+        weights /= weights.sum()
+        candidates = [
+            {"word": trie.word(int(node)), "confidence": float(weight)}
+            for node, weight in zip(self.nodes[complete][:top_n], weights[complete][:top_n])
+        ]
+        return {
+            "word": candidates[0]["word"],
+            "confidence": candidates[0]["confidence"],
+            "prefix": prefix,
+            "candidates": candidates,
+        }
+
+    def decode(self, predictions: np.ndarray, top_n: int = 3) -> dict:
+        """Decode a whole sequence of frames from a fresh state."""
+        self.reset()
+        result = self.result(top_n)
+        for prediction in predictions:
+            result = self.update(prediction, top_n)
+        return result
+
+
+# Words of all active signs. Kept current by admin_signs (in this process)
+# and by a periodic diff against the database (edits made elsewhere)
+lexicon = LexiconTrie()
+_synced_at: Optional[float] = None
+
+
+async def ensure_lexicon(db: AsyncSession) -> LexiconTrie:
+    """Sync the lexicon with the active signs if it is older than
+    RECOGNITION_SPELL_SYNC_SECONDS. Only changed signs touch the trie."""
+    global _synced_at
+
+    if _synced_at is not None and time.monotonic() - _synced_at < RECOGNITION_SPELL_SYNC_SECONDS:
+        return lexicon
+    result = await db.execute(select(Sign.id, Sign.text).where(Sign.archived == False))
+    changes = lexicon.sync(result.all())
+    if changes and _synced_at is not None:
+        print(f"🔄 Fingerspelling lexicon synced ({changes} sign changes, {len(lexicon)} words)")
+    _synced_at = time.monotonic()
+    return lexicon
+
+
+async def open_session(db: AsyncSession, labels: LabelSet) -> SpellingSession:
+    """A decoding session over the current lexicon for a model with the
+    given labels. Raises ``ValueError`` if the model has no letters."""
+    columns = letter_columns(labels)
+    return SpellingSession(await ensure_lexicon(db), columns)
+
+
+def update_sign(sign_id: int, text: str, archived: bool):
+    """Apply one admin edit to the lexicon straight away."""
+    if archived:
+        lexicon.remove_sign(sign_id)
+    else:
+        lexicon.add_sign(sign_id, text)
+
+
+def remove_signs(sign_ids: Iterable[int]):
+    """Drop signs archived in bulk (with their lesson or unit) straight away."""
+    for sign_id in sign_ids:
+        lexicon.remove_sign(sign_id)
@@ -0,0 +1,236 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+import cv2
+
+from app.config import (
+    RECOGNITION_CAPTURE_ENABLED,
+    RECOGNITION_CAPTURE_DIR,
+    RECOGNITION_CAPTURE_THRESHOLD,
+    RECOGNITION_CAPTURE_SAMPLE_RATE,
+    RECOGNITION_CAPTURE_QUEUE_SIZE,
+    RECOGNITION_CAPTURE_QUEUE_MB,
+    RECOGNITION_CAPTURE_SHARD_SIZE,
+    RECOGNITION_CAPTURE_FLUSH_SECONDS,
+)
+from app.services.recognition_service import IMG_SIZE
+
+# Layout:
+#   data/captures/index.jsonl               one line per captured frame
+#   data/captures/<YYYY-MM-DD>/shard-*.npz  frames (N, 224, 224, 3) uint8 RGB
+#       plus per-row label / expected / confidence / model_version /
+#       timestamp / reason / source arrays
+
+
+class CapturedFrame(NamedTuple):
+    data: bytes
+    # Set for packed RGB bodies, None for JPEG/PNG
+    width: Optional[int]
+    height: Optional[int]
+    label: str
+    confidence: float
+    expected: Optional[str]
+    model_version: str
+    source: str
+    reason: str
+    timestamp: float
+
+
+class FrameCapture:
+    """Keeps frames worth retraining on, off the request path.
+
+    ``offer`` only decides and enqueues the bytes the request already has;
+    decoding, resizing, compression and disk writes happen on one daemon
+    writer thread. The queue is bounded by frame count and by bytes, and
+    ``offer`` never waits: when it is full the frame is dropped and counted.
+    """
+
+    def __init__(self, directory: str, threshold: float, sample_rate: float, queue_size: int,
+                 queue_bytes: int, shard_size: int, flush_seconds: float, enabled: bool = True):
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.queue_bytes = queue_bytes
+        self.shard_size = max(1, shard_size)
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._shard_seq = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.shards = 0
+        self.errors = 0
+
+    def reason_for(self, label: str, confidence: float, expected: Optional[str]) -> Optional[str]:
+        """Why a prediction should be kept, or None to skip it."""
+        if expected is not None and expected.strip().lower() != label.lower():
+            return "corrected"
+        if confidence < self.threshold and random.random() < self.sample_rate:
+            return "low_confidence"
+        return None
+
+    def offer(self, data: bytes, result: dict, model_version: str, source: str,
+              expected: Optional[str] = None, width: int = None, height: int = None) -> bool:
+        """Queue one frame if it qualifies. Returns whether it was queued."""
+        if not self.enabled or not data:
+            return False
+        reason = self.reason_for(result["letter"], result["confidence"], expected)
+        if reason is None:
+            return False
+
+        with self._lock:
+            if self._queued_bytes + len(data) > self.queue_bytes:
+                self.dropped += 1
+                return False
+            self._queued_bytes += len(data)
+        item = CapturedFrame(data, width, height, result["letter"], float(result["confidence"]),
+                             expected, model_version, source, reason, time.time())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._queued_bytes -= len(data)
+                self.dropped += 1
+            return False
+
+        self.captured += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="frame-capture", daemon=True)
+            self._thread.start()
+        return True
+
+    def _decode(self, item: CapturedFrame) -> np.ndarray:
+        if item.width is not None:
+            img = np.frombuffer(item.data, np.uint8).reshape(item.height, item.width, 3)
+        else:
+            img = cv2.imdecode(np.frombuffer(item.data, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Could not decode image")
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        if img.shape[:2] != (IMG_SIZE[1], IMG_SIZE[0]):
+            img = cv2.resize(img, IMG_SIZE, interpolation=cv2.INTER_AREA)
+        return img
+
+    def _run(self):
+        pending, frames = [], []
+        deadline = None
+        while True:
+            # Idle: wait for work. A shard in progress is flushed once it is
+            # flush_seconds old even if it is not full
+            timeout = None if not pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_shard(pending, frames)
+                pending, frames = [], []
+                continue
+            if item is None:
+                if pending:
+                    self._write_shard(pending, frames)
+                return
+
+            with self._lock:
+                self._queued_bytes -= len(item.data)
+            try:
+                frames.append(self._decode(item))
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️  Dropping captured frame: {e}")
+                continue
+            pending.append(item)
+            if len(pending) == 1:
+                deadline = time.monotonic() + self.flush_seconds
+            if len(pending) >= self.shard_size:
+                self._write_shard(pending, frames)
+                pending, frames = [], []
+
+    def _write_shard(self, items, frames):
+        now = datetime.now(timezone.utc)
+        shard_dir = self.directory / now.strftime("%Y-%m-%d")
+        self._shard_seq += 1
+        name = f"shard-{now.strftime('%H%M%S')}-{os.getpid()}-{self._shard_seq:05d}.npz"
+        try:
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a half-written shard
+            tmp_path = shard_dir / f".{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    frames=np.stack(frames),
+                    label=np.array([i.label for i in items]),
+                    expected=np.array([i.expected or "" for i in items]),
+                    confidence=np.array([i.confidence for i in items], dtype=np.float32),
+                    model_version=np.array([i.model_version for i in items]),
+                    timestamp=np.array([i.timestamp for i in items], dtype=np.float64),
+                    reason=np.array([i.reason for i in items]),
+                    source=np.array([i.source for i in items]),
+                )
+            os.replace(tmp_path, shard_dir / name)
+
+            shard = f"{shard_dir.name}/{name}"
+            lines = "".join(
+                json.dumps({
+                    "shard": shard, "row": row, "label": i.label, "expected": i.expected,
+                    "confidence": round(i.confidence, 4), "model_version": i.model_version,
+                    "timestamp": datetime.fromtimestamp(i.timestamp, timezone.utc).isoformat(),
+                    "reason": i.reason, "source": i.source,
+                }) + "\n"
+                for row, i in enumerate(items)
+            )
+            # One O_APPEND write per shard keeps lines from several workers whole
+            fd = os.open(self.directory / "index.jsonl", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, lines.encode())
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.errors += 1
+            print(f"❌ Failed to write capture shard {name}: {e}")
+            return
+        self.shards += 1
+        self.written += len(items)
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what is queued and stop the writer."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "queued_bytes": self._queued_bytes,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "written": self.written,
+            "shards": self.shards,
+            "errors": self.errors,
+        }
+
+
+capture = FrameCapture(
+    RECOGNITION_CAPTURE_DIR,
+    threshold=RECOGNITION_CAPTURE_THRESHOLD,
+    sample_rate=RECOGNITION_CAPTURE_SAMPLE_RATE,
+    queue_size=RECOGNITION_CAPTURE_QUEUE_SIZE,
+    queue_bytes=int(RECOGNITION_CAPTURE_QUEUE_MB * 1024 * 1024),
+    shard_size=RECOGNITION_CAPTURE_SHARD_SIZE,
+    flush_seconds=RECOGNITION_CAPTURE_FLUSH_SECONDS,
+    enabled=RECOGNITION_CAPTURE_ENABLED,
+)
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from app.models import UserProfile
+
+MAX_HEARTS = 5
+# One heart comes back per interval while below MAX_HEARTS
+REGEN_INTERVAL = timedelta(minutes=10)
+
+# Stored hearts / hearts_last_updated are only the state as of the last
+# spend or purchase; what a user has now is derived from them on read, so
+# polling never writes. hearts_last_updated is the start of the interval
+# that is regenerating the next heart.
+
+
+class Hearts(NamedTuple):
+    count: int
+    since: datetime
+    seconds_to_next: int
+
+
+def current(hearts: Optional[int], last_updated: Optional[datetime], now: datetime = None) -> Hearts:
+    """Hearts after regeneration up to ``now`` (naive UTC, like the
+    columns), from the stored pair."""
+    now = now or datetime.utcnow()
+    hearts = MAX_HEARTS if hearts is None else hearts
+    since = min(last_updated or now, now)
+    if hearts >= MAX_HEARTS:
+        return Hearts(hearts, since, 0)
+    regained = int((now - since) / REGEN_INTERVAL)
+    if hearts + regained >= MAX_HEARTS:
+        return Hearts(MAX_HEARTS, now, 0)
+    since += regained * REGEN_INTERVAL
+    remaining = REGEN_INTERVAL - (now - since)
+    return Hearts(hearts + regained, since, int(remaining.total_seconds()))
+
+
+def of(profile: UserProfile, now: datetime = None) -> Hearts:
+    return current(profile.hearts, profile.hearts_last_updated, now)
+
+
+def spend(profile: UserProfile, amount: int = 1, now: datetime = None) -> int:
+    """Take ``amount`` hearts (never below 0); the caller commits. Returns
+    the hearts left."""
+    now = now or datetime.utcnow()
+    state = of(profile, now)
+    if amount <= 0:
+        return state.count
+    # Regeneration starts with the first heart missing
+    profile.hearts_last_updated = now if state.count >= MAX_HEARTS else state.since
+    profile.hearts = max(state.count - amount, 0)
+    return profile.hearts
+
+
+def add(profile: UserProfile, amount: int, now: datetime = None) -> int:
+    """Give ``amount`` hearts, capped at MAX_HEARTS; the caller commits.
+    Returns the new count."""
+    now = now or datetime.utcnow()
+    state = of(profile, now)
+    profile.hearts = min(state.count + amount, MAX_HEARTS)
+    profile.hearts_last_updated = now if profile.hearts >= MAX_HEARTS else state.since
+    return profile.hearts
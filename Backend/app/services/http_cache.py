@@ -0,0 +1,39 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from fastapi import Request, Response
+
+
+class Encoded(NamedTuple):
+    """A pre-encoded JSON response body and its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the bytes alone, so every worker holding
+    the same content hands out the same tag."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def encoded(body: bytes) -> Encoded:
+    return Encoded(body, content_etag(body))
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check; weak validators compare equal. Not for If-Range,
+    which needs an exact strong match."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def conditional_response(request: Request, item: Encoded) -> Response:
+    """``item`` as JSON, or an empty 304 when the client already has it.
+    ``no-cache`` lets clients keep the body but revalidate every time."""
+    headers = {"ETag": item.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), item.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=item.body, media_type="application/json", headers=headers)
@@ -0,0 +1,134 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+BACKENDS = ("keras", "tflite", "onnx")
+
+_EXTENSIONS = {
+    ".h5": "keras",
+    ".keras": "keras",
+    ".tflite": "tflite",
+    ".onnx": "onnx",
+}
+
+
+class InferenceBackend:
+    """Runs a batch of preprocessed (N, 224, 224, 3) float32 frames through
+    the sign classifier and returns (N, num_classes) probabilities."""
+
+    name = "base"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        self.model_path = str(model_path)
+        self.num_threads = num_threads
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class KerasBackend(InferenceBackend):
+    name = "keras"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        super().__init__(model_path, num_threads)
+        import tensorflow as tf
+
+        if num_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+        self.model = tf.keras.models.load_model(self.model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        # Calling the model directly skips the tf.data pipeline that
+        # model.predict builds on every call, which dominates small batches
+        return self.model(batch, training=False).numpy()
+
+
+class TFLiteBackend(InferenceBackend):
+    """TFLite interpreter, including full-integer (int8/uint8) models."""
+
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        super().__init__(model_path, num_threads)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=self.model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+
+    def _resize(self, batch_size: int):
+        if batch_size == self._batch_size:
+            return
+        shape = list(self._input["shape"])
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self._input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        self._resize(len(batch))
+
+        input_dtype = self._input["dtype"]
+        if input_dtype in (np.int8, np.uint8):
+            scale, zero_point = self._input["quantization"]
+            info = np.iinfo(input_dtype)
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+        self.interpreter.set_tensor(self._input["index"], batch.astype(input_dtype, copy=False))
+        self.interpreter.invoke()
+
+        output = self.interpreter.get_tensor(self._output["index"])
+        if self._output["dtype"] in (np.int8, np.uint8):
+            scale, zero_point = self._output["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+class ONNXBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        super().__init__(model_path, num_threads)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self._input_name: batch.astype(np.float32, copy=False)})[0]
+
+
+def backend_for_path(model_path: str) -> str:
+    suffix = Path(model_path).suffix.lower()
+    if suffix not in _EXTENSIONS:
+        raise ValueError(f"Cannot infer inference backend from '{model_path}'")
+    return _EXTENSIONS[suffix]
+
+
+def load_backend(model_path: str, backend: str = "auto", num_threads: Optional[int] = None) -> InferenceBackend:
+    """Load ``model_path`` with the named backend; ``auto`` picks it from the
+    file extension (.h5/.keras, .tflite, .onnx)."""
+    if backend in (None, "", "auto"):
+        backend = backend_for_path(model_path)
+    if backend == "keras":
+        return KerasBackend(model_path, num_threads)
+    if backend == "tflite":
+        return TFLiteBackend(model_path, num_threads)
+    if backend == "onnx":
+        return ONNXBackend(model_path, num_threads)
+    raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
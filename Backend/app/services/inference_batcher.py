@@ -0,0 +1,171 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """Collects single frames from concurrent requests and runs them through
+    the model as one stacked batch.
+
+    A batch is flushed as soon as it reaches ``max_batch_size`` frames or the
+    first frame in it has waited ``max_wait_ms``, whichever comes first.
+    ``predict_fn`` receives the list of frames and must return an awaitable
+    resolving to one probability row per frame. Up to ``max_in_flight``
+    batches may be running at once (one per inference worker).
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[np.ndarray]], Awaitable[np.ndarray]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 1,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self._in_flight: asyncio.Semaphore = None
+        self._dispatches = set()
+        # Callers currently waiting on a result
+        self._pending = 0
+
+        self._batches = 0
+        self._frames = 0
+        self._last_batch_size = 0
+        self._queue_wait_total = 0.0
+        self._predict_time_total = 0.0
+        self._size_histogram: Dict[int, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Anything still queued will never be served
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference batcher stopped"))
+
+    async def drain(self, poll_interval: float = 0.01):
+        """Wait until every queued frame has been batched and every running
+        batch has finished."""
+        while self.running and self._pending:
+            await asyncio.sleep(poll_interval)
+
+    async def predict(self, frame: np.ndarray) -> np.ndarray:
+        """Queue one preprocessed (H, W, C) frame and wait for its
+        probability vector."""
+        if not self.running:
+            self.start()
+        future = asyncio.get_event_loop().create_future()
+        self._pending += 1
+        try:
+            await self._queue.put((frame, future, time.perf_counter()))
+            return await future
+        finally:
+            self._pending -= 1
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future, float]]:
+        items = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(items) < self.max_batch_size:
+            # Take whatever is already waiting before sleeping on the queue
+            if not self._queue.empty():
+                items.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self):
+        while True:
+            # Wait for a free worker first so frames keep piling into the
+            # next batch while every worker is busy
+            await self._in_flight.acquire()
+            try:
+                items = await self._collect()
+            except BaseException:
+                self._in_flight.release()
+                raise
+            items = [item for item in items if not item[1].cancelled()]
+            if not items:
+                self._in_flight.release()
+                continue
+            task = asyncio.ensure_future(self._dispatch(items))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, items: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        started = time.perf_counter()
+        try:
+            predictions = await self.predict_fn([frame for frame, _, _ in items])
+        except Exception as e:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.release()
+
+        self._record(items, started, time.perf_counter() - started)
+        for i, (_, future, _) in enumerate(items):
+            if not future.done():
+                future.set_result(predictions[i])
+
+    def _record(self, items: List[Tuple[Any, Any, float]], started: float, predict_time: float):
+        size = len(items)
+        self._batches += 1
+        self._frames += size
+        self._last_batch_size = size
+        self._predict_time_total += predict_time
+        self._queue_wait_total += sum(started - enqueued for _, _, enqueued in items)
+        self._size_histogram[size] = self._size_histogram.get(size, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._batches or 1
+        frames = self._frames or 1
+        return {
+            "running": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": len(self._dispatches),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "frames": self._frames,
+            "last_batch_size": self._last_batch_size,
+            "avg_batch_size": self._frames / batches,
+            "avg_batch_fill": self._frames / batches / self.max_batch_size,
+            "avg_queue_wait_ms": self._queue_wait_total / frames * 1000.0,
+            "avg_predict_ms": self._predict_time_total / batches * 1000.0,
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+        }
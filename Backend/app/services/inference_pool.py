@@ -0,0 +1,193 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.inference_backends import backend_for_path, load_backend
+
+# State of an inference worker process, set once by _init_worker
+_worker_model = None
+_worker_shm = None
+_worker_frames = None
+_worker_timings = {}
+_worker_barrier = None
+
+# How long start() waits for every worker to load and warm up its model
+STARTUP_TIMEOUT_SECONDS = 300.0
+
+
+def _init_worker(
+    model_path: str,
+    backend: str,
+    num_threads: Optional[int],
+    shm_name: str,
+    frames_shape: Tuple[int, ...],
+    barrier=None,
+):
+    global _worker_model, _worker_shm, _worker_frames, _worker_barrier
+
+    _worker_barrier = barrier
+
+    # Spawned workers share the parent's resource tracker, so attaching here
+    # does not take ownership; the parent unlinks the block in stop()
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_frames = np.ndarray(frames_shape, dtype=np.float32, buffer=_worker_shm.buf)
+
+    started = time.perf_counter()
+    _worker_model = load_backend(model_path, backend, num_threads)
+    loaded = time.perf_counter()
+    # First call builds the graph / allocates tensors; keep that off a request
+    output = _worker_model.predict(np.zeros((1,) + tuple(frames_shape[2:]), dtype=np.float32))
+    _worker_timings.update(
+        num_classes=int(output.shape[-1]),
+        load_seconds=loaded - started,
+        warmup_seconds=time.perf_counter() - loaded,
+    )
+    print(f"✅ Inference worker {os.getpid()} loaded {model_path} ({_worker_model.name})")
+
+
+def _predict_slot(slot: int, count: int) -> np.ndarray:
+    return _worker_model.predict(_worker_frames[slot, :count])
+
+
+def _worker_info() -> dict:
+    return dict(_worker_timings, pid=os.getpid())
+
+
+def _worker_handshake() -> dict:
+    """Startup check: blocks until every worker has loaded its model and
+    reached the barrier, so each of the ``workers`` calls start() makes
+    lands on a different process."""
+    _worker_barrier.wait(STARTUP_TIMEOUT_SECONDS)
+    return _worker_info()
+
+
+class InferencePool:
+    """Pool of worker processes that each hold their own copy of the model.
+
+    Frames are written straight into a shared memory block split into
+    ``slots`` of ``max_batch_size`` frames; only the slot index and frame
+    count cross the process boundary, so pixel data is never pickled.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        backend: str = "auto",
+        num_threads: Optional[int] = None,
+        workers: int = 1,
+        max_batch_size: int = 16,
+        frame_shape: Tuple[int, ...] = (224, 224, 3),
+    ):
+        self.model_path = model_path
+        self.backend = backend if backend not in (None, "", "auto") else backend_for_path(model_path)
+        self.num_threads = num_threads
+        self.workers = max(1, workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.frame_shape = tuple(frame_shape)
+        # Two slots per worker so the next batch can be staged while one runs
+        self.slots = self.workers * 2
+
+        self._shm = None
+        self._frames = None
+        self._executor = None
+        self._free_slots: asyncio.Queue = None
+        self.worker_pids: List[int] = []
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.num_classes = None
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    async def start(self):
+        if self.running:
+            return
+        frames_shape = (self.slots, self.max_batch_size) + self.frame_shape
+        size = int(np.prod(frames_shape)) * np.dtype(np.float32).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._frames = np.ndarray(frames_shape, dtype=np.float32, buffer=self._shm.buf)
+
+        self._free_slots = asyncio.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put_nowait(slot)
+
+        # spawn, not fork: TensorFlow is not fork-safe once initialised
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.model_path, self.backend, self.num_threads, self._shm.name, frames_shape,
+                      context.Barrier(self.workers)),
+        )
+
+        # Bring every worker up (and its model loaded) before taking traffic.
+        # A worker whose model fails to load breaks the pool, and one that
+        # never gets there times the barrier out; either way start() fails
+        loop = asyncio.get_event_loop()
+        try:
+            infos = await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _worker_handshake)
+                for _ in range(self.workers)
+            ])
+            pids = {info["pid"] for info in infos}
+            if len(pids) != self.workers:
+                raise RuntimeError(
+                    f"Only {len(pids)} of {self.workers} inference workers initialised their model"
+                )
+        except Exception:
+            await self.stop()
+            raise
+        self.worker_pids = sorted(pids)
+        self.load_seconds = max(info["load_seconds"] for info in infos)
+        self.warmup_seconds = max(info["warmup_seconds"] for info in infos)
+        self.num_classes = infos[0]["num_classes"]
+
+    async def stop(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, executor.shutdown, True)
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self.worker_pids = []
+
+    async def predict(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        """Run up to ``max_batch_size`` preprocessed frames on a worker."""
+        if not self.running:
+            raise RuntimeError("Inference pool is not running")
+        if len(frames) > self.max_batch_size:
+            raise ValueError(
+                f"Batch of {len(frames)} exceeds max_batch_size {self.max_batch_size}"
+            )
+
+        slot = await self._free_slots.get()
+        try:
+            staging = self._frames[slot]
+            for i, frame in enumerate(frames):
+                staging[i] = frame
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                self._executor, _predict_slot, slot, len(frames)
+            )
+        finally:
+            self._free_slots.put_nowait(slot)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "worker_pids": self.worker_pids,
+            "slots": self.slots,
+            "free_slots": self._free_slots.qsize() if self._free_slots is not None else 0,
+        }
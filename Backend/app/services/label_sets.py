@@ -0,0 +1,146 @@
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Map index to letter (assuming ASL alphabet A-Z); used by models that
+# ship without a label manifest
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+class LabelSet:
+    """Class index -> label mapping for one model version.
+
+    A version directory may ship ``labels.json``::
+
+        {"labels": [{"label": "a", "sign_id": 12}, {"label": "hello"}, ...]}
+
+    (list position is the class index) or the plain ``labels.txt`` format
+    of ``<index> <label>`` lines. ``sign_id`` ties a class to a ``Sign``
+    row; without it classes are matched to signs by case-insensitive text.
+    """
+
+    def __init__(self, labels: List[str], sign_ids: List[Optional[int]] = None):
+        self.labels = list(labels)
+        self.sign_ids = list(sign_ids) if sign_ids is not None else [None] * len(self.labels)
+        self._by_text = {}
+        for index, label in enumerate(self.labels):
+            self._by_text.setdefault(label.strip().lower(), index)
+        self._by_sign_id = {
+            sign_id: index for index, sign_id in enumerate(self.sign_ids) if sign_id is not None
+        }
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def default(cls) -> "LabelSet":
+        return cls(list(LETTERS))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "LabelSet":
+        if path.suffix == ".json":
+            data = json.loads(path.read_text())
+            entries = data["labels"] if isinstance(data, dict) else data
+            labels, sign_ids = [], []
+            for entry in entries:
+                if isinstance(entry, str):
+                    entry = {"label": entry}
+                labels.append(str(entry["label"]))
+                sign_ids.append(entry.get("sign_id"))
+            return cls(labels, sign_ids)
+
+        indexed = []
+        for line in path.read_text().splitlines():
+            if not line.strip():
+                continue
+            index, _, label = line.strip().partition(" ")
+            indexed.append((int(index), label.strip()))
+        labels = [""] * (max(i for i, _ in indexed) + 1)
+        for index, label in indexed:
+            labels[index] = label
+        return cls(labels)
+
+    @classmethod
+    def for_model_dir(cls, directory: Path) -> "LabelSet":
+        for name in ("labels.json", "labels.txt"):
+            if (directory / name).exists():
+                return cls.from_file(directory / name)
+        return cls.default()
+
+    def to_manifest(self) -> dict:
+        return {
+            "labels": [
+                {"index": i, "label": label, "sign_id": sign_id}
+                for i, (label, sign_id) in enumerate(zip(self.labels, self.sign_ids))
+            ]
+        }
+
+    def index_for_sign(self, sign_id: int, text: str) -> Optional[int]:
+        if sign_id in self._by_sign_id:
+            return self._by_sign_id[sign_id]
+        return self._by_text.get((text or "").strip().lower())
+
+    def candidate_mask(self, signs: Iterable[Tuple[int, str]], num_classes: int) -> np.ndarray:
+        """Boolean mask over the model's classes that keeps only the given
+        ``(sign_id, text)`` signs."""
+        mask = np.zeros(num_classes, dtype=bool)
+        for sign_id, text in signs:
+            index = self.index_for_sign(sign_id, text)
+            if index is not None and index < num_classes:
+                mask[index] = True
+        return mask
+
+    def label(self, index: int) -> str:
+        if 0 <= index < len(self.labels) and self.labels[index]:
+            return self.labels[index]
+        return "unknown"
+
+    def top_k(self, predictions: np.ndarray, mask: np.ndarray = None, k: int = 1):
+        """Vectorized top-k over an (N, C) batch. With a mask, classes
+        outside it are dropped and the rest renormalized to sum to 1 (the
+        same as masking the logits before softmax). Returns (indices,
+        scores), both (N, k), best first."""
+        probs = np.atleast_2d(np.asarray(predictions, dtype=np.float32))
+        rank = probs
+        if mask is not None:
+            probs = np.where(mask, probs, 0.0)
+            totals = probs.sum(axis=1, keepdims=True)
+            probs = probs / np.where(totals > 0, totals, 1.0)
+            # Masked classes rank below every kept one, even a kept class
+            # the model scored 0
+            rank = np.where(mask, probs, -1.0)
+            k = min(k, int(mask.sum()))
+        k = max(1, min(k, probs.shape[1]))
+
+        indices = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(probs, indices, axis=1)
+        order = np.argsort(-scores, axis=1)
+        return np.take_along_axis(indices, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+    def decode(self, prediction: np.ndarray, mask: np.ndarray = None, top_k: int = 1) -> dict:
+        """One probability vector -> ``{letter, confidence}`` response, with
+        a ``top_k`` list when more than one candidate is asked for."""
+        indices, scores = self.top_k(prediction, mask, top_k)
+        return self._result(indices[0], scores[0], top_k)
+
+    def decode_batch(self, predictions: np.ndarray, mask: np.ndarray = None, top_k: int = 1) -> List[dict]:
+        indices, scores = self.top_k(predictions, mask, top_k)
+        return [self._result(i, s, top_k) for i, s in zip(indices, scores)]
+
+    def _result(self, indices: np.ndarray, scores: np.ndarray, top_k: int) -> dict:
+        best = int(indices[0])
+        result = {"letter": self.label(best), "confidence": float(scores[0])}
+        if best < len(self.sign_ids) and self.sign_ids[best] is not None:
+            result["sign_id"] = self.sign_ids[best]
+        if top_k > 1:
+            result["top_k"] = [
+                {
+                    "letter": self.label(int(i)),
+                    "confidence": float(s),
+                    "sign_id": self.sign_ids[int(i)] if int(i) < len(self.sign_ids) else None,
+                }
+                for i, s in zip(indices, scores)
+            ]
+        return result
@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.config import RECOGNITION_LANDMARK_MODEL
+from app.services.label_sets import LabelSet
+
+NUM_LANDMARKS = 21
+LANDMARK_DIMS = 3
+FEATURES = NUM_LANDMARKS * LANDMARK_DIMS
+
+# MediaPipe hand landmark indices used for normalization
+WRIST = 0
+MIDDLE_MCP = 9
+
+
+def normalize_landmarks(points, left_handed: Optional[Sequence[bool]] = None) -> np.ndarray:
+    """(N, 21, 3) or (N, 63) raw landmarks -> (N, 63) features that ignore
+    where the hand is in the frame and how big it is: the wrist is moved to
+    the origin and everything is scaled by the wrist -> middle-knuckle
+    distance. Left hands are mirrored so both hands share one reference set."""
+    points = np.asarray(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, LANDMARK_DIMS)
+    points = points - points[:, WRIST:WRIST + 1]
+    if left_handed is not None:
+        mirror = np.where(np.asarray(left_handed, dtype=bool), -1.0, 1.0).astype(np.float32)
+        points[..., 0] *= mirror[:, None]
+    scale = np.linalg.norm(points[:, MIDDLE_MCP], axis=1)
+    points /= np.where(scale > 1e-6, scale, 1.0)[:, None, None]
+    return points.reshape(len(points), FEATURES)
+
+
+class LandmarkClassifier:
+    """Small NumPy classifier over normalized hand landmarks, loaded from an
+    ``.npz`` written by ``scripts/build_landmark_references.py``.
+
+    ``kind == "knn"``: distance-weighted vote of the ``k`` nearest reference
+    frames. ``kind == "mlp"``: one ReLU hidden layer and a softmax. Either
+    way ``predict`` returns (N, num_classes) probabilities, decoded with the
+    same ``LabelSet`` as the image model.
+    """
+
+    def __init__(self, data: dict, version: str = "landmarks"):
+        self.kind = str(data["kind"])
+        sign_ids = [int(s) if s >= 0 else None for s in data["sign_ids"]]
+        self.labels = LabelSet([str(label) for label in data["labels"]], sign_ids)
+        self.num_classes = len(self.labels)
+        self.version = version
+
+        if self.kind == "knn":
+            self.references = np.ascontiguousarray(data["references"], dtype=np.float32)
+            self.reference_labels = np.asarray(data["reference_labels"], dtype=np.int64)
+            self.k = int(data["k"]) if "k" in data else 5
+            # |r|^2 for the expanded squared distance |x|^2 + |r|^2 - 2 x.r
+            self._reference_sq = np.einsum("ij,ij->i", self.references, self.references)
+        elif self.kind == "mlp":
+            self.w1 = np.asarray(data["w1"], dtype=np.float32)
+            self.b1 = np.asarray(data["b1"], dtype=np.float32)
+            self.w2 = np.asarray(data["w2"], dtype=np.float32)
+            self.b2 = np.asarray(data["b2"], dtype=np.float32)
+        else:
+            raise ValueError(f"Unknown landmark classifier kind '{self.kind}'")
+
+    @classmethod
+    def load(cls, path: Path) -> "LandmarkClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        return cls(arrays, version=f"landmarks-{int(path.stat().st_mtime)}")
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for (N, 63) normalized landmark features."""
+        if self.kind == "mlp":
+            hidden = np.maximum(features @ self.w1 + self.b1, 0.0)
+            logits = hidden @ self.w2 + self.b2
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            return probs / probs.sum(axis=1, keepdims=True)
+
+        distances = (
+            np.einsum("ij,ij->i", features, features)[:, None]
+            + self._reference_sq[None, :]
+            - 2.0 * features @ self.references.T
+        )
+        k = min(self.k, len(self.references))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.sqrt(np.maximum(np.take_along_axis(distances, nearest, axis=1), 0.0))
+        weights = 1.0 / (nearest_distances + 1e-3)
+
+        probs = np.zeros((len(features), self.num_classes), dtype=np.float32)
+        rows = np.repeat(np.arange(len(features)), k)
+        np.add.at(probs, (rows, self.reference_labels[nearest].ravel()), weights.ravel())
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def stats(self) -> dict:
+        stats = {"version": self.version, "kind": self.kind, "num_classes": self.num_classes}
+        if self.kind == "knn":
+            stats.update(references=len(self.references), k=self.k)
+        else:
+            stats.update(hidden_units=int(self.w1.shape[1]))
+        return stats
+
+
+_classifier: Optional[LandmarkClassifier] = None
+_classifier_mtime = None
+
+
+def get_classifier() -> LandmarkClassifier:
+    """The classifier at RECOGNITION_LANDMARK_MODEL, reloaded when the file
+    is rebuilt. Raises ``FileNotFoundError`` if none has been built."""
+    global _classifier, _classifier_mtime
+
+    path = Path(RECOGNITION_LANDMARK_MODEL)
+    mtime = os.stat(path).st_mtime
+    if _classifier is None or mtime != _classifier_mtime:
+        _classifier = LandmarkClassifier.load(path)
+        _classifier_mtime = mtime
+        print(f"✅ Landmark classifier loaded from {path} ({_classifier.kind}, {_classifier.num_classes} classes)")
+    return _classifier
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.config import RECOGNITION_MOBILE_DIR, RECOGNITION_MOBILE_FORMATS
+from app.services import model_registry
+from app.services.label_sets import LabelSet
+from app.services.recognition_service import IMG_SIZE
+
+# On-device formats in the order devices should prefer them; all are
+# written by scripts/convert_model.py
+MOBILE_FORMATS = ("tflite-int8", "tflite-fp16", "tflite")
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# path -> (mtime_ns, size, sha256 hex), so every file is hashed once per change
+_digests: Dict[str, Tuple[int, int, str]] = {}
+
+
+def artifact_filename(stem: str, fmt: str) -> str:
+    """File name convert_model.py gives the ``fmt`` conversion of ``stem``:
+    model.tflite, model-fp16.tflite, model-int8.tflite, model.onnx."""
+    suffix = ".onnx" if fmt == "onnx" else ".tflite"
+    name = stem if fmt in ("tflite", "onnx") else f"{stem}-{fmt.split('-')[1]}"
+    return f"{name}{suffix}"
+
+
+def artifact_dir(model_version: model_registry.ModelVersion) -> Path:
+    """Registry versions ship their mobile files next to the model; the
+    default model's conversions live in RECOGNITION_MOBILE_DIR."""
+    return model_version.directory or Path(RECOGNITION_MOBILE_DIR)
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, cached until its mtime or size changes."""
+    stat = os.stat(path)
+    key = str(path)
+    cached = _digests.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    _digests[key] = (stat.st_mtime_ns, stat.st_size, sha.hexdigest())
+    return _digests[key][2]
+
+
+def _failed_conversions(directory: Path) -> set:
+    """Formats conversion_report.json marks as below the agreement bar."""
+    report_path = directory / "conversion_report.json"
+    if not report_path.exists():
+        return set()
+    report = json.loads(report_path.read_text())
+    return {fmt for fmt, artifact in report.get("artifacts", {}).items() if not artifact.get("passed", True)}
+
+
+def artifacts(model_version: model_registry.ModelVersion) -> Dict[str, Path]:
+    """Published mobile files of a version, by format."""
+    directory = artifact_dir(model_version)
+    stem = Path(model_version.model_path).stem
+    failed = _failed_conversions(directory)
+    found = {}
+    for fmt in MOBILE_FORMATS:
+        if fmt not in RECOGNITION_MOBILE_FORMATS or fmt in failed:
+            continue
+        path = directory / artifact_filename(stem, fmt)
+        if path.is_file():
+            found[fmt] = path
+    return found
+
+
+def is_digest(ref: str) -> bool:
+    """Whether a download URL names a file by sha256 rather than version."""
+    return _DIGEST_PATTERN.match(ref) is not None
+
+
+def artifact_path(version: str, fmt: str) -> Path:
+    """Mobile file of one version and format. Raises ``LookupError`` if the
+    version does not exist or does not publish that format."""
+    path = artifacts(model_registry.get_version(version)).get(fmt)
+    if path is None:
+        raise LookupError(f"Model version '{version}' has no {fmt} artifact")
+    return path
+
+
+def artifact_by_digest(digest: str, fmt: str) -> Tuple[str, Path]:
+    """(version, path) of the ``fmt`` file whose sha256 is ``digest``,
+    looked up in the active version first. Raises ``LookupError`` once no
+    published file has that content any more."""
+    active = model_registry.get_active_version()
+    names = [active] + [v.version for v in model_registry.list_versions() if v.version != active]
+    for name in names:
+        try:
+            path = artifacts(model_registry.get_version(name)).get(fmt)
+        except LookupError:
+            continue
+        if path is not None and file_digest(path) == digest:
+            return name, path
+    raise LookupError(f"No {fmt} artifact with sha256 {digest}")
+
+
+def build_manifest(url_prefix: str) -> dict:
+    """Everything a device needs to decide whether to download: the active
+    version, each format's size and sha256 and the label mapping. Download
+    URLs name files by sha256, and ``version`` carries a hash of them, so
+    both change whenever a conversion is re-run. Raises ``LookupError`` if
+    the active version has no mobile artifacts."""
+    model_version = model_registry.get_version(model_registry.get_active_version())
+    files = artifacts(model_version)
+    if not files:
+        raise LookupError(f"Model version '{model_version.version}' has no mobile artifacts; "
+                          f"run scripts.convert_model for it")
+    formats = {}
+    for fmt, path in files.items():
+        digest = file_digest(path)
+        formats[fmt] = {
+            "file": path.name,
+            "size_bytes": path.stat().st_size,
+            "sha256": digest,
+            "url": f"{url_prefix}/{digest}/{fmt}",
+        }
+    build = hashlib.sha256(
+        "".join(f"{fmt}:{formats[fmt]['sha256']}\n" for fmt in sorted(formats)).encode()
+    ).hexdigest()[:12]
+    labels = LabelSet.for_model_dir(model_version.directory) if model_version.directory else LabelSet.default()
+    return {
+        "version": f"{model_version.version}+{build}",
+        "model_version": model_version.version,
+        "input": {"width": IMG_SIZE[0], "height": IMG_SIZE[1], "channels": 3, "scale": "rgb / 255"},
+        "formats": formats,
+        **labels.to_manifest(),
+    }
+
+
+def manifest_etag(manifest: dict) -> str:
+    body = json.dumps(manifest, sort_keys=True).encode()
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single ``bytes=`` range, None when the
+    whole file should be sent (no header, or several ranges). Raises
+    ``ValueError`` for a range that cannot be satisfied."""
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        # Multiple or malformed ranges: RFC 9110 lets us ignore the header
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if first and last and int(last) < int(first):
+        # An invalid range-spec, ignored like a malformed header
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def iter_file(path: Path, start: int, end: int, chunk_size: int = 256 * 1024):
+    """Bytes ``start..end`` (inclusive) of a file in chunks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
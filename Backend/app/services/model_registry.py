@@ -0,0 +1,130 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import RECOGNITION_MODEL_PATH, RECOGNITION_BACKEND, RECOGNITION_REGISTRY_DIR
+from app.services.inference_backends import backend_for_path
+
+# Layout:
+#   models/registry/ACTIVE            name of the active version
+#   models/registry/<version>/        one directory per version holding the
+#       model.h5 | model.tflite | ...  model file(s), and optionally
+#       manifest.json                 {"model_file": ..., "backend": ..., ...}
+#       labels.json | labels.txt      class index -> label (see label_sets.py)
+REGISTRY_DIR = Path(RECOGNITION_REGISTRY_DIR)
+ACTIVE_FILE = REGISTRY_DIR / "ACTIVE"
+
+# Used when the registry has no active version yet
+DEFAULT_VERSION = "default"
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+# Preferred file when a version ships several formats and neither the
+# manifest nor RECOGNITION_BACKEND picks one
+_MODEL_FILES = ("model.h5", "model.keras", "model.onnx", "model.tflite")
+
+
+class ModelVersion:
+    def __init__(self, version: str, model_path: str, backend: str, manifest: dict = None,
+                 directory: Path = None):
+        self.version = version
+        self.model_path = model_path
+        self.backend = backend
+        self.manifest = manifest or {}
+        # Registry directory of the version; None for the default model
+        self.directory = directory
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "model_path": self.model_path,
+            "backend": self.backend,
+            "manifest": self.manifest,
+        }
+
+
+def is_valid_version(version: str) -> bool:
+    return bool(_VERSION_PATTERN.match(version)) and version not in (".", "..")
+
+
+def read_manifest(version_dir: Path) -> dict:
+    manifest_path = version_dir / "manifest.json"
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text())
+
+
+def _pick_model_file(version_dir: Path, manifest: dict) -> Optional[Path]:
+    if manifest.get("model_file"):
+        return version_dir / manifest["model_file"]
+
+    candidates = [version_dir / name for name in _MODEL_FILES if (version_dir / name).exists()]
+    if RECOGNITION_BACKEND not in ("", "auto"):
+        candidates = [p for p in candidates if backend_for_path(str(p)) == RECOGNITION_BACKEND]
+    return candidates[0] if candidates else None
+
+
+def get_version(version: str) -> ModelVersion:
+    """Resolve a version name to its model file. Raises ``LookupError`` if
+    the version does not exist or holds no usable model."""
+    if version == DEFAULT_VERSION and not (REGISTRY_DIR / version).is_dir():
+        return ModelVersion(DEFAULT_VERSION, RECOGNITION_MODEL_PATH, _resolve_backend(RECOGNITION_MODEL_PATH))
+    if not is_valid_version(version):
+        raise LookupError(f"Invalid model version '{version}'")
+
+    version_dir = REGISTRY_DIR / version
+    if not version_dir.is_dir():
+        raise LookupError(f"Model version '{version}' not found")
+    manifest = read_manifest(version_dir)
+    model_file = _pick_model_file(version_dir, manifest)
+    if model_file is None or not model_file.exists():
+        raise LookupError(f"Model version '{version}' has no model file")
+
+    backend = manifest.get("backend") or _resolve_backend(str(model_file))
+    return ModelVersion(version, str(model_file), backend, manifest, version_dir)
+
+
+def _resolve_backend(model_path: str) -> str:
+    if RECOGNITION_BACKEND not in ("", "auto"):
+        return RECOGNITION_BACKEND
+    return backend_for_path(model_path)
+
+
+def list_versions() -> List[ModelVersion]:
+    if not REGISTRY_DIR.is_dir():
+        return []
+    versions = []
+    for version_dir in sorted(REGISTRY_DIR.iterdir()):
+        if not version_dir.is_dir() or not is_valid_version(version_dir.name):
+            continue
+        try:
+            versions.append(get_version(version_dir.name))
+        except (LookupError, ValueError):
+            continue
+    return versions
+
+
+def get_active_version() -> str:
+    if ACTIVE_FILE.exists():
+        version = ACTIVE_FILE.read_text().strip()
+        if version:
+            return version
+    return DEFAULT_VERSION
+
+
+def active_version_mtime() -> float:
+    try:
+        return ACTIVE_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def set_active_version(version: str):
+    """Persist the active version so restarted and sibling workers load it.
+    Written via rename so readers never see a half-written file."""
+    REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = ACTIVE_FILE.with_suffix(".tmp")
+    tmp.write_text(version)
+    os.replace(tmp, ACTIVE_FILE)
@@ -0,0 +1,185 @@
+import asyncio
+import gc
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+
+import numpy as np
+
+from app.config import (
+    RECOGNITION_BACKEND_THREADS,
+    RECOGNITION_WORKERS,
+    RECOGNITION_MAX_BATCH_SIZE,
+    RECOGNITION_MAX_WAIT_MS,
+)
+from app.services.inference_backends import load_backend
+from app.services.inference_batcher import InferenceBatcher
+from app.services.inference_pool import InferencePool
+from app.services.label_sets import LabelSet
+from app.services.model_registry import ModelVersion
+
+# Single thread for in-process models so predict calls never overlap
+_predict_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recognition-predict")
+
+
+class ModelRuntime:
+    """One loaded model version together with its executor (worker pool or
+    in-process backend) and its batcher.
+
+    Versions are swapped by replacing the whole runtime, so requests that
+    already hold a reference finish on the model they started with.
+    """
+
+    def __init__(self, model_version: ModelVersion, frame_shape):
+        self.version = model_version.version
+        self.model_path = model_version.model_path
+        self.backend = model_version.backend
+        self.manifest = model_version.manifest
+        self.frame_shape = tuple(frame_shape)
+        if model_version.directory is not None:
+            self.labels = LabelSet.for_model_dir(model_version.directory)
+        else:
+            self.labels = LabelSet.default()
+        # Output width of the model, read from the warmup prediction
+        self.num_classes = None
+
+        self.model = None
+        self.pool = None
+        self.batcher = None
+        # Loaded by ``preload`` before the server forked its workers
+        self.preloaded = False
+
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.loaded_at = None
+
+    @property
+    def running(self) -> bool:
+        loaded = (self.pool is not None and self.pool.running) or self.model is not None
+        return loaded and self.batcher is not None
+
+    def preload(self):
+        """Load and warm up the model synchronously in this process, before
+        the server forks its workers (see gunicorn.conf.py). Workers inherit
+        the weights copy-on-write and ``start`` only adds their batcher.
+
+        TensorFlow's runtime does not survive a fork, so only the TFLite and
+        ONNX backends can be preloaded; use RECOGNITION_BACKEND_THREADS=1 so
+        the warmup starts no backend threads either.
+        """
+        if self.backend not in ("tflite", "onnx"):
+            raise RuntimeError(f"The {self.backend} backend is not fork-safe; preload a tflite or onnx model")
+        started = time.perf_counter()
+        self.model = load_backend(self.model_path, self.backend, RECOGNITION_BACKEND_THREADS)
+        loaded = time.perf_counter()
+        output = self.model.predict(np.zeros((1,) + self.frame_shape, dtype=np.float32))
+        self.num_classes = int(output.shape[-1])
+        self.load_seconds = loaded - started
+        self.warmup_seconds = time.perf_counter() - loaded
+        self.preloaded = True
+
+    async def start(self):
+        """Load and warm up the model, then start the batcher."""
+        if self.preloaded:
+            predict_fn = self._predict_in_process
+            max_in_flight = 1
+        elif RECOGNITION_WORKERS > 0:
+            self.pool = InferencePool(
+                self.model_path,
+                backend=self.backend,
+                num_threads=RECOGNITION_BACKEND_THREADS,
+                workers=RECOGNITION_WORKERS,
+                max_batch_size=RECOGNITION_MAX_BATCH_SIZE,
+                frame_shape=self.frame_shape,
+            )
+            try:
+                await self.pool.start()
+            except Exception:
+                self.pool = None
+                raise
+            self.load_seconds = self.pool.load_seconds
+            self.warmup_seconds = self.pool.warmup_seconds
+            self.num_classes = self.pool.num_classes
+            predict_fn = self.pool.predict
+            max_in_flight = self.pool.workers
+        else:
+            loop = asyncio.get_event_loop()
+            started = time.perf_counter()
+            model = await loop.run_in_executor(
+                _predict_executor, load_backend,
+                self.model_path, self.backend, RECOGNITION_BACKEND_THREADS,
+            )
+            loaded = time.perf_counter()
+            warmup = np.zeros((1,) + self.frame_shape, dtype=np.float32)
+            output = await loop.run_in_executor(_predict_executor, model.predict, warmup)
+            self.model = model
+            self.num_classes = int(output.shape[-1])
+            self.load_seconds = loaded - started
+            self.warmup_seconds = time.perf_counter() - loaded
+            predict_fn = self._predict_in_process
+            max_in_flight = 1
+
+        self.loaded_at = datetime.utcnow()
+        self.batcher = InferenceBatcher(
+            predict_fn,
+            max_batch_size=RECOGNITION_MAX_BATCH_SIZE,
+            max_wait_ms=RECOGNITION_MAX_WAIT_MS,
+            max_in_flight=max_in_flight,
+        )
+        self.batcher.start()
+
+    async def _predict_in_process(self, frames: List[np.ndarray]) -> np.ndarray:
+        batch = frames if isinstance(frames, np.ndarray) else np.stack(frames)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(_predict_executor, self.model.predict, batch)
+
+    async def predict(self, frame: np.ndarray) -> np.ndarray:
+        return await self.batcher.predict(frame)
+
+    async def predict_batch(self, frames: np.ndarray) -> np.ndarray:
+        """Predict a whole batch directly, bypassing the batcher. Batches
+        bigger than a worker slot are split across workers."""
+        if self.pool is None:
+            return await self._predict_in_process(frames)
+        chunks = [
+            frames[i:i + self.pool.max_batch_size]
+            for i in range(0, len(frames), self.pool.max_batch_size)
+        ]
+        results = await asyncio.gather(*[self.pool.predict(chunk) for chunk in chunks])
+        return np.concatenate(results)
+
+    async def stop(self, drain: bool = True):
+        """Stop taking work, optionally let queued frames finish, then free
+        the model (worker processes exit, in-process weights are dropped)."""
+        if self.batcher is not None:
+            if drain:
+                await self.batcher.drain()
+            await self.batcher.stop()
+            self.batcher = None
+        if self.pool is not None:
+            await self.pool.stop()
+            self.pool = None
+        if self.model is not None:
+            self.model = None
+            gc.collect()
+
+    def stats(self) -> dict:
+        stats = {
+            "version": self.version,
+            "model_path": self.model_path,
+            "backend": self.backend,
+            "num_classes": self.num_classes,
+            "num_labels": len(self.labels),
+            "mode": "preloaded" if self.preloaded else (
+                "process_pool" if self.pool is not None else "in_process"
+            ),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "load_ms": self.load_seconds * 1000.0 if self.load_seconds is not None else None,
+            "warmup_ms": self.warmup_seconds * 1000.0 if self.warmup_seconds is not None else None,
+        }
+        if self.batcher is not None:
+            stats["batcher"] = self.batcher.stats()
+        if self.pool is not None:
+            stats["pool"] = self.pool.stats()
+        return stats
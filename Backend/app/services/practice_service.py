@@ -12,6 +12,8 @@ from app.models import (
 )
 from typing import List, Dict, Any
 
+from app.services import heart_service
+
 async def get_practice_signs(db: AsyncSession, user_id: int, difficulty: str) -> List[Dict[str, Any]]:
     try:
         valid_difficulties = ["beginner", "intermediate", "advanced"]
@@ -217,9 +219,9 @@ async def update_progress(
         rubies_earned = 0
         if profile:
             if score < 50:
-                profile.hearts = max(0, profile.hearts - 1)
+                heart_service.spend(profile)
             elif hearts_lost > 0:
-                profile.hearts = max(0, profile.hearts - hearts_lost)
+                heart_service.spend(profile, hearts_lost)
 
             if score >= 150:
                 rubies_earned += 10 * difficulty_multiplier
@@ -233,7 +235,7 @@ async def update_progress(
             if rubies_earned > 0:
                 profile.rubies += rubies_earned
 
-            hearts = profile.hearts
+            hearts = heart_service.of(profile).count
             total_rubies = profile.rubies
         else:
             hearts = 0
@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import cv2
+
+
+def dhash(frame: np.ndarray) -> int:
+    """64-bit difference hash of a frame: downscale to 9x8 grayscale and
+    record whether each pixel is brighter than its right-hand neighbour.
+    Near-identical frames (same pose, slight noise) hash the same."""
+    gray = frame if frame.ndim == 2 else frame.mean(axis=2, dtype=np.float32)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class PredictionCache:
+    """LRU cache of probability vectors keyed by frame hash, bounded by
+    ``max_size`` entries and ``ttl_seconds`` age. Only used from the event
+    loop thread, so it needs no locking."""
+
+    def __init__(self, max_size: int = 2048, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        prediction, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return prediction
+
+    def put(self, key, prediction: np.ndarray):
+        if not self.enabled:
+            return
+        self._entries[key] = (prediction, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,59 @@
+from collections import Counter, deque
+from typing import Optional
+
+import numpy as np
+import cv2
+
+SIGNATURE_SIZE = (16, 16)
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """Tiny grayscale thumbnail of a normalized frame, used to spot frames
+    that are nearly identical to the previous one."""
+    gray = frame.mean(axis=2, dtype=np.float32)
+    return cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def signature_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute pixel difference between two signatures (0..1)."""
+    return float(np.abs(a - b).mean())
+
+
+class PredictionSmoother:
+    """Smooths per-frame probability vectors over the last ``window`` frames
+    of a stream, either by exponential moving average or majority vote."""
+
+    def __init__(self, window: int = 5, mode: str = "ema", alpha: Optional[float] = None):
+        if mode not in ("ema", "vote"):
+            raise ValueError("mode must be 'ema' or 'vote'")
+        self.window = max(1, window)
+        self.mode = mode
+        # Same centre of mass as a simple average over `window` frames
+        self.alpha = alpha if alpha is not None else 2.0 / (self.window + 1)
+
+        self._history = deque(maxlen=self.window)
+        self._ema = None
+
+    def reset(self):
+        self._history.clear()
+        self._ema = None
+
+    def update(self, prediction: np.ndarray) -> np.ndarray:
+        """Add one frame's probabilities and return the smoothed vector."""
+        prediction = np.asarray(prediction, dtype=np.float32)
+        self._history.append(prediction)
+
+        if self.mode == "ema":
+            if self._ema is None:
+                self._ema = prediction.copy()
+            else:
+                self._ema += self.alpha * (prediction - self._ema)
+            return self._ema
+
+        # Majority vote: winning class gets its mean probability across
+        # the frames that voted for it
+        votes = Counter(int(np.argmax(p)) for p in self._history)
+        winner, _ = votes.most_common(1)[0]
+        smoothed = np.zeros_like(prediction)
+        smoothed[winner] = np.mean([p[winner] for p in self._history if int(np.argmax(p)) == winner])
+        return smoothed
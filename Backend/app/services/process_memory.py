@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Fields of /proc/<pid>/smaps_rollup reported per process, in KiB
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """Resident / proportional / shared / private memory of one process in
+    KiB, or None where /proc is unavailable (non-Linux, process gone).
+
+    Pages still shared copy-on-write with the parent show up as
+    ``Shared_*``; ``Pss`` splits them evenly between the sharers, so summing
+    ``Pss`` over the workers gives their real combined footprint.
+    """
+    try:
+        text = Path(f"/proc/{pid}/smaps_rollup").read_text()
+    except OSError:
+        return None
+    memory = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key in _FIELDS:
+            memory[key.lower()] = int(value.split()[0])
+    memory["shared"] = memory.get("shared_clean", 0) + memory.get("shared_dirty", 0)
+    memory["private"] = memory.get("private_clean", 0) + memory.get("private_dirty", 0)
+    return memory
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children.extend(int(c) for c in (task / "children").read_text().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def _is_server_master(pid: int) -> bool:
+    try:
+        cmdline = Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ")
+    except OSError:
+        return False
+    return b"gunicorn" in cmdline or b"uvicorn" in cmdline
+
+
+def memory_report(extra_pids: List[int] = ()) -> dict:
+    """Memory of this process, its sibling server workers (children of our
+    parent, e.g. the gunicorn master) and ``extra_pids`` such as inference
+    pool workers."""
+    pid, parent = os.getpid(), os.getppid()
+    siblings = [p for p in child_pids(parent) if p != pid] if _is_server_master(parent) else []
+
+    processes = []
+    for role, pids in (("self", [pid]), ("sibling", siblings), ("inference_worker", extra_pids)):
+        for p in pids:
+            memory = read_memory(p)
+            if memory is not None:
+                processes.append({"pid": p, "role": role, **memory})
+
+    server = [p for p in processes if p["role"] in ("self", "sibling")]
+    return {
+        "pid": pid,
+        "parent_pid": parent,
+        "parent": read_memory(parent),
+        "processes": processes,
+        "total_rss_kib": sum(p["rss"] for p in processes),
+        "total_pss_kib": sum(p["pss"] for p in processes),
+        "server_workers": len(server),
+        "server_shared_kib": sum(p["shared"] for p in server),
+    }
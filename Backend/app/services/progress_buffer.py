@@ -0,0 +1,158 @@
+import asyncio
+from typing import Dict, Tuple
+
+from app.config import PROGRESS_WRITE_BEHIND, PROGRESS_FLUSH_SECONDS, PROGRESS_BUFFER_MAX_USERS
+from app.db import async_session
+from app.services import progress_store
+
+# Flushes write at most this many progress rows per statement
+_CHUNK_ROWS = 500
+
+
+class ProgressBuffer:
+    """Write-behind buffer for the lesson answers that complete nothing.
+
+    ``add`` only merges in memory: the latest progress / last_question per
+    (user, lesson) wins. Everything is written on a timer, early once
+    ``max_users`` users are waiting, and on shutdown. Hearts are never
+    buffered; the route spends them and commits before answering. Requests
+    that may complete a lesson call ``flush_user`` first; progress reads
+    overlay ``progress_for``. The buffer is per process, so other workers
+    see the writes after the flush, and a crash loses at most one interval
+    of progress, never a heart or a completion.
+    """
+
+    def __init__(self, flush_seconds: float, max_users: int, enabled: bool = True):
+        self.flush_seconds = flush_seconds
+        self.max_users = max(1, max_users)
+        self.enabled = enabled
+        # user_id -> {lesson_id: (progress, last_question)}
+        self._progress: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        # What the flush in progress is writing, still visible to readers
+        self._writing_progress: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        self._lock = None
+        self._task = None
+        self._early_flush = None
+        self.buffered = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def add(self, user_id: int, lesson_id: int, progress: int, last_question: int):
+        self._progress.setdefault(user_id, {})[lesson_id] = (progress, last_question)
+        self.buffered += 1
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        if len(self._progress) >= self.max_users and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.ensure_future(self.flush())
+
+    def progress_for(self, user_id: int) -> Dict[int, Tuple[int, int]]:
+        """Unwritten (progress, last_question) of a user, by lesson id."""
+        return {**self._writing_progress.get(user_id, {}), **self._progress.get(user_id, {})}
+
+    def has_pending(self, user_id: int) -> bool:
+        return user_id in self._progress
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _write(self, progress: Dict[int, Dict[int, Tuple[int, int]]]):
+        # Sorted, so concurrent flushes from several workers lock rows in
+        # the same order
+        rows = sorted(
+            (user_id, lesson_id, value, last_question)
+            for user_id, lessons in progress.items()
+            for lesson_id, (value, last_question) in lessons.items()
+        )
+        async with async_session() as db:
+            for start in range(0, len(rows), _CHUNK_ROWS):
+                await progress_store.save_progress_rows(db, rows[start:start + _CHUNK_ROWS])
+            await db.commit()
+        self.rows_written += len(rows)
+
+    async def _write_all(self, progress):
+        try:
+            await self._write(progress)
+            return
+        except Exception as e:
+            print(f"⚠️  Progress flush failed, retrying per user: {e}")
+        # One bad user (say, a deleted account) must not hold back the rest
+        for user_id in sorted(progress):
+            try:
+                await self._write({user_id: progress[user_id]})
+            except Exception as e:
+                self.errors += 1
+                self.dropped += len(progress[user_id])
+                print(f"❌ Dropping buffered progress of user {user_id}: {e}")
+
+    async def flush(self):
+        """Write everything buffered so far."""
+        async with self._get_lock():
+            if not self._progress:
+                return
+            self._writing_progress, self._progress = self._progress, {}
+            try:
+                await self._write_all(self._writing_progress)
+            finally:
+                self._writing_progress = {}
+            self.flushes += 1
+
+    async def flush_user(self, user_id: int) -> bool:
+        """Write one user's buffered answers now, after any flush already
+        running. Returns whether there was anything to write."""
+        if not self.has_pending(user_id) and user_id not in self._writing_progress:
+            return False
+        async with self._get_lock():
+            progress = self._progress.pop(user_id, None)
+            if progress is None:
+                return False
+            self._writing_progress = {user_id: progress}
+            try:
+                await self._write(self._writing_progress)
+            except Exception:
+                # Put them back under anything buffered while this ran
+                self._progress[user_id] = {**progress, **self._progress.get(user_id, {})}
+                raise
+            finally:
+                self._writing_progress = {}
+            return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                # Shielded so close() cancelling the timer never interrupts
+                # a write half way
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                print(f"❌ Progress flush failed: {e}")
+
+    async def close(self):
+        """Stop the timer and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending_users": len(self._progress),
+            "pending_rows": sum(len(lessons) for lessons in self._progress.values()),
+            "buffered": self.buffered,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+buffer = ProgressBuffer(
+    PROGRESS_FLUSH_SECONDS,
+    max_users=PROGRESS_BUFFER_MAX_USERS,
+    enabled=PROGRESS_WRITE_BEHIND,
+)
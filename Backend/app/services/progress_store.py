@@ -0,0 +1,80 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import dialect_insert, is_mysql
+from app.models import UserProgress
+
+
+def _upsert(db: AsyncSession, rows: List[dict]):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE on the
+    (user_id, lesson_id) key, overwriting progress and last_question unless
+    the lesson is already completed. A completed row keeps its state, so a
+    write-behind flush of older answers landing after another worker's
+    completion cannot pull it back below 100."""
+    stmt = dialect_insert(db, UserProgress).values(rows)
+    new = stmt.inserted if is_mysql(db) else stmt.excluded
+    done = UserProgress.completed == True
+    values = {
+        "progress": case((done, UserProgress.progress), else_=new.progress),
+        "last_question": case((done, UserProgress.last_question), else_=new.last_question),
+        # ON DUPLICATE KEY UPDATE skips Column.onupdate, so set it here
+        "updated_at": func.now(),
+    }
+    if is_mysql(db):
+        # MySQL applies assignments left to right; neither reads the other
+        return stmt.on_duplicate_key_update(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.lesson_id],
+        set_=values,
+    )
+
+
+async def save_progress(db: AsyncSession, user_id: int, lesson_id: int, progress: int, last_question: int):
+    """Create or overwrite a user's progress on a lesson in one statement.
+    ``completed`` is left alone; only ``mark_completed`` sets it, and after
+    that the row no longer changes."""
+    await save_progress_many(db, user_id, {lesson_id: (progress, last_question)})
+
+
+async def save_progress_many(db: AsyncSession, user_id: int, progress: Dict[int, Tuple[int, int]]):
+    """``save_progress`` for several lessons, given (progress, last_question)
+    by lesson id, in one statement."""
+    await save_progress_rows(
+        db, [(user_id, lesson_id, value, last_question) for lesson_id, (value, last_question) in progress.items()]
+    )
+
+
+async def save_progress_rows(db: AsyncSession, rows: List[Tuple[int, int, int, int]]):
+    """Upsert (user_id, lesson_id, progress, last_question) rows, which may
+    span users, in one statement."""
+    if not rows:
+        return
+    values = [
+        {
+            "user_id": user_id,
+            "lesson_id": lesson_id,
+            "progress": progress,
+            "completed": False,
+            "last_question": last_question,
+        }
+        for user_id, lesson_id, progress, last_question in rows
+    ]
+    await db.execute(_upsert(db, values))
+
+
+async def mark_completed(db: AsyncSession, user_id: int, lesson_id: int) -> bool:
+    """Flag a lesson completed. True only for the request that flipped it,
+    so rewards are granted once even when two submits race."""
+    result = await db.execute(
+        update(UserProgress)
+        .where(
+            UserProgress.user_id == user_id,
+            UserProgress.lesson_id == lesson_id,
+            or_(UserProgress.completed == False, UserProgress.completed.is_(None)),
+        )
+        .values(completed=True, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
@@ -0,0 +1,491 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import cv2
+
+from app.config import (
+    RECOGNITION_DECODE_THREADS,
+    RECOGNITION_CACHE_SIZE,
+    RECOGNITION_CACHE_TTL,
+    RECOGNITION_REGISTRY_POLL_SECONDS,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Lesson, Sign
+from app.services import model_registry
+from app.services.label_sets import LabelSet
+from app.services.model_runtime import ModelRuntime
+from app.services.prediction_smoother import frame_signature
+from app.services.prediction_cache import PredictionCache, dhash
+
+IMG_SIZE = (224, 224)
+
+FRAME_SHAPE = (IMG_SIZE[1], IMG_SIZE[0], 3)
+
+# The active model version. Replaced as a whole when another version is
+# activated; callers grab it once per request so in-flight work finishes on
+# the model it started with.
+runtime = None
+
+# Progress of the most recent background activation
+activation = {"version": None, "state": "idle", "error": None, "started_at": None}
+_activation_task = None
+_watch_task = None
+_active_mtime = 0.0
+
+# Repeated poses and retried frames skip the model entirely
+prediction_cache = PredictionCache(RECOGNITION_CACHE_SIZE, RECOGNITION_CACHE_TTL)
+
+_start_lock = None
+
+# Candidate masks per (model version, lesson id); signs change rarely, so a
+# short TTL keeps admin edits visible without a query per prediction
+LESSON_MASK_TTL = 60.0
+_lesson_masks = {}
+
+# cv2 releases the GIL, so decoding scales across threads without
+# blocking the event loop
+_decode_executor = ThreadPoolExecutor(
+    max_workers=max(1, RECOGNITION_DECODE_THREADS),
+    thread_name_prefix="recognition-decode",
+)
+
+
+class FrameBufferPool:
+    """Free list of preallocated float32 model-input frames.
+
+    Only touched from the event loop thread; a buffer is owned by one request
+    from ``acquire`` until ``release``.
+    """
+
+    def __init__(self, shape, max_cached: int = 64):
+        self.shape = tuple(shape)
+        self.max_cached = max_cached
+        self._free = []
+
+    def acquire(self) -> np.ndarray:
+        if self._free:
+            return self._free.pop()
+        return np.empty(self.shape, dtype=np.float32)
+
+    def release(self, buf: np.ndarray):
+        if len(self._free) < self.max_cached:
+            self._free.append(buf)
+
+
+frame_buffers = FrameBufferPool(FRAME_SHAPE)
+
+# Per decode thread uint8 scratch for the resized image
+_scratch = threading.local()
+
+
+def _resize_scratch() -> np.ndarray:
+    buf = getattr(_scratch, "resized", None)
+    if buf is None:
+        buf = _scratch.resized = np.empty((IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.uint8)
+    return buf
+
+
+def normalize_into(img: np.ndarray, out: np.ndarray = None, bgr: bool = True) -> np.ndarray:
+    """Resize a uint8 image to the model input size, then reorder to RGB and
+    scale to 0..1 straight into the float32 ``out`` buffer in one pass."""
+    if out is None:
+        out = np.empty((IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+    if img.shape[:2] != out.shape[:2]:
+        # Resizing before the channel swap is equivalent and touches fewer pixels
+        img = cv2.resize(img, IMG_SIZE, dst=_resize_scratch())
+    src = img[..., ::-1] if bgr else img
+    np.multiply(src, np.float32(1.0 / 255.0), out=out, dtype=np.float32)
+    return out
+
+
+def preprocess_image(data: bytes, out: np.ndarray = None) -> np.ndarray:
+    """Decode an encoded JPEG/PNG into a normalized (224, 224, 3) RGB frame."""
+    nparr = np.frombuffer(data, np.uint8)
+    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return normalize_into(img, out, bgr=True)
+
+
+def preprocess_rgb(data: bytes, width: int, height: int, out: np.ndarray = None) -> np.ndarray:
+    """Normalize a packed uint8 RGB tensor of ``height x width x 3`` bytes."""
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive")
+    if len(data) != width * height * 3:
+        raise ValueError(
+            f"Expected {width * height * 3} bytes for a {width}x{height} RGB frame, got {len(data)}"
+        )
+    img = np.frombuffer(data, np.uint8).reshape(height, width, 3)
+    return normalize_into(img, out, bgr=False)
+
+
+def sample_indices(total: int, count: int) -> List[int]:
+    """``count`` evenly spaced indices out of ``total`` (all of them if fewer)."""
+    if total <= count:
+        return list(range(total))
+    return np.linspace(0, total - 1, count).round().astype(int).tolist()
+
+
+def preprocess_clip_frames(images: Sequence[bytes], max_frames: int) -> np.ndarray:
+    """Decode an evenly spaced sample of encoded frames into one
+    (N, 224, 224, 3) float32 batch."""
+    indices = sample_indices(len(images), max_frames)
+    batch = np.empty((len(indices), IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+    for slot, index in enumerate(indices):
+        preprocess_image(images[index], out=batch[slot])
+    return batch
+
+
+def preprocess_video(data: bytes, max_frames: int, suffix: str = ".mp4") -> np.ndarray:
+    """Sample up to ``max_frames`` evenly spaced frames from an encoded video
+    into one (N, 224, 224, 3) float32 batch."""
+    # OpenCV can only open videos from a path
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        capture = cv2.VideoCapture(path)
+        try:
+            total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            if total <= 0:
+                raise ValueError("Could not read video")
+            wanted = set(sample_indices(total, max_frames))
+            batch = np.empty((len(wanted), IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+
+            count = 0
+            for index in range(total):
+                # grab() skips the colour conversion for frames we don't keep
+                if not capture.grab():
+                    break
+                if index not in wanted:
+                    continue
+                ok, img = capture.retrieve()
+                if ok:
+                    normalize_into(img, batch[count], bgr=True)
+                    count += 1
+        finally:
+            capture.release()
+    finally:
+        os.remove(path)
+
+    if count == 0:
+        raise ValueError("Could not read any frames from video")
+    return batch[:count]
+
+
+def decode_prediction(prediction: np.ndarray, labels: LabelSet = None,
+                      mask: np.ndarray = None, top_k: int = 1) -> dict:
+    """Turn one probability vector into the ``{letter, confidence}`` response
+    using the model version's label set (the a-z letters by default)."""
+    if labels is None:
+        labels = runtime.labels if runtime is not None else LabelSet.default()
+    return labels.decode(prediction, mask, top_k)
+
+
+def is_model_loaded() -> bool:
+    return runtime is not None and runtime.running
+
+
+async def start_recognition():
+    """Load the registry's active model version and start serving it. Safe
+    to call repeatedly."""
+    global _start_lock, _watch_task
+
+    if _start_lock is None:
+        _start_lock = asyncio.Lock()
+    async with _start_lock:
+        if is_model_loaded():
+            return
+        if runtime is not None and runtime.preloaded and runtime.batcher is None:
+            # Forked worker of a preloading server: the model is already here
+            await runtime.start()
+        else:
+            await _start_active_version()
+
+        if RECOGNITION_REGISTRY_POLL_SECONDS > 0 and _watch_task is None:
+            _watch_task = asyncio.ensure_future(_watch_registry())
+
+
+def _active_model_version() -> model_registry.ModelVersion:
+    global _active_mtime
+
+    _active_mtime = model_registry.active_version_mtime()
+    model_version = model_registry.get_version(model_registry.get_active_version())
+    if not Path(model_version.model_path).exists():
+        raise FileNotFoundError(f"Model file not found at {model_version.model_path}")
+    return model_version
+
+
+async def _start_active_version():
+    global runtime
+
+    new_runtime = ModelRuntime(_active_model_version(), FRAME_SHAPE)
+    await new_runtime.start()
+    runtime = new_runtime
+
+
+def preload_recognition():
+    """Load and warm up the active model version in the current process
+    without starting anything asynchronous. Called by the server master
+    before it forks; each worker's ``start_recognition`` then reuses it."""
+    global runtime
+
+    new_runtime = ModelRuntime(_active_model_version(), FRAME_SHAPE)
+    new_runtime.preload()
+    runtime = new_runtime
+
+
+async def get_runtime() -> ModelRuntime:
+    """The active runtime, loading the model first if needed. Callers keep
+    the returned object for the whole request so predictions and labels come
+    from the same version even if another is activated meanwhile."""
+    if not is_model_loaded():
+        await start_recognition()
+    return runtime
+
+
+async def stop_recognition():
+    global runtime, _watch_task, _activation_task
+
+    for task in (_watch_task, _activation_task):
+        if task is not None and not task.done():
+            task.cancel()
+    _watch_task = None
+    _activation_task = None
+
+    if runtime is not None:
+        await runtime.stop(drain=False)
+        runtime = None
+
+
+async def _activate(version: str, persist: bool):
+    global runtime, _active_mtime
+
+    try:
+        new_runtime = ModelRuntime(model_registry.get_version(version), FRAME_SHAPE)
+        await new_runtime.start()
+    except Exception as e:
+        print(f"❌ Failed to activate model version {version}: {e}")
+        activation.update(state="failed", error=str(e))
+        return
+
+    # Atomic swap: new requests go to the new runtime from here on
+    old_runtime, runtime = runtime, new_runtime
+    prediction_cache.clear()
+    _lesson_masks.clear()
+    if persist:
+        model_registry.set_active_version(version)
+        _active_mtime = model_registry.active_version_mtime()
+    activation.update(state="active", error=None)
+    print(f"✅ Model version {version} active")
+
+    if old_runtime is not None:
+        await old_runtime.stop(drain=True)
+
+
+def activate_version(version: str, persist: bool = True) -> dict:
+    """Start loading ``version`` in the background and swap it in once it
+    is warmed up. Raises ``LookupError`` for unknown versions and
+    ``RuntimeError`` if another activation is still loading."""
+    global _activation_task
+
+    model_registry.get_version(version)
+    if _activation_task is not None and not _activation_task.done():
+        raise RuntimeError(f"Model version {activation['version']} is still loading")
+
+    activation.update(
+        version=version, state="loading", error=None, started_at=datetime.utcnow().isoformat()
+    )
+    _activation_task = asyncio.ensure_future(_activate(version, persist))
+    return dict(activation)
+
+
+async def _watch_registry():
+    """Follow activations made through another worker process."""
+    global _active_mtime
+
+    while True:
+        await asyncio.sleep(RECOGNITION_REGISTRY_POLL_SECONDS)
+        try:
+            mtime = model_registry.active_version_mtime()
+            if mtime == _active_mtime:
+                continue
+            _active_mtime = mtime
+            version = model_registry.get_active_version()
+            if runtime is not None and version != runtime.version:
+                activate_version(version, persist=False)
+        except Exception as e:
+            print(f"⚠️  Model registry check failed: {e}")
+
+
+async def decode_image(data: bytes, out: np.ndarray = None) -> np.ndarray:
+    """Run ``preprocess_image`` on the decode thread pool."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_decode_executor, preprocess_image, data, out)
+
+
+async def decode_image_with_signature(data: bytes, out: np.ndarray = None):
+    """Like ``decode_image`` but also returns the frame's change signature."""
+    def _decode():
+        frame = preprocess_image(data, out)
+        return frame, frame_signature(frame)
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_decode_executor, _decode)
+
+
+async def predict_frame(frame: np.ndarray, rt: ModelRuntime = None) -> np.ndarray:
+    """Queue one preprocessed frame on the batcher and await its
+    probability vector."""
+    if rt is None:
+        rt = await get_runtime()
+    return await rt.predict(frame)
+
+
+async def predict_cached(frame: np.ndarray, key: int = None, rt: ModelRuntime = None) -> np.ndarray:
+    """``predict_frame`` behind the perceptual-hash cache. ``key`` is the
+    frame's dHash if the caller already computed it off the event loop."""
+    if rt is None:
+        rt = await get_runtime()
+    if not prediction_cache.enabled:
+        return await rt.predict(frame)
+
+    # Key on the version too, so a swap mid-request can't cache a stale answer
+    key = (rt.version, dhash(frame) if key is None else key)
+    prediction = prediction_cache.get(key)
+    if prediction is None:
+        prediction = await rt.predict(frame)
+        prediction_cache.put(key, prediction)
+    return prediction
+
+
+def _preprocess_and_hash(preprocess, *args):
+    frame = preprocess(*args)
+    key = dhash(frame) if prediction_cache.enabled else None
+    return frame, key
+
+
+async def predict_encoded(data: bytes, rt: ModelRuntime = None) -> np.ndarray:
+    """Decode a JPEG/PNG into a pooled buffer and predict it. The buffer is
+    only released once the batcher has copied the frame out."""
+    buf = frame_buffers.acquire()
+    try:
+        loop = asyncio.get_event_loop()
+        frame, key = await loop.run_in_executor(
+            _decode_executor, _preprocess_and_hash, preprocess_image, data, buf
+        )
+        return await predict_cached(frame, key, rt)
+    finally:
+        frame_buffers.release(buf)
+
+
+async def predict_rgb(data: bytes, width: int, height: int, rt: ModelRuntime = None) -> np.ndarray:
+    """Predict a packed uint8 RGB tensor using a pooled buffer."""
+    buf = frame_buffers.acquire()
+    try:
+        loop = asyncio.get_event_loop()
+        frame, key = await loop.run_in_executor(
+            _decode_executor, _preprocess_and_hash, preprocess_rgb, data, width, height, buf
+        )
+        return await predict_cached(frame, key, rt)
+    finally:
+        frame_buffers.release(buf)
+
+
+async def predict_batch(frames: np.ndarray, rt: ModelRuntime = None) -> np.ndarray:
+    """Predict a whole (N, 224, 224, 3) batch directly, bypassing the
+    single-frame batcher."""
+    if rt is None:
+        rt = await get_runtime()
+    return await rt.predict_batch(frames)
+
+
+async def predict_clip(images: Sequence[bytes] = None, video: bytes = None,
+                       video_suffix: str = ".mp4", max_frames: int = 16,
+                       rt: ModelRuntime = None) -> np.ndarray:
+    """Sample and decode a clip (encoded frames or a video) on the decode
+    pool, then predict all sampled frames as one batch."""
+    loop = asyncio.get_event_loop()
+    if video is not None:
+        batch = await loop.run_in_executor(
+            _decode_executor, preprocess_video, video, max_frames, video_suffix
+        )
+    else:
+        batch = await loop.run_in_executor(
+            _decode_executor, preprocess_clip_frames, images, max_frames
+        )
+    return await predict_batch(batch, rt)
+
+
+def aggregate_predictions(predictions: np.ndarray, labels: LabelSet = None,
+                          mask: np.ndarray = None, top_k: int = 1) -> dict:
+    """Combine per-frame probabilities into one answer for the attempt: the
+    class with the highest mean probability, plus how many frames voted for
+    it."""
+    if labels is None:
+        labels = runtime.labels if runtime is not None else LabelSet.default()
+    mean = predictions.mean(axis=0)
+    answer = labels.decode(mean, mask, top_k)
+    winners, _ = labels.top_k(predictions, mask, 1)
+    best, _ = labels.top_k(mean, mask, 1)
+    answer["vote_share"] = float(np.mean(winners[:, 0] == best[0, 0]))
+    return answer
+
+
+async def lesson_mask(db: AsyncSession, lesson_id: int, rt: ModelRuntime) -> np.ndarray:
+    """Mask over ``rt``'s classes keeping only the lesson's active signs.
+    ``rt`` is anything with ``version``, ``labels`` and ``num_classes``,
+    e.g. the landmark classifier. Raises ``LookupError`` if the lesson doesn't exist and ``ValueError`` if
+    none of its signs are classes of this model."""
+    key = (rt.version, lesson_id)
+    cached = _lesson_masks.get(key)
+    if cached is not None and time.monotonic() - cached[1] < LESSON_MASK_TTL:
+        return cached[0]
+
+    result = await db.execute(
+        select(Sign.id, Sign.text).where(Sign.lesson_id == lesson_id, Sign.archived == False)
+    )
+    signs = result.all()
+    if not signs:
+        lesson = await db.get(Lesson, lesson_id)
+        if lesson is None:
+            raise LookupError(f"Lesson {lesson_id} not found")
+
+    mask = rt.labels.candidate_mask(signs, rt.num_classes or len(rt.labels))
+    if not mask.any():
+        raise ValueError(f"Model version {rt.version} has no classes for the signs of lesson {lesson_id}")
+    _lesson_masks[key] = (mask, time.monotonic())
+    return mask
+
+
+def model_status() -> dict:
+    status = {"model_loaded": is_model_loaded(), "activation": dict(activation)}
+    if runtime is not None:
+        status.update(
+            version=runtime.version,
+            backend=runtime.backend,
+            loaded_at=runtime.loaded_at.isoformat() if runtime.loaded_at else None,
+            load_ms=runtime.stats()["load_ms"],
+            warmup_ms=runtime.stats()["warmup_ms"],
+            num_labels=len(runtime.labels),
+        )
+    return status
+
+
+def recognition_stats() -> dict:
+    stats = {"model_loaded": is_model_loaded()}
+    if runtime is not None:
+        stats.update(runtime.stats())
+    stats["activation"] = dict(activation)
+    stats["cache"] = prediction_cache.stats()
+    return stats
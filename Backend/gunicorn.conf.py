@@ -0,0 +1,45 @@
+# Production launch with the recognition model preloaded in the master:
+#
+#   RECOGNITION_BACKEND=tflite RECOGNITION_BACKEND_THREADS=1 gunicorn app.main:app
+#
+# The master imports the app, loads and warms up the active model version,
+# then forks the workers, which share the weight pages copy-on-write instead
+# of each loading their own copy. Check the saving with
+# GET /api/recognition/admin/memory (Pss vs Rss, shared KiB per worker).
+# Without a fork-safe backend (tflite / onnx) the preload is skipped and every
+# worker loads the model itself as under plain uvicorn. API-only pods
+# (RECOGNITION_MODE=remote / off) skip it and never import the model stack.
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count()))))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any fork
+    from app.config import RECOGNITION_MODE
+
+    if RECOGNITION_MODE != "local":
+        server.log.info(f"Recognition mode '{RECOGNITION_MODE}', no model to preload")
+        return
+
+    from app.services import recognition_service
+
+    try:
+        recognition_service.preload_recognition()
+    except Exception as e:
+        server.log.warning(f"⚠️  Recognition model not preloaded, workers will load it: {e}")
+        return
+    stats = recognition_service.runtime.stats()
+    server.log.info(
+        f"✅ Preloaded model version {stats['version']} ({stats['backend']}) "
+        f"in {stats['load_ms']:.0f} ms, warmup {stats['warmup_ms']:.0f} ms"
+    )
+    # Keep the collector from touching (and so un-sharing) the preloaded
+    # objects in every worker
+    gc.freeze()
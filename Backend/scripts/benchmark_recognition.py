@@ -0,0 +1,437 @@
+"""Throughput / latency benchmark for the recognition endpoints.
+
+Run from the Backend directory:
+
+    python -m scripts.benchmark_recognition --concurrency 1 8 32 --requests 400
+
+By default this builds a tiny stand-in Keras model, serves the recognition
+router from a local uvicorn subprocess on 127.0.0.1 (no database, no
+network) and drives it with synthetic frames. Pass ``--model`` to benchmark
+a real model file instead, or ``--url`` to drive an already running server.
+
+For every endpoint x concurrency pair it reports requests per second and
+p50/p95/p99 latency, plus the server's batcher numbers (batch fill, queue
+wait, predict time) for that run. A separate single-threaded pass times
+each pipeline stage in isolation: base64 decode, image decode, preprocess
+(resize + normalize) and ``model.predict`` at batch size 1 and at
+RECOGNITION_MAX_BATCH_SIZE.
+
+Results are written as JSON (``--out``); ``--compare old.json`` prints the
+change against an earlier run, e.g. the same benchmark on another commit.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import cv2
+
+ENDPOINTS = ("base64", "file", "raw", "raw-rgb", "clip", "stream")
+API_PREFIX = "/api/recognition"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def create_app():
+    """App factory for the benchmark server: only the recognition router,
+    with the database and websocket auth dependencies stubbed out."""
+    from fastapi import FastAPI
+
+    from app.dependencies import get_db, get_websocket_user
+    from app.routes import recognition_routes
+
+    async def no_db():
+        yield None
+
+    app = FastAPI(title="Recognition benchmark")
+    app.include_router(recognition_routes.router, prefix=API_PREFIX)
+    app.dependency_overrides[get_db] = no_db
+    app.dependency_overrides[get_websocket_user] = lambda: object()
+    return app
+
+
+def build_stand_in_model(path: Path, num_classes: int = 26):
+    """A few-kilobyte model with the real input/output shapes, cheap enough
+    that the benchmark measures the serving path rather than the network."""
+    import tensorflow as tf
+
+    from app.services.recognition_service import FRAME_SHAPE
+
+    tf.random.set_seed(0)
+    inputs = tf.keras.Input(shape=FRAME_SHAPE)
+    x = tf.keras.layers.AveragePooling2D(pool_size=8)(inputs)
+    x = tf.keras.layers.Conv2D(8, 3, strides=2, activation="relu")(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(num_classes, activation="softmax")(x)
+    tf.keras.Model(inputs, outputs).save(str(path))
+
+
+def synthetic_frames(count: int, width: int, height: int, seed: int = 0):
+    """``count`` distinct random frames as (raw RGB bytes, encoded JPEG).
+    Random content keeps the perceptual-hash cache from short-circuiting."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        img = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        ok, jpeg = cv2.imencode(".jpg", img)
+        frames.append((img[..., ::-1].tobytes(), jpeg.tobytes()))
+    return frames
+
+
+def percentiles(latencies) -> dict:
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if values.size == 0:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+
+def _timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000.0
+
+
+def measure_stages(model_path: str, backend: str, frames, batch_size: int, repeat: int = 50) -> dict:
+    """Mean milliseconds per call of each pipeline stage, run in isolation."""
+    from app.services.inference_backends import load_backend
+    from app.services.recognition_service import FRAME_SHAPE, normalize_into
+
+    raw, jpeg = frames[0]
+    encoded = base64.b64encode(jpeg)
+    img = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    out = np.empty(FRAME_SHAPE, dtype=np.float32)
+
+    model = load_backend(model_path, backend)
+    single = np.zeros((1,) + FRAME_SHAPE, dtype=np.float32)
+    batch = np.zeros((batch_size,) + FRAME_SHAPE, dtype=np.float32)
+    model.predict(single)
+    model.predict(batch)
+
+    predict_batch_ms = _timed(lambda: model.predict(batch), max(1, repeat // 5))
+    return {
+        "base64_decode_ms": _timed(lambda: base64.b64decode(encoded), repeat),
+        "image_decode_ms": _timed(lambda: cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR), repeat),
+        "preprocess_ms": _timed(lambda: normalize_into(img, out, bgr=True), repeat),
+        "predict_batch1_ms": _timed(lambda: model.predict(single), repeat),
+        "predict_batch_ms": predict_batch_ms,
+        "predict_batch_size": batch_size,
+        "predict_per_frame_batched_ms": predict_batch_ms / batch_size,
+    }
+
+
+def batcher_delta(before: dict, after: dict) -> dict:
+    """Batcher numbers for one run, from two cumulative ``/batcher-stats``
+    snapshots."""
+    b, a = before.get("batcher"), after.get("batcher")
+    if not b or not a:
+        return {}
+    batches = a["batches"] - b["batches"]
+    frames = a["frames"] - b["frames"]
+    if batches <= 0 or frames <= 0:
+        return {"batches": 0, "frames": 0}
+    wait_total = a["avg_queue_wait_ms"] * max(a["frames"], 1) - b["avg_queue_wait_ms"] * max(b["frames"], 1)
+    predict_total = a["avg_predict_ms"] * max(a["batches"], 1) - b["avg_predict_ms"] * max(b["batches"], 1)
+    return {
+        "batches": batches,
+        "frames": frames,
+        "avg_batch_size": frames / batches,
+        "avg_batch_fill": frames / batches / a["max_batch_size"],
+        "avg_queue_wait_ms": wait_total / frames,
+        "avg_predict_ms": predict_total / batches,
+    }
+
+
+class Driver:
+    """Sends one request of a given endpoint kind and returns when the
+    response has arrived."""
+
+    def __init__(self, client, base_url: str, frames, width: int, height: int, clip_frames: int):
+        self.client = client
+        self.base_url = base_url
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.clip_frames = clip_frames
+
+    def frame(self, i: int):
+        return self.frames[i % len(self.frames)]
+
+    async def request(self, endpoint: str, i: int):
+        raw, jpeg = self.frame(i)
+        url = f"{API_PREFIX}/predict-{endpoint}"
+        if endpoint == "base64":
+            response = await self.client.post(url, json={"image": base64.b64encode(jpeg).decode()})
+        elif endpoint == "file":
+            response = await self.client.post(url, files={"file": ("frame.jpg", jpeg, "image/jpeg")})
+        elif endpoint == "raw":
+            response = await self.client.post(url, content=jpeg)
+        elif endpoint == "raw-rgb":
+            response = await self.client.post(
+                f"{API_PREFIX}/predict-raw",
+                params={"width": self.width, "height": self.height},
+                content=raw,
+            )
+        elif endpoint == "clip":
+            files = [("frames", (f"{n}.jpg", self.frame(i + n)[1], "image/jpeg")) for n in range(self.clip_frames)]
+            response = await self.client.post(url, files=files)
+        else:
+            raise ValueError(f"Unknown endpoint {endpoint}")
+        response.raise_for_status()
+
+
+async def run_http(driver: Driver, endpoint: str, concurrency: int, total: int):
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await driver.request(endpoint, i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_stream(driver: Driver, concurrency: int, total: int):
+    """One socket per concurrent client, each sending frames back to back
+    and waiting for the reply. Latency is per frame."""
+    import websockets
+
+    ws_url = driver.base_url.replace("http", "ws", 1) + f"{API_PREFIX}/stream?token=benchmark"
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            for i in counter:
+                started = time.perf_counter()
+                await ws.send(driver.frame(i)[1])
+                reply = json.loads(await ws.recv())
+                if "error" in reply:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_benchmark(args, base_url: str, frames) -> list:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        status = (await client.get(f"{API_PREFIX}/model-status")).json()
+        if not status.get("model_loaded"):
+            raise SystemExit(f"Model not loaded on {base_url}: {status}")
+
+        driver = Driver(client, base_url, frames, args.width, args.height, args.clip_frames)
+        scenarios = []
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                # Warm connections, buffers and the batcher before timing
+                warmup = min(args.requests, concurrency * 2)
+                if endpoint == "stream":
+                    await run_stream(driver, concurrency, warmup)
+                else:
+                    await run_http(driver, endpoint, concurrency, warmup)
+
+                before = (await client.get(f"{API_PREFIX}/batcher-stats")).json()
+                if endpoint == "stream":
+                    latencies, errors, duration = await run_stream(driver, concurrency, args.requests)
+                else:
+                    latencies, errors, duration = await run_http(driver, endpoint, concurrency, args.requests)
+                after = (await client.get(f"{API_PREFIX}/batcher-stats")).json()
+
+                scenario = {
+                    "endpoint": endpoint,
+                    "concurrency": concurrency,
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "duration_s": duration,
+                    "rps": len(latencies) / duration if duration > 0 else 0.0,
+                    "frames_per_request": args.clip_frames if endpoint == "clip" else 1,
+                    "latency_ms": percentiles(latencies),
+                    "server": batcher_delta(before, after),
+                }
+                scenarios.append(scenario)
+                latency = scenario["latency_ms"]
+                print(f"📊 {endpoint:<8} c={concurrency:<4} {scenario['rps']:8.1f} req/s  "
+                      f"p50 {latency.get('p50', 0):7.2f} ms  p95 {latency.get('p95', 0):7.2f} ms  "
+                      f"p99 {latency.get('p99', 0):7.2f} ms  errors {errors}")
+        return scenarios
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(model_path: str, args, port: int, registry_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        RECOGNITION_MODEL_PATH=model_path,
+        RECOGNITION_REGISTRY_DIR=registry_dir,
+        RECOGNITION_REGISTRY_POLL_SECONDS="0",
+        RECOGNITION_WORKERS=str(args.workers),
+        RECOGNITION_CACHE_SIZE=env.get("RECOGNITION_CACHE_SIZE", "2048") if args.cache else "0",
+    )
+    # The engine is created at import time but never connected to
+    env.setdefault("DATABASE_URL", "mysql+asyncmy://benchmark@127.0.0.1/benchmark")
+    command = [
+        sys.executable, "-m", "uvicorn", "--factory", "scripts.benchmark_recognition:create_app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=str(BACKEND_DIR), env=env)
+
+
+def wait_for_server(base_url: str, process: subprocess.Popen, timeout: float = 120.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Benchmark server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}{API_PREFIX}/model-status", timeout=2.0).json().get("model_loaded"):
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit("Benchmark server did not load the model in time")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(BACKEND_DIR), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous_path: str, result: dict):
+    previous = json.loads(Path(previous_path).read_text())
+    old = {(s["endpoint"], s["concurrency"]): s for s in previous.get("scenarios", [])}
+    print(f"🔍 Compared with {previous_path} ({previous['meta'].get('git_commit')})")
+    for scenario in result["scenarios"]:
+        before = old.get((scenario["endpoint"], scenario["concurrency"]))
+        if before is None or not before["rps"] or not before["latency_ms"]:
+            continue
+        rps_change = (scenario["rps"] / before["rps"] - 1.0) * 100.0
+        p95_change = (scenario["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1.0) * 100.0
+        print(f"   {scenario['endpoint']:<8} c={scenario['concurrency']:<4} "
+              f"req/s {rps_change:+6.1f}%  p95 {p95_change:+6.1f}%")
+
+
+def main(argv=None) -> int:
+    from app.config import RECOGNITION_MAX_BATCH_SIZE, RECOGNITION_MAX_WAIT_MS
+    from app.services.inference_backends import backend_for_path
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--model", help="Model file to serve (default: a generated stand-in model)")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and concurrency")
+    parser.add_argument("--workers", type=int, default=1, help="RECOGNITION_WORKERS for the local server")
+    parser.add_argument("--cache", action="store_true", help="Keep the prediction cache enabled")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--distinct-frames", type=int, default=64)
+    parser.add_argument("--clip-frames", type=int, default=8)
+    parser.add_argument("--out", help="Result file (default: benchmark_results/recognition-<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    frames = synthetic_frames(args.distinct_frames, args.width, args.height)
+    commit = git_commit()
+
+    with tempfile.TemporaryDirectory(prefix="recognition-bench-") as tmp:
+        model_path = args.model
+        if model_path is None and args.url is None:
+            model_path = str(Path(tmp) / "stand_in.h5")
+            print(f"🔄 Building stand-in model at {model_path}")
+            build_stand_in_model(Path(model_path))
+
+        stages = {}
+        if model_path is not None:
+            print("⏱️  Timing pipeline stages")
+            stages = measure_stages(model_path, backend_for_path(model_path), frames, RECOGNITION_MAX_BATCH_SIZE)
+
+        server = None
+        base_url = args.url.rstrip("/") if args.url else None
+        try:
+            if base_url is None:
+                base_url = f"http://127.0.0.1:{free_port()}"
+                print(f"🚀 Starting benchmark server on {base_url}")
+                server = start_server(model_path, args, int(base_url.rsplit(":", 1)[1]), str(Path(tmp) / "registry"))
+                wait_for_server(base_url, server)
+            scenarios = asyncio.run(run_benchmark(args, base_url, frames))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "url": args.url,
+            "model": args.model or "stand-in",
+            "workers": None if args.url else args.workers,
+            "cache": None if args.url else args.cache,
+            "max_batch_size": RECOGNITION_MAX_BATCH_SIZE,
+            "max_wait_ms": RECOGNITION_MAX_WAIT_MS,
+            "frame_size": [args.width, args.height],
+            "requests": args.requests,
+        },
+        "stages": stages,
+        "scenarios": scenarios,
+    }
+
+    out_path = Path(args.out) if args.out else (
+        BACKEND_DIR / "benchmark_results"
+        / f"recognition-{datetime.utcnow():%Y%m%dT%H%M%S}-{commit}.json"
+    )
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(result, indent=2))
+    print(f"📝 Results written to {out_path}")
+
+    if args.compare:
+        compare(args.compare, result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Build the hand-landmark classifier used by /api/recognition/predict-landmarks.
+
+Run from the Backend directory, either from the sign videos in the database
+(needs DATABASE_URL and network access to the video URLs):
+
+    python -m scripts.build_landmark_references --from-signs --kind knn
+
+or from a local folder with one sub-folder of images / videos per label:
+
+    python -m scripts.build_landmark_references --data path/to/hands --kind mlp
+
+Landmarks are extracted with MediaPipe Hands (``pip install mediapipe``,
+only needed here), normalized exactly like the endpoint does, and saved to
+``--out`` (RECOGNITION_LANDMARK_MODEL by default), which running servers
+pick up on the next request. ``knn`` keeps up to ``--max-per-class``
+reference frames per label; ``mlp`` trains a one-hidden-layer network with
+NumPy. A ``--holdout`` share of frames is kept back to report accuracy.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+from app.config import RECOGNITION_LANDMARK_MODEL
+from app.services.landmark_classifier import LandmarkClassifier, normalize_landmarks
+from app.services.recognition_service import sample_indices
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".webm", ".avi", ".mkv"}
+
+
+class LandmarkExtractor:
+    def __init__(self):
+        try:
+            import mediapipe as mp
+        except ImportError:
+            raise SystemExit("mediapipe is required to extract landmarks: pip install mediapipe")
+        self._hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1)
+
+    def from_image(self, bgr: np.ndarray) -> Optional[Tuple[np.ndarray, bool]]:
+        """(21, 3) landmarks and whether it is a left hand, or None."""
+        result = self._hands.process(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+        if not result.multi_hand_landmarks:
+            return None
+        points = np.array([[p.x, p.y, p.z] for p in result.multi_hand_landmarks[0].landmark], dtype=np.float32)
+        left = result.multi_handedness[0].classification[0].label.lower() == "left"
+        return points, left
+
+    def from_video(self, path: str, frames: int) -> List[Tuple[np.ndarray, bool]]:
+        capture = cv2.VideoCapture(path)
+        try:
+            total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            wanted = set(sample_indices(max(total, 0), frames))
+            found = []
+            for index in range(total):
+                if not capture.grab():
+                    break
+                if index not in wanted:
+                    continue
+                ok, img = capture.retrieve()
+                if ok:
+                    landmarks = self.from_image(img)
+                    if landmarks is not None:
+                        found.append(landmarks)
+            return found
+        finally:
+            capture.release()
+
+
+def collect_folder(data_dir: Path, extractor: LandmarkExtractor, frames_per_video: int):
+    """{label: [(points, left)]} from one sub-folder of media per label."""
+    samples = defaultdict(list)
+    for class_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        for path in sorted(class_dir.rglob("*")):
+            suffix = path.suffix.lower()
+            if suffix in IMAGE_EXTENSIONS:
+                img = cv2.imread(str(path))
+                landmarks = extractor.from_image(img) if img is not None else None
+                if landmarks is not None:
+                    samples[class_dir.name].append(landmarks)
+            elif suffix in VIDEO_EXTENSIONS:
+                samples[class_dir.name].extend(extractor.from_video(str(path), frames_per_video))
+        print(f"   {class_dir.name}: {len(samples[class_dir.name])} hands")
+    return samples, {}
+
+
+async def _load_signs():
+    from sqlalchemy import select
+
+    from app.db import async_session
+    from app.models import Sign
+
+    async with async_session() as db:
+        result = await db.execute(select(Sign.id, Sign.text, Sign.video_url).where(Sign.archived == False))
+        return result.all()
+
+
+def collect_signs(extractor: LandmarkExtractor, frames_per_video: int):
+    """{label: [(points, left)]} from every active sign's video. Signs that
+    share a text become one label."""
+    import httpx
+
+    samples, sign_ids = defaultdict(list), {}
+    signs = asyncio.run(_load_signs())
+    print(f"🔄 Extracting landmarks from {len(signs)} sign videos")
+    with httpx.Client(timeout=60.0, follow_redirects=True) as client:
+        for sign_id, text, video_url in signs:
+            label = text.strip().lower()
+            sign_ids.setdefault(label, sign_id)
+            try:
+                response = client.get(video_url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"⚠️  Skipping sign {sign_id} ({text}): {e}")
+                continue
+            fd, path = tempfile.mkstemp(suffix=Path(video_url).suffix or ".mp4")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(response.content)
+                found = extractor.from_video(path, frames_per_video)
+            finally:
+                os.remove(path)
+            samples[label].extend(found)
+            print(f"   {label} (sign {sign_id}): {len(found)} hands")
+    return samples, sign_ids
+
+
+def to_arrays(samples: Dict[str, list]):
+    labels = sorted(label for label, found in samples.items() if found)
+    features, targets = [], []
+    for index, label in enumerate(labels):
+        points = np.stack([p for p, _ in samples[label]])
+        left = [l for _, l in samples[label]]
+        features.append(normalize_landmarks(points, left))
+        targets.append(np.full(len(points), index, dtype=np.int64))
+    return labels, np.concatenate(features), np.concatenate(targets)
+
+
+def split(features: np.ndarray, targets: np.ndarray, holdout: float, rng):
+    order = rng.permutation(len(features))
+    cut = int(len(order) * (1.0 - holdout))
+    return (features[order[:cut]], targets[order[:cut]]), (features[order[cut:]], targets[order[cut:]])
+
+
+def build_knn(features, targets, num_classes: int, k: int, max_per_class: int, rng) -> dict:
+    keep = []
+    for index in range(num_classes):
+        rows = np.flatnonzero(targets == index)
+        if len(rows) > max_per_class:
+            rows = rng.choice(rows, max_per_class, replace=False)
+        keep.append(rows)
+    keep = np.concatenate(keep)
+    return {"kind": "knn", "references": features[keep], "reference_labels": targets[keep], "k": k}
+
+
+def train_mlp(features, targets, num_classes: int, hidden: int, epochs: int, rng,
+              learning_rate: float = 0.01, batch_size: int = 256, jitter: float = 0.02) -> dict:
+    """One-hidden-layer softmax classifier trained with Adam on jittered
+    copies of the frames."""
+    params = {
+        "w1": rng.normal(0, np.sqrt(2.0 / features.shape[1]), (features.shape[1], hidden)).astype(np.float32),
+        "b1": np.zeros(hidden, dtype=np.float32),
+        "w2": rng.normal(0, np.sqrt(1.0 / hidden), (hidden, num_classes)).astype(np.float32),
+        "b2": np.zeros(num_classes, dtype=np.float32),
+    }
+    moments = {name: (np.zeros_like(p), np.zeros_like(p)) for name, p in params.items()}
+    step = 0
+    for epoch in range(epochs):
+        order = rng.permutation(len(features))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            x = features[rows] + rng.normal(0, jitter, (len(rows), features.shape[1])).astype(np.float32)
+            y = targets[rows]
+
+            pre = x @ params["w1"] + params["b1"]
+            hidden_out = np.maximum(pre, 0.0)
+            logits = hidden_out @ params["w2"] + params["b2"]
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+
+            grad_logits = probs
+            grad_logits[np.arange(len(rows)), y] -= 1.0
+            grad_logits /= len(rows)
+            grad_hidden = (grad_logits @ params["w2"].T) * (pre > 0)
+            grads = {
+                "w2": hidden_out.T @ grad_logits,
+                "b2": grad_logits.sum(axis=0),
+                "w1": x.T @ grad_hidden,
+                "b1": grad_hidden.sum(axis=0),
+            }
+
+            step += 1
+            for name, grad in grads.items():
+                m, v = moments[name]
+                m[...] = 0.9 * m + 0.1 * grad
+                v[...] = 0.999 * v + 0.001 * grad * grad
+                m_hat = m / (1 - 0.9 ** step)
+                v_hat = v / (1 - 0.999 ** step)
+                params[name] -= (learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+    return {"kind": "mlp", **params}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-signs", action="store_true", help="Use the videos of all active signs")
+    source.add_argument("--data", help="Folder with one sub-folder of images/videos per label")
+    parser.add_argument("--kind", choices=("knn", "mlp"), default="knn")
+    parser.add_argument("--frames-per-video", type=int, default=12)
+    parser.add_argument("--k", type=int, default=5, help="Neighbours per vote (knn)")
+    parser.add_argument("--max-per-class", type=int, default=200, help="Reference frames kept per label (knn)")
+    parser.add_argument("--hidden", type=int, default=64, help="Hidden units (mlp)")
+    parser.add_argument("--epochs", type=int, default=200, help="Training epochs (mlp)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of frames kept back for scoring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=RECOGNITION_LANDMARK_MODEL)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    extractor = LandmarkExtractor()
+    if args.from_signs:
+        samples, sign_ids = collect_signs(extractor, args.frames_per_video)
+    else:
+        samples, sign_ids = collect_folder(Path(args.data), extractor, args.frames_per_video)
+
+    labels, features, targets = to_arrays(samples)
+    if len(labels) < 2:
+        raise SystemExit("Need hand landmarks for at least two labels")
+    (train_x, train_y), (test_x, test_y) = split(features, targets, args.holdout, rng)
+    print(f"🔄 Building {args.kind} classifier: {len(labels)} labels, "
+          f"{len(train_x)} training / {len(test_x)} held-out frames")
+
+    if args.kind == "knn":
+        model = build_knn(train_x, train_y, len(labels), args.k, args.max_per_class, rng)
+    else:
+        model = train_mlp(train_x, train_y, len(labels), args.hidden, args.epochs, rng)
+    model["labels"] = np.array(labels)
+    model["sign_ids"] = np.array([sign_ids.get(label, -1) for label in labels], dtype=np.int64)
+
+    if len(test_x):
+        classifier = LandmarkClassifier(model)
+        accuracy = float(np.mean(classifier.predict(test_x).argmax(axis=1) == test_y))
+        print(f"📊 Held-out accuracy: {accuracy:.4f}")
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so running servers never load a half-written file
+    tmp_path = out_path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp_path, **model)
+    os.replace(tmp_path, out_path)
+    print(f"📝 Landmark classifier written to {out_path} ({out_path.stat().st_size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Import-time budget check for the API.
+
+Run from the Backend directory:
+
+    python -m scripts.check_import_time --mode remote --budget-ms 1500
+
+Imports ``--module`` (``app.main`` by default) in a fresh interpreter with
+RECOGNITION_MODE set to ``--mode``, ``--repeat`` times, and takes the fastest
+run. Prints the slowest imports the module makes, from ``python -X importtime``. Exits non-zero
+if the import takes longer than ``--budget-ms``, or if a non-local mode
+pulls in the model stack (numpy, cv2, tensorflow, ...), which the
+recognition router is supposed to keep out of API-only pods.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MODES = ("local", "remote", "off")
+
+# Must not be imported unless recognition runs in this process
+HEAVY_MODULES = ("numpy", "cv2", "tensorflow", "tflite_runtime", "onnxruntime")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(module: str, mode: str, importtime: bool = False):
+    env = dict(os.environ)
+    env["RECOGNITION_MODE"] = mode
+    # app.db builds its engine at import; nothing connects during the check
+    env.setdefault("DATABASE_URL", "mysql+asyncmy://check@127.0.0.1/check")
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)]
+    result = subprocess.run(command, cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_output: str, top: int):
+    """(cumulative ms, module) of the slowest imports made directly by the
+    checked module."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level under the module
+        # that triggered them; level 1 is what the checked module imports
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level != 1:
+            continue
+        rows.append((int(cumulative_us) / 1000.0, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--mode", choices=MODES, default="remote", help="RECOGNITION_MODE to check")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.module, args.mode)[0] for _ in range(max(1, args.repeat))]
+    best_ms = min(run["seconds"] for run in runs) * 1000.0
+    heavy = runs[0]["heavy"]
+
+    _, importtime_output = run_once(args.module, args.mode, importtime=True)
+    print(f"⏱️  import {args.module} (RECOGNITION_MODE={args.mode}): {best_ms:.0f} ms "
+          f"(best of {len(runs)}, budget {args.budget_ms:.0f} ms)")
+    for cumulative_ms, name in slowest_imports(importtime_output, args.top):
+        print(f"   {cumulative_ms:8.1f} ms  {name}")
+
+    failed = False
+    if best_ms > args.budget_ms:
+        print(f"❌ Import time over budget by {best_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if heavy and args.mode != "local":
+        print(f"❌ RECOGNITION_MODE={args.mode} imported {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("✅ Within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Convert the Keras sign classifier into TFLite / ONNX artifacts and check
+that each one still agrees with the original on top-1 predictions.
+
+Run from the Backend directory:
+
+    python -m scripts.convert_model --model models/model.h5 --out-dir models/converted \
+        --formats tflite tflite-int8 onnx --images path/to/sample/frames
+
+``--images`` is a folder (searched recursively) of hand images used both as
+the int8 calibration set and for the agreement check. Without it random
+frames are used, which only proves the graph converted, not that accuracy
+held up. Exits non-zero if any artifact falls below ``--min-agreement``.
+
+Each artifact is converted to a temporary file next to its final name and
+only renamed over it once it passed, so devices never download a half
+written or rejected file. conversion_report.json keeps the results of
+earlier runs for formats not converted this time.
+
+The tflite artifacts that pass are what /api/recognition/mobile/manifest
+offers to devices: convert the default model into RECOGNITION_MOBILE_DIR
+(the ``--out-dir`` default), or a registry version into its own directory:
+
+    python -m scripts.convert_model --model models/registry/v3/model.h5 \
+        --out-dir models/registry/v3 --formats tflite-int8 tflite --images frames/
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from app.config import RECOGNITION_MOBILE_DIR
+from app.services.inference_backends import KerasBackend, load_backend
+from app.services.model_distribution import artifact_filename
+from app.services.recognition_service import IMG_SIZE, preprocess_image
+
+FORMATS = ("tflite", "tflite-fp16", "tflite-int8", "onnx")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def load_frames(images_dir: str, limit: int) -> np.ndarray:
+    if not images_dir:
+        print(f"⚠️  No --images given, using {limit} random frames")
+        rng = np.random.default_rng(0)
+        return rng.random((limit, IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+
+    frames = []
+    for path in sorted(Path(images_dir).rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        try:
+            frames.append(preprocess_image(path.read_bytes()))
+        except ValueError:
+            print(f"⚠️  Skipping unreadable image {path}")
+        if len(frames) >= limit:
+            break
+    if not frames:
+        raise SystemExit(f"No images found in {images_dir}")
+    return np.stack(frames)
+
+
+def convert_tflite(keras_model, out_path: Path, mode: str, frames: np.ndarray):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if mode == "tflite-fp16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "tflite-int8":
+        def representative_dataset():
+            for frame in frames:
+                yield [frame[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    out_path.write_bytes(converter.convert())
+
+
+def convert_onnx(keras_model, out_path: Path):
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, IMG_SIZE[1], IMG_SIZE[0], 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=13, output_path=str(out_path))
+
+
+def top1_agreement(reference: np.ndarray, candidate: np.ndarray) -> float:
+    return float(np.mean(np.argmax(reference, axis=1) == np.argmax(candidate, axis=1)))
+
+
+def predict_in_batches(backend, frames: np.ndarray, batch_size: int = 32) -> np.ndarray:
+    return np.concatenate([
+        backend.predict(frames[i:i + batch_size]) for i in range(0, len(frames), batch_size)
+    ])
+
+
+def load_report(report_path: Path) -> dict:
+    """Previous conversion_report.json, or an empty one."""
+    if not report_path.exists():
+        return {"artifacts": {}}
+    try:
+        report = json.loads(report_path.read_text())
+    except ValueError:
+        print(f"⚠️  Ignoring unreadable {report_path}")
+        return {"artifacts": {}}
+    report.setdefault("artifacts", {})
+    return report
+
+
+def write_report(report_path: Path, report: dict):
+    tmp = report_path.with_name(f".{report_path.name}.tmp")
+    tmp.write_text(json.dumps(report, indent=2))
+    os.replace(tmp, report_path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/model.h5")
+    parser.add_argument("--out-dir", default=RECOGNITION_MOBILE_DIR,
+                        help="Use the version directory to publish a registry version to devices")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--images", help="Folder of sample hand images for calibration and checks")
+    parser.add_argument("--limit", type=int, default=256, help="Max images to use")
+    parser.add_argument("--min-agreement", type=float, default=0.98,
+                        help="Minimum top-1 agreement with the Keras model (0..1)")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(args.model).stem
+
+    reference_backend = KerasBackend(args.model)
+    frames = load_frames(args.images, args.limit)
+    reference = predict_in_batches(reference_backend, frames)
+
+    report_path = out_dir / "conversion_report.json"
+    report = load_report(report_path)
+    report.update(model=args.model, frames=len(frames))
+    failed = False
+    for fmt in args.formats:
+        out_path = out_dir / artifact_filename(stem, fmt)
+        # Same suffix, so load_backend still picks the right backend
+        tmp_path = out_path.with_name(f".tmp-{out_path.name}")
+
+        print(f"🔄 Converting {args.model} -> {out_path}")
+        try:
+            if fmt == "onnx":
+                convert_onnx(reference_backend.model, tmp_path)
+            else:
+                convert_tflite(reference_backend.model, tmp_path, fmt, frames)
+
+            candidate = predict_in_batches(load_backend(str(tmp_path)), frames)
+            agreement = top1_agreement(reference, candidate)
+            ok = agreement >= args.min_agreement
+            size = tmp_path.stat().st_size
+            if ok:
+                os.replace(tmp_path, out_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        failed = failed or not ok
+        # A rejected conversion stays marked failed, which also keeps an
+        # older file of the same format from being offered again
+        report["artifacts"][fmt] = {
+            "path": str(out_path),
+            "model": args.model,
+            "frames": len(frames),
+            "size_bytes": size,
+            "top1_agreement": agreement,
+            "max_abs_diff": float(np.max(np.abs(reference - candidate))),
+            "passed": ok,
+        }
+        # After every format, so an interrupted run still records what it did
+        write_report(report_path, report)
+        print(f"{'✅' if ok else '❌'} {fmt}: top-1 agreement {agreement:.4f} "
+              f"({size / 1024:.0f} KiB){'' if ok else ', not published'}")
+
+    print(f"📝 Report written to {report_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Score one or more recognition models against a folder of labelled images.
+
+Run from the Backend directory:
+
+    python -m scripts.evaluate_model --data path/to/eval \
+        --models models/model.h5 v2 models/converted/model-int8.tflite
+
+``--data`` holds one sub-folder per class, named after the label
+(``a/``, ``b/``, ... or ``hello/``), searched recursively. Each ``--models``
+entry is a model file or a registry version name; registry versions use
+their own label set, plain files use ``--labels`` or the a-z letters.
+
+Images are streamed from disk: file names are listed up front, but pixels
+are only decoded ``--prefetch`` batches ahead, on ``--threads`` threads,
+with the same ``preprocess_image`` the HTTP endpoints use. Every decoded
+batch is run through all models, so comparing several models costs one
+decode pass.
+
+Prints accuracy, images per second and per-class accuracy / latency for
+each model. ``--out`` also writes the confusion matrices as JSON.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from app.config import RECOGNITION_MAX_BATCH_SIZE
+from app.services import model_registry
+from app.services.inference_backends import backend_for_path, load_backend
+from app.services.label_sets import LabelSet
+from app.services.recognition_service import FRAME_SHAPE, preprocess_image
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def list_samples(data_dir: Path, limit: int = None) -> List[Tuple[Path, str]]:
+    """(path, class folder name) for every image under ``data_dir``."""
+    samples = []
+    for class_dir in sorted(p for p in data_dir.iterdir() if p.is_dir()):
+        for path in sorted(class_dir.rglob("*")):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                samples.append((path, class_dir.name))
+    if limit:
+        # Spread the limit across classes instead of taking the first few
+        step = max(1, len(samples) // limit)
+        samples = samples[::step][:limit]
+    return samples
+
+
+def _load_batch(chunk: List[Tuple[Path, str]]):
+    batch = np.empty((len(chunk),) + FRAME_SHAPE, dtype=np.float32)
+    names, decode_times, failed = [], [], []
+    for path, name in chunk:
+        started = time.perf_counter()
+        try:
+            preprocess_image(path.read_bytes(), out=batch[len(names)])
+        except (OSError, ValueError):
+            failed.append(str(path))
+            continue
+        decode_times.append(time.perf_counter() - started)
+        names.append(name)
+    return batch[:len(names)], names, np.asarray(decode_times), failed
+
+
+def iter_batches(samples, batch_size: int, threads: int, prefetch: int) -> Iterator:
+    """Decode ``samples`` into (frames, class names, decode seconds, failed
+    paths) batches on a thread pool, keeping at most ``prefetch`` batches
+    decoded or in progress."""
+    chunks = (samples[i:i + batch_size] for i in range(0, len(samples), batch_size))
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="evaluate-decode") as executor:
+        pending = deque(executor.submit(_load_batch, chunk) for chunk in islice(chunks, prefetch))
+        while pending:
+            future = pending.popleft()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(executor.submit(_load_batch, chunk))
+            yield future.result()
+
+
+class ModelEvaluation:
+    """Running confusion matrix and latency totals for one model."""
+
+    def __init__(self, name: str, model_path: str, backend: str, labels: LabelSet):
+        self.name = name
+        self.model_path = model_path
+        self.backend = backend
+        self.labels = labels
+        self.model = None
+        self.num_classes = None
+        self.confusion = None
+        # True class index -> per-image decode + share-of-batch predict seconds
+        self.class_latencies = {}
+        self.predict_seconds = 0.0
+        self.images = 0
+        self.unmapped = 0
+
+    def load(self):
+        started = time.perf_counter()
+        self.model = load_backend(self.model_path, self.backend)
+        self.num_classes = int(self.model.predict(np.zeros((1,) + FRAME_SHAPE, dtype=np.float32)).shape[-1])
+        self.confusion = np.zeros((self.num_classes, self.num_classes), dtype=np.int64)
+        print(f"✅ Loaded {self.name} ({self.backend}, {self.num_classes} classes) "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    def update(self, frames: np.ndarray, names: List[str], decode_times: np.ndarray):
+        started = time.perf_counter()
+        predictions = self.model.predict(frames)
+        elapsed = time.perf_counter() - started
+        self.predict_seconds += elapsed
+
+        predicted, _ = self.labels.top_k(predictions, k=1)
+        per_image = decode_times + elapsed / len(frames)
+        for name, guess, latency in zip(names, predicted[:, 0], per_image):
+            truth = self.labels.index_for_sign(None, name)
+            if truth is None or truth >= self.num_classes:
+                self.unmapped += 1
+                continue
+            self.confusion[truth, guess] += 1
+            self.class_latencies.setdefault(truth, []).append(latency)
+            self.images += 1
+
+    def report(self, wall_seconds: float) -> dict:
+        correct = int(np.trace(self.confusion))
+        per_class = {}
+        for index, latencies in sorted(self.class_latencies.items()):
+            total = int(self.confusion[index].sum())
+            values = np.asarray(latencies) * 1000.0
+            per_class[self.labels.label(index)] = {
+                "images": total,
+                "accuracy": float(self.confusion[index, index] / total) if total else 0.0,
+                "latency_ms_mean": float(values.mean()),
+                "latency_ms_p95": float(np.percentile(values, 95)),
+            }
+        return {
+            "model": self.name,
+            "model_path": self.model_path,
+            "backend": self.backend,
+            "images": self.images,
+            "unmapped_images": self.unmapped,
+            "accuracy": correct / self.images if self.images else 0.0,
+            "predict_images_per_second": self.images / self.predict_seconds if self.predict_seconds else 0.0,
+            "pipeline_images_per_second": self.images / wall_seconds if wall_seconds else 0.0,
+            "per_class": per_class,
+            "labels": [self.labels.label(i) for i in range(self.num_classes)],
+            "confusion_matrix": self.confusion.tolist(),
+        }
+
+
+def resolve_model(spec: str, labels_path: str = None) -> ModelEvaluation:
+    """A model file path or a registry version name -> evaluation."""
+    if Path(spec).is_file():
+        labels = LabelSet.from_file(Path(labels_path)) if labels_path else LabelSet.default()
+        return ModelEvaluation(spec, spec, backend_for_path(spec), labels)
+
+    version = model_registry.get_version(spec)
+    if labels_path:
+        labels = LabelSet.from_file(Path(labels_path))
+    elif version.directory is not None:
+        labels = LabelSet.for_model_dir(version.directory)
+    else:
+        labels = LabelSet.default()
+    return ModelEvaluation(spec, version.model_path, version.backend, labels)
+
+
+def print_report(report: dict, top_confusions: int = 5):
+    print(f"\n📊 {report['model']}: accuracy {report['accuracy']:.4f} on {report['images']} images, "
+          f"{report['predict_images_per_second']:.1f} img/s predict, "
+          f"{report['pipeline_images_per_second']:.1f} img/s end to end")
+    if report["unmapped_images"]:
+        print(f"⚠️  {report['unmapped_images']} images had a class folder the model has no label for")
+
+    print(f"   {'class':<12} {'images':>7} {'accuracy':>9} {'mean ms':>8} {'p95 ms':>8}")
+    for label, row in report["per_class"].items():
+        print(f"   {label:<12} {row['images']:>7} {row['accuracy']:>9.4f} "
+              f"{row['latency_ms_mean']:>8.2f} {row['latency_ms_p95']:>8.2f}")
+
+    confusion = np.asarray(report["confusion_matrix"])
+    np.fill_diagonal(confusion, 0)
+    worst = np.argsort(confusion, axis=None)[::-1][:top_confusions]
+    pairs = [np.unravel_index(i, confusion.shape) for i in worst if confusion.flat[i] > 0]
+    if pairs:
+        print("   most confused (true -> predicted):")
+        for truth, guess in pairs:
+            print(f"     {report['labels'][truth]} -> {report['labels'][guess]}: {confusion[truth, guess]}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Folder with one sub-folder of images per class")
+    parser.add_argument("--models", nargs="+", default=["models/model.h5"],
+                        help="Model files and/or registry version names")
+    parser.add_argument("--labels", help="labels.json / labels.txt for plain model files")
+    parser.add_argument("--batch-size", type=int, default=RECOGNITION_MAX_BATCH_SIZE * 2)
+    parser.add_argument("--threads", type=int, default=4, help="Decode threads")
+    parser.add_argument("--prefetch", type=int, default=8, help="Batches decoded ahead of the models")
+    parser.add_argument("--limit", type=int, help="Evaluate at most this many images")
+    parser.add_argument("--out", help="Write the full report (incl. confusion matrices) as JSON")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data)
+    if not data_dir.is_dir():
+        raise SystemExit(f"{data_dir} is not a directory")
+    samples = list_samples(data_dir, args.limit)
+    if not samples:
+        raise SystemExit(f"No images found in {data_dir}")
+    print(f"🔄 Evaluating {len(samples)} images from {data_dir} "
+          f"in batches of {args.batch_size} ({args.threads} decode threads)")
+
+    evaluations = []
+    for spec in args.models:
+        try:
+            evaluations.append(resolve_model(spec, args.labels))
+        except LookupError as e:
+            raise SystemExit(str(e))
+    for evaluation in evaluations:
+        evaluation.load()
+
+    failed = []
+    started = time.perf_counter()
+    processed = batches = 0
+    for frames, names, decode_times, batch_failed in iter_batches(
+        samples, args.batch_size, max(1, args.threads), max(1, args.prefetch)
+    ):
+        failed.extend(batch_failed)
+        if not names:
+            continue
+        for evaluation in evaluations:
+            evaluation.update(frames, names, decode_times)
+        processed += len(names)
+        batches += 1
+        if batches % 50 == 0:
+            print(f"   {processed}/{len(samples)} images")
+    wall_seconds = time.perf_counter() - started
+
+    if failed:
+        print(f"⚠️  Skipped {len(failed)} unreadable images")
+    reports = [evaluation.report(wall_seconds) for evaluation in evaluations]
+    for report in reports:
+        print_report(report)
+
+    if len(reports) > 1:
+        print("\n🏁 Comparison")
+        for report in sorted(reports, key=lambda r: r["accuracy"], reverse=True):
+            print(f"   {report['model']:<40} accuracy {report['accuracy']:.4f}  "
+                  f"{report['predict_images_per_second']:8.1f} img/s")
+
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps({
+            "data": str(data_dir),
+            "images": len(samples),
+            "unreadable_images": failed,
+            "wall_seconds": wall_seconds,
+            "models": reports,
+        }, indent=2))
+        print(f"📝 Report written to {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Merge duplicate lesson progress rows and add the (user_id, lesson_id)
+unique key that progress upserts rely on.
+
+Run once per database from the Backend directory, before deploying the
+upserting /update-progress (needs DATABASE_URL):
+
+    python -m scripts.migrate_progress_unique --dry-run
+    python -m scripts.migrate_progress_unique
+
+Each duplicated (user_id, lesson_id) pair is folded into its oldest row:
+the highest progress, completed if any copy was, and last_question and
+updated_at from the most recently updated copy. The other copies are
+deleted.
+
+This happens in two steps. Step 1 merges the duplicates and commits.
+Step 2 then creates the unique index, but only if it does not exist yet.
+The steps cannot share a transaction, because on MySQL CREATE UNIQUE
+INDEX commits implicitly.
+
+If a run stops between the two steps, the merged rows are already
+stored and the index is missing. The old, inserting /update-progress may
+also create new duplicates in that gap, and then the index creation
+fails on them. In both cases, run the script again: it merges whatever
+duplicates exist and then creates the index. The script is safe to
+re-run at any point. Once the index exists, there is nothing left to
+merge and the script does nothing.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from sqlalchemy import delete, func, inspect, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from app.db import engine
+from app.models import UserProgress
+
+INDEX_NAME = "uq_user_progress_user_lesson"
+
+
+def merge_rows(rows) -> dict:
+    """Column values the kept row gets, given every copy of one pair."""
+    latest = max(rows, key=lambda r: (r.updated_at or datetime.min, r.id))
+    return {
+        "progress": max(r.progress or 0 for r in rows),
+        "completed": any(r.completed for r in rows),
+        "last_question": latest.last_question or 0,
+        "updated_at": latest.updated_at,
+    }
+
+
+def _has_unique_key(sync_conn) -> bool:
+    inspector = inspect(sync_conn)
+    names = {index["name"] for index in inspector.get_indexes(UserProgress.__tablename__)}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints(UserProgress.__tablename__)}
+    return INDEX_NAME in names
+
+
+async def merge_duplicates(conn) -> int:
+    """Fold every duplicated pair into its oldest row. Returns the number
+    of rows deleted; the caller commits or rolls back."""
+    pairs = (await conn.execute(
+        select(UserProgress.user_id, UserProgress.lesson_id)
+        .group_by(UserProgress.user_id, UserProgress.lesson_id)
+        .having(func.count() > 1)
+    )).all()
+    print(f"🔄 {len(pairs)} (user_id, lesson_id) pairs have duplicate rows")
+
+    removed = 0
+    for user_id, lesson_id in pairs:
+        rows = (await conn.execute(
+            select(UserProgress.__table__)
+            .where(UserProgress.user_id == user_id, UserProgress.lesson_id == lesson_id)
+            .order_by(UserProgress.id)
+        )).all()
+        keep, extra = rows[0], [r.id for r in rows[1:]]
+        values = merge_rows(rows)
+        print(f"   user {user_id} lesson {lesson_id}: keeping row {keep.id} {values}, deleting {extra}")
+        await conn.execute(update(UserProgress.__table__).where(UserProgress.id == keep.id).values(**values))
+        await conn.execute(delete(UserProgress.__table__).where(UserProgress.id.in_(extra)))
+        removed += len(extra)
+    return removed
+
+
+async def migrate(dry_run: bool) -> int:
+    async with engine.connect() as conn:
+        if await conn.run_sync(_has_unique_key):
+            print(f"✅ {INDEX_NAME} already exists, nothing to do")
+            return 0
+
+        # Step 1: merge and commit on its own, so the work survives a
+        # failed or interrupted index build
+        removed = await merge_duplicates(conn)
+        if dry_run:
+            await conn.rollback()
+            print(f"ℹ️  Dry run: would delete {removed} rows and create {INDEX_NAME}")
+            return 0
+        await conn.commit()
+        print(f"✅ Deleted {removed} duplicate rows")
+
+        # Step 2: MySQL commits DDL implicitly, so this is its own step. Checked
+        # again in case another run created the index in the meantime
+        if await conn.run_sync(_has_unique_key):
+            print(f"✅ {INDEX_NAME} already exists")
+            return 0
+        try:
+            await conn.execute(text(
+                f"CREATE UNIQUE INDEX {INDEX_NAME} ON {UserProgress.__tablename__} (user_id, lesson_id)"
+            ))
+            await conn.commit()
+        except IntegrityError:
+            # Duplicates written since step 1; the merged rows stay merged
+            print(f"❌ New duplicate rows appeared before {INDEX_NAME} was created; run the script again")
+            return 1
+    print(f"✅ Created {INDEX_NAME}")
+    return 0
+
+
+async def _run(dry_run: bool) -> int:
+    try:
+        return await migrate(dry_run)
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report the merges without changing anything")
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before anything imports it
+_db_dir = tempfile.mkdtemp(prefix="senya-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+
+from app import models
+from app.db import async_session, engine
+from app.services import catalog, course_graph
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on freshly created tables."""
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+    # Cached course order and content belong to the previous test's tables
+    course_graph.invalidate()
+    catalog.invalidate()
+    async with async_session() as session:
+        yield session
+
+
+@pytest.fixture
+async def course(db):
+    """User 1 (with a profile) and one unit of three lessons, ids 10-12."""
+    db.add(models.Account(user_id=1, name="Ana", username="ana", email="ana@example.com", hash_password="x"))
+    db.add(models.UserProfile(user_id=1, hearts=5, rubies=0, streak=0))
+    db.add(models.Unit(id=1, title="Basics", order_index=0))
+    db.add_all([
+        models.Lesson(id=lesson_id, unit_id=1, title=f"Lesson {lesson_id}", order_index=index, rubies_reward=5)
+        for index, lesson_id in enumerate((10, 11, 12))
+    ])
+    await db.commit()
+    return db
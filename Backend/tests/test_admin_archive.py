@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.dependencies import get_admin_user
+from app.models import Lesson, Sign, Unit
+from app.routes import admin_lessons, admin_units
+from app.services import fingerspelling
+
+pytestmark = pytest.mark.anyio
+
+app = FastAPI()
+app.include_router(admin_lessons.router, prefix="/admin/lessons")
+app.include_router(admin_units.router, prefix="/admin/units")
+app.dependency_overrides[get_admin_user] = lambda: object()
+
+
+@pytest.fixture
+async def client(course):
+    course.add(Unit(id=2, title="Animals", order_index=1))
+    course.add(Lesson(id=20, unit_id=2, title="Pets", order_index=0))
+    course.add_all([
+        Sign(id=1, lesson_id=10, text="cat", video_url="v"),
+        Sign(id=2, lesson_id=20, text="dog", video_url="v"),
+        Sign(id=3, lesson_id=20, text="cow", video_url="v"),
+    ])
+    await course.commit()
+    fingerspelling.lexicon.sync([(1, "cat"), (2, "dog"), (3, "cow")])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    fingerspelling.lexicon.sync([])
+
+
+def lexicon_signs():
+    return sorted(fingerspelling.lexicon._signs)
+
+
+async def test_updating_a_unit_leaves_the_lexicon_alone(client):
+    response = await client.put(
+        "/admin/units/2", data={"title": "Farm", "order_index": 1, "status": "active"}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Farm"
+    assert lexicon_signs() == [1, 2, 3]
+
+
+async def test_archiving_a_lesson_drops_its_signs(client, course):
+    assert (await client.patch("/admin/lessons/10/archive")).status_code == 200
+    assert lexicon_signs() == [2, 3]
+
+
+async def test_archiving_a_unit_drops_its_signs(client, course):
+    assert (await client.patch("/admin/units/2/archive")).status_code == 200
+    assert lexicon_signs() == [1]
+    archived = (await course.execute(select(Sign.id).where(Sign.archived == True))).scalars().all()
+    assert sorted(archived) == [2, 3]
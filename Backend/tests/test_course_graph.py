@@ -0,0 +1,93 @@
+import pytest
+
+from app.models import Lesson, Unit, UserProgress
+from app.services import course_graph
+from app.services.course_graph import CourseGraph, LessonNode, UnitNode
+
+pytestmark = pytest.mark.anyio
+
+
+def make_graph(*units) -> CourseGraph:
+    """Units given as tuples of lesson ids, numbered 1, 2, ... in order."""
+    unit_nodes = [UnitNode(i, f"Unit {i}", None, i, tuple(ids)) for i, ids in enumerate(units, 1)]
+    lessons = {
+        lesson_id: LessonNode(lesson_id, unit.id, f"Lesson {lesson_id}", None, position, None, 5)
+        for unit in unit_nodes
+        for position, lesson_id in enumerate(unit.lesson_ids)
+    }
+    return CourseGraph(unit_nodes, lessons)
+
+
+def done(*lesson_ids):
+    return {
+        lesson_id: UserProgress(user_id=1, lesson_id=lesson_id, progress=100, completed=True, last_question=5)
+        for lesson_id in lesson_ids
+    }
+
+
+def test_lesson_unlocks_once_the_previous_one_is_completed():
+    graph = make_graph((10, 11, 12))
+    assert not graph.lesson_locked(10, set())
+    assert graph.lesson_locked(11, set())
+    assert not graph.lesson_locked(11, {10})
+    assert graph.lesson_locked(12, {10})
+
+
+def test_unit_unlocks_once_the_unit_before_is_completed():
+    graph = make_graph((10, 11), (20,))
+    assert not graph.unit_locked(1, set())
+    assert graph.unit_locked(2, {10})
+    assert graph.lesson_locked(20, {10})
+    assert not graph.unit_locked(2, {10, 11})
+    assert not graph.lesson_locked(20, {10, 11})
+
+
+def test_empty_unit_keeps_the_rest_locked():
+    graph = make_graph((10,), (), (30,))
+    assert not graph.unit_locked(2, {10})
+    assert graph.unit_locked(3, {10})
+
+
+def test_next_lesson_crosses_into_the_next_unit_with_lessons():
+    graph = make_graph((10, 11), (), (30,))
+    assert graph.next_lesson(10) == 11
+    assert graph.next_lesson(11) == 30
+    assert graph.next_lesson(30) is None
+    assert graph.previous_lesson(10) is None
+    assert graph.previous_lesson(11) == 10
+
+
+def test_course_map_points_at_the_first_open_unfinished_lesson():
+    graph = make_graph((10, 11), (20,))
+    fresh = graph.course_map({})
+    assert fresh["next_lesson_id"] == 10
+    assert [l["is_locked"] for l in fresh["units"][0]["lessons"]] == [False, True]
+    assert fresh["units"][1]["is_locked"]
+
+    progress = done(10)
+    progress[11] = UserProgress(user_id=1, lesson_id=11, progress=40, completed=False, last_question=2)
+    partial = graph.course_map(progress)
+    assert partial["next_lesson_id"] == 11
+    assert partial["units"][0]["progress_percentage"] == 70.0
+    assert partial["units"][0]["completed_lessons"] == 1
+    assert partial["units"][1]["is_locked"]
+
+    finished = graph.course_map(done(10, 11))
+    assert finished["next_lesson_id"] == 20
+    assert finished["units"][0]["completed"]
+    assert not finished["units"][1]["is_locked"]
+    assert graph.course_map(done(10, 11, 20))["next_lesson_id"] is None
+
+
+async def test_load_graph_skips_archived_content_and_orders_lessons(course):
+    course.add(Unit(id=2, title="Archived", order_index=1, archived=True))
+    course.add(Lesson(id=20, unit_id=2, title="Hidden", order_index=0))
+    course.add(Lesson(id=13, unit_id=1, title="Gone", order_index=3, archived=True))
+    course.add(Lesson(id=9, unit_id=1, title="First", order_index=-1))
+    await course.commit()
+
+    graph = await course_graph.load_graph(course)
+    assert [unit.id for unit in graph.units] == [1]
+    assert graph.units[0].lesson_ids == (9, 10, 11, 12)
+    assert set(graph.lessons) == {9, 10, 11, 12}
+    assert graph.lessons[10].rubies_reward == 5
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select, update
+
+from app.dependencies import get_current_user
+from app.models import DailyChallenge, Lesson, UserProgress
+from app.routes import lessons_routes
+from app.services import daily_challenge
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date(2026, 3, 14)
+
+
+async def complete(db, *lesson_ids):
+    db.add_all([
+        UserProgress(user_id=1, lesson_id=lesson_id, progress=100, completed=True, last_question=5)
+        for lesson_id in lesson_ids
+    ])
+    await db.commit()
+
+
+async def stored(db):
+    result = await db.execute(
+        select(DailyChallenge.challenge_date, DailyChallenge.lesson_id).order_by(DailyChallenge.challenge_date)
+    )
+    return [tuple(row) for row in result]
+
+
+def test_pick_is_stable_for_a_user_and_day():
+    first = daily_challenge.pick([10, 11, 12], 1, TODAY)
+    assert daily_challenge.pick([12, 10, 11], 1, TODAY) == first
+    assert first in (10, 11, 12)
+
+
+async def test_lookup_without_a_profile_is_none(db):
+    assert await daily_challenge.lookup(db, 1, TODAY) is None
+
+
+async def test_nothing_to_assign_without_completed_lessons(course):
+    course.add(UserProgress(user_id=1, lesson_id=10, progress=50, completed=False, last_question=2))
+    await course.commit()
+    assert await daily_challenge.assign(course, 1, TODAY) is None
+    assert await stored(course) == []
+
+
+async def test_assignment_is_stored_and_looked_up(course):
+    await complete(course, 10, 11, 12)
+    assert await daily_challenge.lookup(course, 1, TODAY) == (None, None)
+
+    lesson_id = await daily_challenge.assign(course, 1, TODAY)
+    assert lesson_id == daily_challenge.pick([10, 11, 12], 1, TODAY)
+    assert await daily_challenge.lookup(course, 1, TODAY) == (None, lesson_id)
+
+
+async def test_archived_lessons_are_not_picked(course):
+    await complete(course, 10, 11)
+    await course.execute(update(Lesson).where(Lesson.id == 10).values(archived=True))
+    await course.commit()
+    assert await daily_challenge.assign(course, 1, TODAY) == 11
+
+
+async def test_earlier_days_are_removed(course):
+    await complete(course, 10)
+    course.add(DailyChallenge(user_id=1, challenge_date=TODAY - timedelta(days=2), lesson_id=10))
+    await course.commit()
+
+    await daily_challenge.assign(course, 1, TODAY)
+    assert await stored(course) == [(TODAY, 10)]
+
+
+async def test_a_row_stored_first_wins(course):
+    await complete(course, 10, 11, 12)
+    other = next(l for l in (10, 11, 12) if l != daily_challenge.pick([10, 11, 12], 1, TODAY))
+    # As if a concurrent request stored its pick in between
+    course.add(DailyChallenge(user_id=1, challenge_date=TODAY, lesson_id=other))
+    await course.commit()
+
+    assert await daily_challenge.assign(course, 1, TODAY) == other
+    assert await stored(course) == [(TODAY, other)]
+
+
+async def test_daily_challenge_endpoint(course):
+    app = FastAPI()
+    app.include_router(lessons_routes.router, prefix="/api/lessons")
+    app.dependency_overrides[get_current_user] = lambda: object()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        url = "/api/lessons/daily-challenges/1"
+        assert (await client.get(url)).status_code == 404
+        await complete(course, 10, 11, 12)
+
+        first = await client.get(url)
+        assert first.status_code == 200
+        assert (await client.get(url)).json()["id"] == first.json()["id"]
+        assert (await client.get(url, headers={"If-None-Match": first.headers["etag"]})).status_code == 304
+
+        assert (await client.post("/api/lessons/complete-daily-challenge/1")).status_code == 200
+        assert (await client.get(url)).status_code == 400
+        assert (await client.get("/api/lessons/daily-challenges/2")).status_code == 404
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app import dependencies
+from app.auth import create_access_token
+from app.models import Account
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def clear_account_cache():
+    dependencies._account_checks.clear()
+    yield
+    dependencies._account_checks.clear()
+
+
+async def test_token_user_needs_an_existing_account(course):
+    assert await dependencies.get_token_user_id(create_access_token({"sub": "1"})) == "1"
+    with pytest.raises(HTTPException) as error:
+        await dependencies.get_token_user_id(create_access_token({"sub": "2"}))
+    assert error.value.status_code == 401
+
+
+async def test_token_user_rejects_invalid_tokens(course):
+    with pytest.raises(HTTPException) as error:
+        await dependencies.get_token_user_id("not-a-token")
+    assert error.value.status_code == 401
+
+
+async def test_deactivated_account_loses_access_after_the_cache_expires(course, monkeypatch):
+    token = create_access_token({"sub": "1"})
+    await dependencies.get_token_user_id(token)
+
+    await course.execute(update(Account).where(Account.user_id == 1).values(status="inactive"))
+    await course.commit()
+    # Still trusted while cached
+    assert await dependencies.get_token_user_id(token) == "1"
+
+    monkeypatch.setattr(dependencies, "AUTH_USER_CACHE_SECONDS", 0)
+    with pytest.raises(HTTPException) as error:
+        await dependencies.get_token_user_id(token)
+    assert error.value.status_code == 401
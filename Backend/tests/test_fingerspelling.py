@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from app.models import Sign
+from app.services import fingerspelling
+from app.services.fingerspelling import LexiconTrie, SpellingSession, letter_columns, normalize_word
+from app.services.label_sets import LETTERS, LabelSet
+
+COLUMNS = letter_columns(LabelSet.default())
+
+
+def frames(letters: str, confidence: float = 0.9) -> np.ndarray:
+    """One prediction per letter, ``confidence`` on it and the rest spread
+    over the other letters."""
+    out = np.full((len(letters), len(LETTERS)), (1 - confidence) / (len(LETTERS) - 1), dtype=np.float32)
+    for row, letter in enumerate(letters):
+        out[row, LETTERS.index(letter)] = confidence
+    return out
+
+
+def session(*words, beam_width: int = 16) -> SpellingSession:
+    trie = LexiconTrie(capacity=4)
+    trie.sync(enumerate(words, 1))
+    return SpellingSession(trie, COLUMNS, beam_width)
+
+
+def test_normalize_word_keeps_lowercase_letters():
+    assert normalize_word("Thank you!") == "thankyou"
+    assert normalize_word(None) == ""
+
+
+def test_decode_hello_from_per_letter_probabilities():
+    result = session("hello", "help", "hold").decode(frames("hhheeelllllooo"))
+    assert result["word"] == "hello"
+    assert result["prefix"] == "hello"
+    assert result["confidence"] > 0.5
+
+
+def test_held_letter_is_not_read_twice_unless_the_lexicon_wants_it():
+    assert session("hel", "hell").decode(frames("heelll"))["word"] == "hel"
+    assert session("hello", "helo").decode(frames("hellllo"))["word"] == "helo"
+    # With only the doubled spelling in the lexicon, the held letter pays for it
+    assert session("hello").decode(frames("hellllo"))["word"] == "hello"
+
+
+def test_candidates_rank_competing_words():
+    result = session("cat", "car").decode(frames("ca"))
+    assert result["word"] is None
+    assert result["prefix"] == "ca"
+
+    noisy = frames("cat")
+    noisy[2, LETTERS.index("r")] = 0.6
+    noisy[2, LETTERS.index("t")] = 0.3
+    result = session("cat", "car").decode(noisy)
+    assert [c["word"] for c in result["candidates"]] == ["car", "cat"]
+    assert result["candidates"][0]["confidence"] > result["candidates"][1]["confidence"]
+
+
+def test_sync_only_touches_changed_signs_and_keeps_node_ids():
+    trie = LexiconTrie(capacity=2)
+    assert trie.sync([(1, "cat"), (2, "cow")]) == 2
+    nodes = trie.node_count
+    assert trie.sync([(1, "cat"), (2, "cow")]) == 0
+    assert trie.sync([(1, "Cat"), (3, "dog")]) == 2
+    assert sorted(trie._signs.items()) == [(1, "cat"), (3, "dog")]
+    assert len(trie) == 2
+    # "cow" is gone for decoding, but its nodes are kept
+    assert trie.node_count == nodes + 3
+    spell = SpellingSession(trie, COLUMNS)
+    assert spell.decode(frames("cow"))["word"] != "cow"
+    assert spell.decode(frames("dog"))["word"] == "dog"
+
+
+def test_letter_columns_need_letter_classes():
+    with pytest.raises(ValueError):
+        letter_columns(LabelSet(["hello", "thanks"]))
+    columns = letter_columns(LabelSet(["b", "hello", "a"]))
+    assert columns[:3].tolist() == [2, 0, -1]
+
+
+@pytest.mark.anyio
+async def test_ensure_lexicon_loads_active_signs(course, monkeypatch):
+    course.add_all([
+        Sign(id=1, lesson_id=10, text="Hi", video_url="v"),
+        Sign(id=2, lesson_id=10, text="bye", video_url="v", archived=True),
+    ])
+    await course.commit()
+    monkeypatch.setattr(fingerspelling, "lexicon", LexiconTrie())
+    monkeypatch.setattr(fingerspelling, "_synced_at", None)
+
+    lexicon = await fingerspelling.ensure_lexicon(course)
+    assert lexicon._signs == {1: "hi"}
+    spell = await fingerspelling.open_session(course, LabelSet.default())
+    assert spell.decode(frames("hi"))["word"] == "hi"
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event, update
+
+from app.db import engine
+from app.dependencies import get_current_user
+from app.models import UserProfile
+from app.routes import lessons_routes
+from app.services import heart_service
+from app.services.heart_service import MAX_HEARTS, REGEN_INTERVAL
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_hearts_regenerate_one_per_interval():
+    state = heart_service.current(2, T0, T0 + timedelta(minutes=25))
+    assert state.count == 4
+    assert state.since == T0 + 2 * REGEN_INTERVAL
+    assert state.seconds_to_next == 5 * 60
+
+
+def test_regeneration_stops_at_max():
+    state = heart_service.current(4, T0, T0 + timedelta(hours=3))
+    assert (state.count, state.seconds_to_next) == (MAX_HEARTS, 0)
+
+
+def test_missing_values_mean_full_hearts():
+    assert heart_service.current(None, None, T0).count == MAX_HEARTS
+
+
+def test_spend_from_full_starts_the_timer_now():
+    profile = UserProfile(hearts=MAX_HEARTS, hearts_last_updated=T0 - timedelta(days=3))
+    assert heart_service.spend(profile, now=T0) == MAX_HEARTS - 1
+    assert profile.hearts_last_updated == T0
+    assert heart_service.of(profile, T0 + REGEN_INTERVAL - timedelta(seconds=1)).count == MAX_HEARTS - 1
+    assert heart_service.of(profile, T0 + REGEN_INTERVAL).count == MAX_HEARTS
+
+
+def test_spend_keeps_the_running_interval_and_floors_at_zero():
+    profile = UserProfile(hearts=1, hearts_last_updated=T0)
+    assert heart_service.spend(profile, 3, now=T0 + timedelta(minutes=15)) == 0
+    # The heart regained at minute 10 was spent too; the next one is due at 20
+    assert profile.hearts_last_updated == T0 + REGEN_INTERVAL
+    assert heart_service.of(profile, T0 + timedelta(minutes=20)).count == 1
+
+
+def test_spend_nothing_changes_nothing():
+    profile = UserProfile(hearts=3, hearts_last_updated=T0)
+    assert heart_service.spend(profile, 0, now=T0 + timedelta(minutes=5)) == 3
+    assert profile.hearts_last_updated == T0
+
+
+def test_add_caps_at_max():
+    profile = UserProfile(hearts=1, hearts_last_updated=T0)
+    assert heart_service.add(profile, 2, now=T0 + timedelta(minutes=5)) == 3
+    assert profile.hearts_last_updated == T0
+    assert heart_service.add(profile, 10, now=T0 + timedelta(minutes=6)) == MAX_HEARTS
+    assert profile.hearts_last_updated == T0 + timedelta(minutes=6)
+
+
+@pytest.mark.anyio
+async def test_refreshing_hearts_derives_them_without_writing(course):
+    app = FastAPI()
+    app.include_router(lessons_routes.router, prefix="/api/lessons")
+    app.dependency_overrides[get_current_user] = lambda: object()
+    earlier = datetime.utcnow() - timedelta(minutes=25)
+    await course.execute(
+        update(UserProfile).where(UserProfile.user_id == 1).values(hearts=1, hearts_last_updated=earlier)
+    )
+    await course.commit()
+
+    writes = []
+    def count_writes(conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", count_writes)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            body = (await client.post("/api/lessons/refresh-hearts/1")).json()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_writes)
+
+    assert body["hearts"] == 3
+    assert 0 < body["seconds_until_next_heart"] <= 5 * 60
+    assert writes == []
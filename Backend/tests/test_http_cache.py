@@ -0,0 +1,45 @@
+from starlette.requests import Request
+
+from app.services.http_cache import conditional_response, encoded, etag_matches
+
+ITEM = encoded(b'{"id": 1}')
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_etag_depends_only_on_the_body():
+    assert encoded(b'{"id": 1}').etag == ITEM.etag
+    assert encoded(b'{"id": 2}').etag != ITEM.etag
+    assert ITEM.etag.startswith('"') and ITEM.etag.endswith('"')
+
+
+def test_full_response_carries_etag_and_no_cache():
+    response = conditional_response(make_request(), ITEM)
+    assert response.status_code == 200
+    assert response.body == ITEM.body
+    assert response.headers["etag"] == ITEM.etag
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_matching_if_none_match_gets_empty_304():
+    response = conditional_response(make_request(if_none_match=ITEM.etag), ITEM)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == ITEM.etag
+
+
+def test_stale_if_none_match_gets_the_body():
+    response = conditional_response(make_request(if_none_match='"stale"'), ITEM)
+    assert response.status_code == 200
+    assert response.body == ITEM.body
+
+
+def test_etag_matches_lists_weak_tags_and_wildcard():
+    assert etag_matches(f'"a", {ITEM.etag}', ITEM.etag)
+    assert etag_matches(f"W/{ITEM.etag}", ITEM.etag)
+    assert etag_matches("*", ITEM.etag)
+    assert not etag_matches(None, ITEM.etag)
+    assert not etag_matches('"a", "b"', ITEM.etag)
@@ -0,0 +1,87 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.inference_batcher import InferenceBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeModel:
+    """Answers each frame with [frame value, batch size] and records the
+    batch sizes it was called with."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+
+    async def __call__(self, frames):
+        self.batches.append(len(frames))
+        await asyncio.sleep(self.delay)
+        return np.array([[frame[0], len(frames)] for frame in frames], dtype=np.float32)
+
+
+def frame(value):
+    return np.array([value], dtype=np.float32)
+
+
+async def test_concurrent_frames_share_a_batch_and_get_their_own_rows():
+    model = FakeModel()
+    batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*[batcher.predict(frame(i)) for i in range(5)])
+    finally:
+        await batcher.stop()
+    assert model.batches == [5]
+    assert [float(row[0]) for row in results] == [0, 1, 2, 3, 4]
+    assert batcher.stats()["frames"] == 5
+
+
+async def test_batches_never_exceed_max_batch_size():
+    model = FakeModel()
+    batcher = InferenceBatcher(model, max_batch_size=4, max_wait_ms=50)
+    try:
+        await asyncio.gather(*[batcher.predict(frame(i)) for i in range(10)])
+    finally:
+        await batcher.stop()
+    assert max(model.batches) <= 4
+    assert sum(model.batches) == 10
+
+
+async def test_a_lone_frame_is_sent_after_max_wait():
+    model = FakeModel()
+    batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=5)
+    try:
+        result = await asyncio.wait_for(batcher.predict(frame(7)), timeout=1)
+    finally:
+        await batcher.stop()
+    assert float(result[0]) == 7
+    assert model.batches == [1]
+
+
+async def test_frames_pile_up_while_the_worker_is_busy():
+    model = FakeModel(delay=0.05)
+    batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=0, max_in_flight=1)
+    try:
+        first = asyncio.ensure_future(batcher.predict(frame(0)))
+        await asyncio.sleep(0.01)
+        rest = [batcher.predict(frame(i)) for i in range(1, 4)]
+        await asyncio.gather(first, *rest)
+    finally:
+        await batcher.stop()
+    assert model.batches == [1, 3]
+
+
+async def test_model_errors_reach_every_caller():
+    async def failing(frames):
+        raise RuntimeError("model exploded")
+
+    batcher = InferenceBatcher(failing, max_batch_size=4, max_wait_ms=20)
+    try:
+        results = await asyncio.gather(
+            *[batcher.predict(frame(i)) for i in range(3)], return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+    assert all(isinstance(r, RuntimeError) for r in results)
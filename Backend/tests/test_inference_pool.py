@@ -0,0 +1,16 @@
+import pytest
+
+from app.services.inference_pool import InferencePool
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_start_fails_and_cleans_up_when_workers_cannot_load(tmp_path):
+    pool = InferencePool(str(tmp_path / "missing.onnx"), workers=2, frame_shape=(8, 8, 3))
+    with pytest.raises(Exception):
+        await pool.start()
+    assert not pool.running
+    assert pool._shm is None
+    assert pool.worker_pids == []
+    with pytest.raises(RuntimeError):
+        await pool.predict([])
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from app.services.label_sets import LabelSet
+
+LABELS = LabelSet(["a", "b", "c", "hello"], [1, 2, None, 40])
+
+
+def test_label_files_in_both_formats(tmp_path):
+    (tmp_path / "labels.json").write_text(json.dumps({"labels": [{"label": "a", "sign_id": 7}, "B"]}))
+    labels = LabelSet.for_model_dir(tmp_path)
+    assert labels.labels == ["a", "B"]
+    assert labels.sign_ids == [7, None]
+
+    other = tmp_path / "txt"
+    other.mkdir()
+    (other / "labels.txt").write_text("1 b\n0 a\n\n3 d\n")
+    labels = LabelSet.for_model_dir(other)
+    assert labels.labels == ["a", "b", "", "d"]
+    assert labels.label(2) == "unknown"
+
+    assert LabelSet.for_model_dir(tmp_path / "missing").labels[:3] == ["a", "b", "c"]
+
+
+def test_candidate_mask_matches_sign_ids_then_text():
+    mask = LABELS.candidate_mask([(40, "ignored"), (99, " C "), (98, "nope")], 4)
+    assert mask.tolist() == [False, False, True, True]
+    # Classes beyond the model's output are left out
+    assert LABELS.candidate_mask([(40, "hello")], 3).tolist() == [False, False, False]
+
+
+def test_top_k_is_sorted_best_first():
+    indices, scores = LABELS.top_k(np.array([0.1, 0.5, 0.15, 0.25]), k=3)
+    assert indices.tolist() == [[1, 3, 2]]
+    np.testing.assert_allclose(scores, [[0.5, 0.25, 0.15]])
+
+
+def test_masked_top_k_renormalizes_over_kept_classes():
+    mask = np.array([True, False, True, False])
+    indices, scores = LABELS.top_k(np.array([[0.2, 0.6, 0.2, 0.0], [0.1, 0.1, 0.3, 0.5]]), mask, k=4)
+    # k is capped at the number of kept classes
+    assert indices.shape == (2, 2)
+    assert indices[1].tolist() == [2, 0]
+    np.testing.assert_allclose(scores.sum(axis=1), [1.0, 1.0])
+    np.testing.assert_allclose(scores[1], [0.75, 0.25])
+
+
+def test_masked_label_never_appears_in_top_k():
+    mask = np.array([False, False, True, True])
+    # The model puts all its weight on masked classes
+    predictions = np.array([[0.6, 0.4, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]])
+    for k in (1, 2, 4):
+        indices, _ = LABELS.top_k(predictions, mask, k)
+        assert set(indices.ravel().tolist()) <= {2, 3}
+
+
+def test_decode_reports_sign_id_and_top_k():
+    result = LABELS.decode(np.array([0.1, 0.2, 0.3, 0.4]), np.array([True, True, False, True]), top_k=2)
+    assert result["letter"] == "hello"
+    assert result["sign_id"] == 40
+    assert [entry["letter"] for entry in result["top_k"]] == ["hello", "b"]
+    np.testing.assert_allclose(result["confidence"], 0.4 / 0.7)
+
+    plain = LABELS.decode(np.array([0.1, 0.2, 0.6, 0.1]))
+    assert plain == {"letter": "c", "confidence": plain["confidence"]}
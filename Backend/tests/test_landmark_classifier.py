@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from app.services import landmark_classifier
+from app.services.landmark_classifier import FEATURES, LandmarkClassifier, normalize_landmarks
+
+RNG = np.random.default_rng(7)
+HANDS = RNG.random((3, 21, 3)).astype(np.float32)
+
+
+def mirrored(points: np.ndarray) -> np.ndarray:
+    """The same pose seen as the other hand: x flipped around the frame."""
+    points = points.copy()
+    points[..., 0] = 1.0 - points[..., 0]
+    return points
+
+
+def knn_data(k: int = 3) -> dict:
+    references = normalize_landmarks(np.concatenate([HANDS + RNG.normal(0, 0.005, HANDS.shape) for _ in range(3)]))
+    return {
+        "kind": np.array("knn"),
+        "labels": np.array(["a", "b", "hello"]),
+        "sign_ids": np.array([1, -1, 40]),
+        "references": references,
+        "reference_labels": np.tile(np.arange(3), 3),
+        "k": np.array(k),
+    }
+
+
+def test_normalization_ignores_position_and_size():
+    features = normalize_landmarks(HANDS)
+    assert features.shape == (3, FEATURES)
+    moved = HANDS * 2.5 + np.array([0.3, -0.2, 0.1], dtype=np.float32)
+    np.testing.assert_allclose(normalize_landmarks(moved), features, atol=1e-5)
+    # Wrist at the origin, wrist -> middle knuckle of length 1
+    hand = features.reshape(3, 21, 3)
+    np.testing.assert_allclose(hand[:, 0], 0, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(hand[:, 9], axis=1), 1, atol=1e-5)
+
+
+def test_left_hands_are_mirrored_onto_right_hands():
+    right = normalize_landmarks(HANDS)
+    left = normalize_landmarks(mirrored(HANDS), left_handed=[True, True, True])
+    np.testing.assert_allclose(left, right, atol=1e-5)
+    mixed = normalize_landmarks(np.stack([HANDS[0], mirrored(HANDS)[1]]), left_handed=[False, True])
+    np.testing.assert_allclose(mixed, right[:2], atol=1e-5)
+    assert not np.allclose(normalize_landmarks(mirrored(HANDS)), right, atol=1e-3)
+
+
+def test_normalization_does_not_modify_its_input():
+    points = HANDS.copy()
+    normalize_landmarks(points, left_handed=[True, False, True])
+    np.testing.assert_array_equal(points, HANDS)
+
+
+def test_knn_picks_the_nearest_references_class():
+    classifier = LandmarkClassifier(knn_data())
+    probs = classifier.predict(normalize_landmarks(HANDS[[2, 0, 1]]))
+    assert probs.shape == (3, 3)
+    np.testing.assert_allclose(probs.sum(axis=1), 1, atol=1e-5)
+    assert probs.argmax(axis=1).tolist() == [2, 0, 1]
+    assert classifier.labels.sign_ids == [1, None, 40]
+    assert classifier.labels.decode(probs[0])["letter"] == "hello"
+
+
+def test_knn_with_k_larger_than_the_references():
+    data = knn_data()
+    data["references"] = data["references"][:2]
+    data["reference_labels"] = data["reference_labels"][:2]
+    data["k"] = np.array(10)
+    probs = LandmarkClassifier(data).predict(normalize_landmarks(HANDS[:1]))
+    assert probs.argmax() == 0
+
+
+def test_mlp_returns_softmax_probabilities():
+    data = {
+        "kind": np.array("mlp"),
+        "labels": np.array(["a", "b"]),
+        "sign_ids": np.array([-1, -1]),
+        "w1": np.eye(FEATURES, 4, dtype=np.float32),
+        "b1": np.zeros(4, dtype=np.float32),
+        "w2": np.array([[1, 0], [0, 1], [0, 0], [0, 0]], dtype=np.float32) * 50,
+        "b2": np.zeros(2, dtype=np.float32),
+    }
+    classifier = LandmarkClassifier(data)
+    features = np.zeros((2, FEATURES), dtype=np.float32)
+    features[0, 0] = 1
+    features[1, 1] = 1
+    probs = classifier.predict(features)
+    np.testing.assert_allclose(probs.sum(axis=1), 1, atol=1e-6)
+    assert probs.argmax(axis=1).tolist() == [0, 1]
+    assert classifier.stats()["hidden_units"] == 4
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        LandmarkClassifier({"kind": np.array("svm"), "labels": np.array(["a"]), "sign_ids": np.array([-1])})
+
+
+def test_get_classifier_loads_the_built_file(tmp_path, monkeypatch):
+    path = tmp_path / "landmarks.npz"
+    monkeypatch.setattr(landmark_classifier, "RECOGNITION_LANDMARK_MODEL", str(path))
+    monkeypatch.setattr(landmark_classifier, "_classifier", None)
+    with pytest.raises(FileNotFoundError):
+        landmark_classifier.get_classifier()
+
+    np.savez(path, **knn_data())
+    classifier = landmark_classifier.get_classifier()
+    assert classifier.stats() == {
+        "version": classifier.version, "kind": "knn", "num_classes": 3, "references": 9, "k": 3,
+    }
+    assert landmark_classifier.get_classifier() is classifier
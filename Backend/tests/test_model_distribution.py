@@ -0,0 +1,111 @@
+import hashlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import recognition_routes
+from app.services import model_distribution
+from app.services.model_distribution import iter_file, parse_range
+
+BODY = bytes(range(256)) * 4
+DIGEST = hashlib.sha256(BODY).hexdigest()
+ETAG = f'"{DIGEST}"'
+
+app = FastAPI()
+app.include_router(recognition_routes.router, prefix="/recognition")
+
+
+def test_no_header_or_ignorable_ranges_send_the_whole_file():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=-", 100) is None
+    assert parse_range("bytes=0-1, 5-9", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    # last < first is an invalid range-spec, not an unsatisfiable one
+    assert parse_range("bytes=9-5", 100) is None
+
+
+def test_closed_and_open_ended_ranges():
+    assert parse_range("bytes=0-0", 100) == (0, 0)
+    assert parse_range(" bytes=10-19 ", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    # An end past the file is cut to its last byte
+    assert parse_range("bytes=90-500", 100) == (90, 99)
+
+
+def test_suffix_ranges_count_from_the_end():
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+
+
+@pytest.mark.parametrize("header, size", [("bytes=100-", 100), ("bytes=150-200", 100), ("bytes=-0", 100), ("bytes=-5", 0)])
+def test_unsatisfiable_ranges_raise(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+def test_iter_file_yields_the_inclusive_range(tmp_path):
+    path = tmp_path / "model.tflite"
+    path.write_bytes(BODY)
+    assert b"".join(iter_file(path, 0, len(BODY) - 1, chunk_size=100)) == BODY
+    assert b"".join(iter_file(path, 10, 19, chunk_size=3)) == BODY[10:20]
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    path = tmp_path / "model-int8.tflite"
+    path.write_bytes(BODY)
+    monkeypatch.setattr(model_distribution, "artifact_path", lambda version, fmt: path)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+URL = "/recognition/mobile/models/v1/tflite-int8"
+
+
+@pytest.mark.anyio
+async def test_download_sends_the_file_with_its_digest_etag(client):
+    response = await client.get(URL)
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["etag"] == ETAG
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = await client.get(URL, headers={"If-None-Match": ETAG})
+    assert response.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_range_resumes_with_206(client):
+    response = await client.get(URL, headers={"Range": "bytes=1000-"})
+    assert response.status_code == 206
+    assert response.content == BODY[1000:]
+    assert response.headers["content-range"] == f"bytes 1000-1023/{len(BODY)}"
+    assert response.headers["content-length"] == "24"
+
+    response = await client.get(URL, headers={"Range": "bytes=-4"})
+    assert response.content == BODY[-4:]
+
+
+@pytest.mark.anyio
+async def test_if_range_must_match_the_strong_etag(client):
+    response = await client.get(URL, headers={"Range": "bytes=0-9", "If-Range": ETAG})
+    assert response.status_code == 206
+    assert response.content == BODY[:10]
+
+    # A different file (or a weak validator) restarts the download
+    for if_range in ('"0123"', f"W/{ETAG}"):
+        response = await client.get(URL, headers={"Range": "bytes=0-9", "If-Range": if_range})
+        assert response.status_code == 200
+        assert response.content == BODY
+
+
+@pytest.mark.anyio
+async def test_unsatisfiable_range_gets_416(client):
+    response = await client.get(URL, headers={"Range": f"bytes={len(BODY)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(BODY)}"
+    # Unless If-Range says the client had another file
+    response = await client.get(URL, headers={"Range": f"bytes={len(BODY)}-", "If-Range": '"old"'})
+    assert response.status_code == 200
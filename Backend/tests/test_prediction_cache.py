@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.services import prediction_cache
+from app.services.prediction_cache import PredictionCache, dhash
+
+
+def gradient(width: int = 64, height: int = 48, flip: bool = False) -> np.ndarray:
+    ramp = np.linspace(0, 1, width, dtype=np.float32)
+    frame = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2)
+    return frame[:, ::-1].copy() if flip else frame
+
+
+def test_dhash_ignores_noise_and_resolution_but_not_content():
+    frame = gradient()
+    noisy = np.clip(frame + np.random.default_rng(0).normal(0, 0.001, frame.shape), 0, 1).astype(np.float32)
+    assert dhash(noisy) == dhash(frame)
+    assert dhash(gradient(128, 96)) == dhash(frame)
+    assert dhash(gradient(flip=True)) != dhash(frame)
+    assert 0 <= dhash(frame) < 2 ** 64
+
+
+def test_dhash_accepts_grayscale_frames():
+    frame = gradient()
+    assert dhash(frame.mean(axis=2)) == dhash(frame)
+
+
+def test_get_returns_what_was_put_and_counts_hits():
+    cache = PredictionCache(max_size=4)
+    assert cache.get("a") is None
+    cache.put("a", np.array([0.1, 0.9]))
+    np.testing.assert_allclose(cache.get("a"), [0.1, 0.9])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_size=2)
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    cache.get("a")
+    cache.put("c", np.zeros(1))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(max_size=4, ttl_seconds=10)
+    cache.put("a", np.zeros(1))
+    now[0] += 5
+    assert cache.get("a") is not None
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = PredictionCache(max_size=0)
+    assert not cache.enabled
+    cache.put("a", np.zeros(1))
+    assert cache.get("a") is None
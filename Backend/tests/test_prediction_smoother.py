@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.prediction_smoother import PredictionSmoother, frame_signature, signature_distance
+
+
+def probs(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def test_ema_starts_at_the_first_frame_and_moves_by_alpha():
+    smoother = PredictionSmoother(window=3, mode="ema")
+    assert smoother.alpha == 0.5
+    np.testing.assert_allclose(smoother.update(probs(1, 0)), [1, 0])
+    np.testing.assert_allclose(smoother.update(probs(0, 1)), [0.5, 0.5])
+    np.testing.assert_allclose(smoother.update(probs(0, 1)), [0.25, 0.75])
+
+
+def test_ema_does_not_write_into_the_callers_array():
+    first = probs(1, 0)
+    smoother = PredictionSmoother(mode="ema", alpha=0.5)
+    smoother.update(first)
+    smoother.update(probs(0, 1))
+    np.testing.assert_allclose(first, [1, 0])
+
+
+def test_vote_keeps_the_majority_class_over_a_single_outlier():
+    smoother = PredictionSmoother(window=3, mode="vote")
+    smoother.update(probs(0.8, 0.2))
+    smoother.update(probs(0.6, 0.4))
+    smoothed = smoother.update(probs(0.1, 0.9))
+    assert int(np.argmax(smoothed)) == 0
+    np.testing.assert_allclose(smoothed, [0.7, 0])
+
+
+def test_vote_only_counts_the_last_window_frames():
+    smoother = PredictionSmoother(window=2, mode="vote")
+    smoother.update(probs(0.9, 0.1))
+    smoother.update(probs(0.2, 0.8))
+    smoothed = smoother.update(probs(0.3, 0.7))
+    assert int(np.argmax(smoothed)) == 1
+
+
+def test_reset_forgets_the_stream():
+    smoother = PredictionSmoother(mode="ema", alpha=0.5)
+    smoother.update(probs(1, 0))
+    smoother.reset()
+    np.testing.assert_allclose(smoother.update(probs(0, 1)), [0, 1])
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PredictionSmoother(mode="median")
+
+
+def test_signature_distance_tells_noise_from_a_new_frame():
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 1, 64, dtype=np.float32)
+    frame = np.repeat(np.tile(ramp, (64, 1))[:, :, None], 3, axis=2)
+    noisy = np.clip(frame + rng.normal(0, 0.01, frame.shape).astype(np.float32), 0, 1)
+    other = frame[:, ::-1]
+
+    base = frame_signature(frame)
+    assert base.shape == (16, 16)
+    assert signature_distance(base, frame_signature(frame)) == 0.0
+    assert signature_distance(base, frame_signature(noisy)) < 0.01
+    assert signature_distance(base, frame_signature(other)) > 0.05
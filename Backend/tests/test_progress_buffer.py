@@ -0,0 +1,145 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.dependencies import get_current_user
+from app.models import UserProfile, UserProgress
+from app.routes import lessons_routes
+from app.services import course_graph, progress_store
+from app.services.progress_buffer import ProgressBuffer, buffer as app_buffer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def buffer(course):
+    # The timer never fires during a test; flushes are explicit
+    buffer = ProgressBuffer(flush_seconds=3600, max_users=100)
+    yield buffer
+    await buffer.close()
+
+
+async def stored_progress(db):
+    result = await db.execute(
+        select(UserProgress.user_id, UserProgress.lesson_id, UserProgress.progress, UserProgress.last_question)
+        .order_by(UserProgress.user_id, UserProgress.lesson_id)
+    )
+    return [tuple(row) for row in result]
+
+
+async def stored_profile(db, user_id=1):
+    return (await db.execute(
+        select(UserProfile).where(UserProfile.user_id == user_id).execution_options(populate_existing=True)
+    )).scalar_one()
+
+
+async def test_add_merges_in_memory_without_writing(buffer, course):
+    buffer.add(1, 10, 20, 1)
+    buffer.add(1, 10, 40, 3)
+    buffer.add(1, 11, 10, 0)
+
+    assert buffer.progress_for(1) == {10: (40, 3), 11: (10, 0)}
+    assert buffer.has_pending(1) and not buffer.has_pending(2)
+    assert await stored_progress(course) == []
+
+
+async def test_flush_writes_latest_progress(buffer, course):
+    buffer.add(1, 10, 20, 1)
+    buffer.add(1, 10, 60, 5)
+    await buffer.flush()
+
+    assert await stored_progress(course) == [(1, 10, 60, 5)]
+    assert not buffer.has_pending(1)
+    assert buffer.stats()["rows_written"] == 1
+
+
+async def test_flush_user_writes_only_that_user(buffer, course):
+    course.add(UserProfile(user_id=2, hearts=5, rubies=0, streak=0))
+    await course.commit()
+    buffer.add(1, 10, 30, 2)
+    buffer.add(2, 10, 50, 4)
+
+    assert await buffer.flush_user(1) is True
+    assert await buffer.flush_user(1) is False
+    assert await stored_progress(course) == [(1, 10, 30, 2)]
+    assert buffer.progress_for(2) == {10: (50, 4)}
+
+
+async def test_flush_keeps_completed(buffer, course):
+    course.add(UserProgress(user_id=1, lesson_id=10, progress=100, completed=True, last_question=9))
+    await course.commit()
+    buffer.add(1, 10, 10, 0)
+    await buffer.flush()
+
+    row = (await course.execute(
+        select(UserProgress).where(UserProgress.lesson_id == 10).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert (row.progress, row.completed) == (100, True)
+
+
+async def test_flush_after_a_completion_elsewhere_keeps_100(buffer, course):
+    # This worker buffered 60%, then another completed the lesson
+    buffer.add(1, 10, 60, 5)
+    await progress_store.save_progress(course, 1, 10, 100, 9)
+    assert await progress_store.mark_completed(course, 1, 10)
+    await course.commit()
+
+    await buffer.flush()
+    assert await stored_progress(course) == [(1, 10, 100, 9)]
+
+
+async def test_reads_ignore_buffered_answers_on_completed_lessons(course):
+    course.add(UserProgress(user_id=1, lesson_id=10, progress=100, completed=True, last_question=9))
+    await course.commit()
+    app_buffer.add(1, 10, 30, 2)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            body = (await client.get("/api/lessons/user-progress/1/10")).json()
+        assert (body["progress"], body["completed"]) == (100, True)
+        rows = await course_graph.user_progress(course, 1)
+        assert (rows[10].progress, rows[10].completed) == (100, True)
+    finally:
+        await app_buffer.close()
+
+
+async def test_close_flushes_what_is_left(buffer, course):
+    buffer.add(1, 12, 70, 6)
+    await buffer.close()
+    assert await stored_progress(course) == [(1, 12, 70, 6)]
+
+
+app = FastAPI()
+app.include_router(lessons_routes.router, prefix="/api/lessons")
+app.dependency_overrides[get_current_user] = lambda: object()
+
+
+async def test_progress_reads_overlay_unwritten_answers(course):
+    course.add(UserProgress(user_id=1, lesson_id=10, progress=20, completed=False, last_question=1))
+    await course.commit()
+
+    app_buffer.add(1, 10, 60, 5)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            body = (await client.get("/api/lessons/user-progress/1/10")).json()
+        assert (body["progress"], body["last_question"], body["completed"]) == (60, 5, False)
+        assert await stored_progress(course) == [(1, 10, 20, 1)]
+    finally:
+        await app_buffer.close()
+    assert await stored_progress(course) == [(1, 10, 60, 5)]
+
+
+async def test_wrong_answer_spends_the_heart_before_responding(course):
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.patch(
+                "/api/lessons/update-progress/1/10",
+                json={"progress": 20, "is_correct": False, "current_question": 1},
+            )
+        assert response.json()["hearts_remaining"] == 4
+        # Persisted, while the progress itself is still buffered
+        assert (await stored_profile(course)).hearts == 4
+        assert await stored_progress(course) == []
+        assert app_buffer.progress_for(1) == {10: (20, 1)}
+    finally:
+        await app_buffer.close()
@@ -0,0 +1,113 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db import engine
+from app.models import UserProgress
+from app.services import progress_store
+from scripts.migrate_progress_unique import merge_rows, migrate
+
+pytestmark = pytest.mark.anyio
+
+
+async def progress_rows(db):
+    result = await db.execute(
+        select(UserProgress.user_id, UserProgress.lesson_id, UserProgress.progress,
+               UserProgress.last_question, UserProgress.completed)
+        .order_by(UserProgress.user_id, UserProgress.lesson_id)
+        .execution_options(populate_existing=True)
+    )
+    return [tuple(row) for row in result]
+
+
+async def test_save_progress_inserts_then_overwrites_one_row(course):
+    await progress_store.save_progress(course, 1, 10, 20, 1)
+    await progress_store.save_progress(course, 1, 10, 40, 2)
+    await course.commit()
+    assert await progress_rows(course) == [(1, 10, 40, 2, False)]
+
+
+async def test_completed_rows_are_not_overwritten(course):
+    await progress_store.save_progress(course, 1, 10, 100, 5)
+    assert await progress_store.mark_completed(course, 1, 10)
+    await progress_store.save_progress_rows(course, [(1, 10, 20, 1), (1, 11, 30, 2)])
+    await course.commit()
+    assert await progress_rows(course) == [(1, 10, 100, 5, True), (1, 11, 30, 2, False)]
+
+
+async def test_save_progress_many_writes_every_lesson(course):
+    await progress_store.save_progress(course, 1, 11, 10, 1)
+    await progress_store.save_progress_many(course, 1, {10: (30, 3), 11: (50, 4)})
+    await progress_store.save_progress_rows(course, [])
+    await course.commit()
+    assert await progress_rows(course) == [(1, 10, 30, 3, False), (1, 11, 50, 4, False)]
+
+
+async def test_mark_completed_is_true_only_once(course):
+    await progress_store.save_progress(course, 1, 10, 100, 5)
+    assert await progress_store.mark_completed(course, 1, 10) is True
+    assert await progress_store.mark_completed(course, 1, 10) is False
+    # No row at all: nothing to claim
+    assert await progress_store.mark_completed(course, 1, 11) is False
+
+
+async def test_mark_completed_claims_null_completed(course):
+    course.add(UserProgress(user_id=1, lesson_id=10, progress=100, completed=None, last_question=5))
+    await course.commit()
+    assert await progress_store.mark_completed(course, 1, 10) is True
+
+
+async def test_duplicate_user_lesson_rows_are_rejected(course):
+    course.add_all([
+        UserProgress(user_id=1, lesson_id=10, progress=10),
+        UserProgress(user_id=1, lesson_id=10, progress=20),
+    ])
+    with pytest.raises(IntegrityError):
+        await course.commit()
+
+
+Row = namedtuple("Row", "id progress completed last_question updated_at")
+
+
+def test_merge_rows_keeps_best_progress_and_latest_position():
+    rows = [
+        Row(1, 80, False, 8, datetime(2025, 1, 1)),
+        Row(2, 30, True, 3, datetime(2025, 1, 3)),
+        Row(3, 50, None, None, None),
+    ]
+    assert merge_rows(rows) == {
+        "progress": 80,
+        "completed": True,
+        "last_question": 3,
+        "updated_at": datetime(2025, 1, 3),
+    }
+
+
+async def test_migration_merges_then_indexes_and_can_run_again(course):
+    # The table as it was before the unique key, holding duplicates
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE user_progress"))
+        await conn.execute(text(
+            "CREATE TABLE user_progress (id INTEGER PRIMARY KEY, user_id INTEGER, lesson_id INTEGER, "
+            "progress INTEGER, completed BOOLEAN, last_question INTEGER, updated_at TIMESTAMP)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO user_progress VALUES (1, 1, 10, 40, 0, 4, '2025-01-01 00:00:00'), "
+            "(2, 1, 10, 100, 1, 5, '2025-01-02 00:00:00'), (3, 1, 11, 20, 0, 2, '2025-01-01 00:00:00')"
+        ))
+
+    assert await migrate(dry_run=True) == 0
+    assert len(await progress_rows(course)) == 3
+
+    assert await migrate(dry_run=False) == 0
+    assert await progress_rows(course) == [(1, 10, 100, 5, True), (1, 11, 20, 2, False)]
+    course.add(UserProgress(user_id=1, lesson_id=11, progress=30))
+    with pytest.raises(IntegrityError):
+        await course.commit()
+    await course.rollback()
+
+    assert await migrate(dry_run=False) == 0
+    assert len(await progress_rows(course)) == 2
@@ -0,0 +1,93 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.dependencies import get_current_user
+from app.models import UserProfile, UserProgress
+from app.routes import lessons_routes
+
+pytestmark = pytest.mark.anyio
+
+app = FastAPI()
+app.include_router(lessons_routes.router, prefix="/api/lessons")
+app.dependency_overrides[get_current_user] = lambda: object()
+
+
+@pytest.fixture
+async def client(course):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def answers(lesson_id, count, wrong=(), start=0):
+    return [
+        {
+            "lesson_id": lesson_id,
+            "question": question,
+            "is_correct": question not in wrong,
+            "progress": (question + 1) * 100 // count,
+            "answered_at": f"2026-01-01T00:00:{start + question:02d}",
+        }
+        for question in range(count)
+    ]
+
+
+async def submit(client, events, user_id=1):
+    return await client.post(f"/api/lessons/submit-answers/{user_id}", json={"answers": events})
+
+
+async def test_batch_completes_lessons_and_spends_hearts(client, course):
+    events = answers(10, 5, wrong=(1, 3)) + answers(11, 2, start=10)[:1]
+    response = await submit(client, events)
+    assert response.status_code == 200
+    body = response.json()
+
+    lessons = {lesson["lesson_id"]: lesson for lesson in body["lessons"]}
+    assert lessons[10]["completed"] and lessons[10]["rubies_earned"] == 5
+    assert lessons[10]["next_lesson_unlocked"]
+    assert lessons[11] == {
+        "lesson_id": 11, "progress": 50, "completed": False, "last_question": 0,
+        "rubies_earned": 0, "next_lesson_unlocked": False,
+    }
+    assert body["hearts_remaining"] == 3
+    assert body["rubies_earned"] == body["rubies"] == 5
+
+    rows = (await course.execute(
+        select(UserProgress.lesson_id, UserProgress.progress, UserProgress.completed)
+        .order_by(UserProgress.lesson_id)
+    )).all()
+    assert [tuple(row) for row in rows] == [(10, 100, True), (11, 50, False)]
+
+
+async def test_resent_batch_grants_no_rubies_again(client, course):
+    events = answers(10, 2)
+    assert (await submit(client, events)).json()["rubies_earned"] == 5
+    again = (await submit(client, events)).json()
+    assert again["rubies_earned"] == 0
+    assert again["rubies"] == 5
+    profile = (await course.execute(
+        select(UserProfile).where(UserProfile.user_id == 1).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert profile.rubies == 5
+
+
+async def test_empty_batch_is_rejected(client):
+    response = await submit(client, [])
+    assert response.status_code == 400
+
+
+async def test_answers_out_of_order_are_rejected(client):
+    response = await submit(client, list(reversed(answers(10, 3))))
+    assert response.status_code == 400
+
+
+async def test_unknown_lesson_is_not_found(client):
+    response = await submit(client, [{"lesson_id": 99, "question": 0, "is_correct": True, "progress": 10}])
+    assert response.status_code == 404
+
+
+async def test_batch_over_the_cap_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(lessons_routes, "LESSON_ANSWER_MAX_BATCH", 2)
+    response = await submit(client, answers(10, 3))
+    assert response.status_code == 400
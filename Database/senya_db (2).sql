@@ -52,6 +52,20 @@ INSERT INTO `accounts` (`user_id`, `name`, `email`, `hash_password`, `role`, `cr
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `daily_challenges`
+--
+
+CREATE TABLE `daily_challenges` (
+  `id` int(11) NOT NULL,
+  `user_id` int(11) NOT NULL,
+  `challenge_date` date NOT NULL,
+  `lesson_id` int(11) NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp()
+) ENGINE=InnoDB DEFAULT CHARSET=latin1 COLLATE=latin1_swedish_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `heart_packages`
 --
@@ -348,6 +362,14 @@ ALTER TABLE `accounts`
   ADD PRIMARY KEY (`user_id`),
   ADD UNIQUE KEY `email` (`email`);
 
+--
+-- Indexes for table `daily_challenges`
+--
+ALTER TABLE `daily_challenges`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_daily_challenges_user_date` (`user_id`,`challenge_date`),
+  ADD KEY `lesson_id` (`lesson_id`);
+
 --
 -- Indexes for table `heart_packages`
 --
@@ -407,6 +429,7 @@ ALTER TABLE `user_practice_progress`
 --
 ALTER TABLE `user_progress`
   ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_user_progress_user_lesson` (`user_id`,`lesson_id`),
   ADD KEY `user_id` (`user_id`),
   ADD KEY `lesson_id` (`lesson_id`);
 
@@ -420,6 +443,12 @@ ALTER TABLE `user_progress`
 ALTER TABLE `accounts`
   MODIFY `user_id` int(11) NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=13;
 
+--
+-- AUTO_INCREMENT for table `daily_challenges`
+--
+ALTER TABLE `daily_challenges`
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `heart_packages`
 --
@@ -472,6 +501,13 @@ ALTER TABLE `user_progress`
 -- Constraints for dumped tables
 --
 
+--
+-- Constraints for table `daily_challenges`
+--
+ALTER TABLE `daily_challenges`
+  ADD CONSTRAINT `daily_challenges_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `accounts` (`user_id`),
+  ADD CONSTRAINT `daily_challenges_ibfk_2` FOREIGN KEY (`lesson_id`) REFERENCES `lessons` (`id`);
+
 --
 -- Constraints for table `lessons`
 --